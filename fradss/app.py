@@ -6,11 +6,18 @@ Phase 3: Web Server Backend
 A minimal Flask server to serve the web map and provide data API.
 """
 
-from flask import Flask, render_template, jsonify, send_from_directory
+from flask import Flask, Response, render_template, jsonify, send_from_directory
 import os
 import json
 
+from feature_snapshot import cached_snapshot, render_collection, snapshot_cache_stats
+from json_provider import NumpyJSONProvider
+from request_metrics import RequestMetrics
+
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
+metrics = RequestMetrics(app, 'land_use_mvp')
+metrics.add_cache('snapshots', snapshot_cache_stats)
 
 # Configuration
 GEOJSON_FILE = 'output/assets.geojson'
@@ -26,6 +33,11 @@ def index():
 def get_data():
     """API endpoint to serve the classified land use data as GeoJSON."""
     try:
+        snapshot = cached_snapshot(GEOJSON_FILE)
+        if snapshot is not None:
+            metrics.count_features(snapshot.count)
+            return Response(render_collection(snapshot), mimetype='application/json')
+        
         if not os.path.exists(GEOJSON_FILE):
             return jsonify({
                 'error': 'No classified data available. Please run the classification script first.',
@@ -35,6 +47,7 @@ def get_data():
         with open(GEOJSON_FILE, 'r') as f:
             data = json.load(f)
         
+        metrics.count_features(len(data.get('features', [])))
         return jsonify(data)
     
     except Exception as e:
@@ -52,7 +65,11 @@ def get_status():
         'file_exists': os.path.exists(GEOJSON_FILE)
     }
     
-    if os.path.exists(GEOJSON_FILE):
+    snapshot = cached_snapshot(GEOJSON_FILE)
+    if snapshot is not None:
+        status['feature_count'] = snapshot.count
+        status['classes'] = snapshot.unique('class') + (['unknown'] if snapshot.missing('class').any() else [])
+    elif os.path.exists(GEOJSON_FILE):
         try:
             with open(GEOJSON_FILE, 'r') as f:
                 data = json.load(f)
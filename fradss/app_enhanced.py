@@ -7,10 +7,16 @@ Interactive web application with advanced features
 from flask import Flask, render_template, jsonify, request
 import os
 import json
-import pandas as pd
 from datetime import datetime
 
+from app_startup import DeferredStartup
+from json_provider import NumpyJSONProvider
+from request_metrics import RequestMetrics
+from feature_snapshot import cached_snapshot, snapshot_cache_stats
+
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
+metrics = RequestMetrics(app, 'india_land_use')
 
 # Configuration
 GEOJSON_FILE = 'output/india_assets.geojson'
@@ -18,15 +24,27 @@ STATIC_DIR = 'static'
 TEMPLATES_DIR = 'templates'
 
 class IndiaLandUseAPI:
-    def __init__(self, geojson_file):
+    def __init__(self, geojson_file, load=True):
         self.geojson_file = geojson_file
         self.data = None
         self.df = None
-        self.load_data()
+        self.snapshot = None
+        if load:
+            self.load_data()
     
     def load_data(self):
         """Load and process the GeoJSON data."""
+        import pandas as pd
+        
         try:
+            # Map the generator's columnar snapshot when it is up to date; geometry
+            # stays in the mapped buffers and is decoded per response
+            self.snapshot = cached_snapshot(self.geojson_file)
+            if self.snapshot is not None:
+                self.df = self.snapshot.to_frame(geometry=False)
+                print(f"Mapped {len(self.df)} features from snapshot {self.snapshot.path}")
+                return
+            
             with open(self.geojson_file, 'r') as f:
                 self.data = json.load(f)
             
@@ -76,14 +94,17 @@ class IndiaLandUseAPI:
                 filtered_df = filtered_df[filtered_df['claim_status'] == filters['claim_status']]
         
         # Convert back to GeoJSON format
-        features = []
-        for _, row in filtered_df.iterrows():
-            feature = {
-                "type": "Feature",
-                "properties": {k: v for k, v in row.items() if k != 'geometry'},
-                "geometry": row['geometry']
-            }
-            features.append(feature)
+        if self.snapshot is not None:
+            features = self.snapshot.features(filtered_df.index)
+        else:
+            features = []
+            for _, row in filtered_df.iterrows():
+                feature = {
+                    "type": "Feature",
+                    "properties": {k: v for k, v in row.items() if k != 'geometry'},
+                    "geometry": row['geometry']
+                }
+                features.append(feature)
         
         return {
             "type": "FeatureCollection",
@@ -136,8 +157,28 @@ class IndiaLandUseAPI:
         
         return options
 
-# Initialize API
-api = IndiaLandUseAPI(GEOJSON_FILE)
+# Initialize API; the data is loaded by the startup loader, not at import
+api = IndiaLandUseAPI(GEOJSON_FILE, load=False)
+startup = DeferredStartup('india-land-use', api.load_data)
+metrics.add_cache('snapshots', snapshot_cache_stats)
+metrics.add_gauge('app_ready', 'Data loaded (1) or still loading (0).', lambda: int(startup.ready))
+STARTUP_EXEMPT_ENDPOINTS = {'readiness', 'metrics', 'static', 'serve_static', 'index'}
+
+
+@app.before_request
+def wait_for_data():
+    """Hold data requests until the startup loader has finished (running it here if nobody started it)."""
+    if request.endpoint not in STARTUP_EXEMPT_ENDPOINTS:
+        startup.ensure_ready()
+
+
+@app.route('/api/ready')
+def readiness():
+    """Readiness probe: 200 once the data is loaded, 503 (and a background load) until then."""
+    status = startup.status()
+    if not status['ready']:
+        startup.start()
+    return jsonify(status), 200 if status['ready'] else 503
 
 @app.route('/')
 def index():
@@ -163,6 +204,7 @@ def get_data():
         filters = {k: v for k, v in filters.items() if v}
         
         data = api.get_filtered_data(filters)
+        metrics.count_features(len(data['features']))
         return jsonify(data)
     
     except Exception as e:
@@ -275,6 +317,7 @@ def export_data():
             'total_features': len(data['features'])
         }
         
+        metrics.count_features(len(data['features']))
         return jsonify(data)
     
     except Exception as e:
@@ -311,4 +354,5 @@ if __name__ == '__main__':
         print("Generating sample data...")
         os.system('python scripts/india_land_classification.py')
     
+    startup.start()
     app.run(debug=True, host='127.0.0.1', port=5000)
@@ -4,20 +4,30 @@ FRA WebGIS Integration Application
 Comprehensive Forest Rights Act (IFR/CFR/CR) management system
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory, send_file
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory, send_file
 import os
 import json
-import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
 import random
+import threading
+import time
+from bisect import bisect_right
+from functools import lru_cache
 
-try:
-    import psycopg2  # type: ignore
-except Exception:
-    psycopg2 = None
+from app_startup import DeferredStartup
+from json_provider import NumpyJSONProvider, dumps_compact
+from request_metrics import RequestMetrics
+from request_profiler import RequestProfiler
+from fra_analytics import ClaimAnalytics
+from feature_snapshot import (ColumnTable, FeatureSnapshot, cached_snapshot, render_collection,
+                              snapshot_cache_stats, snapshot_path, write_snapshot)
+from feature_partitions import (PartitionCache, PartitionManifest, PartitionSelection, bbox_mask,
+                                geometry_bboxes, geometry_vertex_count, manifest_path)
 
 app = Flask(__name__)
+app.json = NumpyJSONProvider(app)
+metrics = RequestMetrics(app, 'fra_webgis')
 
 # Configuration
 FRA_GEOJSON_FILE = 'output/fra_claims.geojson'
@@ -28,27 +38,96 @@ SCHEMES_FILE = os.path.join('static', 'schemes.json')
 STATIC_DIR = 'static'
 TEMPLATES_DIR = 'templates'
 REACT_BUILD_DIR = 'react_build'
+DSS_BATCH_LIMIT = 500
+# Memory-mapped claim snapshot shared by every worker process. The generator's
+# snapshot next to the GeoJSON is always used when fresh; setting this also
+# writes one on startup when it is missing or stale.
+FRA_SNAPSHOT_DIR = os.getenv('FRA_SNAPSHOT_DIR')
+ASSETS_FILES = ['output/assets_enhanced.geojson', 'output/assets.geojson']
+# Per-state partitions listed in this manifest are loaded on first access and
+# the coldest ones evicted once the loaded claims exceed the memory budget
+FRA_PARTITION_MANIFEST = os.getenv('FRA_PARTITION_MANIFEST', manifest_path(FRA_GEOJSON_FILE))
+FRA_PARTITION_MEMORY_MB = float(os.getenv('FRA_PARTITION_MEMORY_MB', '256'))
+# Opt-in request profiling: requests carrying the secret in the X-Profile header
+# are profiled and the slowest kept at /api/profiles
+FRA_PROFILING = os.getenv('FRA_PROFILING', '').lower() in ('1', 'true', 'yes')
+FRA_PROFILE_SECRET = os.getenv('FRA_PROFILE_SECRET')
+FRA_PROFILE_KEEP = int(os.getenv('FRA_PROFILE_KEEP', '20'))
+# How often (seconds) the DSS matrix asks the polygon_attributes table for rows written since its last look
+FRA_ATTRIBUTE_POLL_SECONDS = float(os.getenv('FRA_ATTRIBUTE_POLL_SECONDS', '30'))
+CLAIM_FILTER_COLUMNS = ('state', 'district', 'village', 'fra_type', 'status', 'tribal_community')
+FILTER_OPTION_COLUMNS = {
+    'states': 'state',
+    'districts': 'district',
+    'villages': 'village',
+    'fra_types': 'fra_type',
+    'statuses': 'status',
+    'tribal_communities': 'tribal_community'
+}
 
 class FRAWebGISManager:
-    def __init__(self, geojson_file, analytics_file):
+    def __init__(self, geojson_file, analytics_file, snapshot_dir=None, partition_manifest=None,
+                 memory_budget_mb=FRA_PARTITION_MEMORY_MB, columns=None, load=True):
         self.geojson_file = geojson_file
         self.analytics_file = analytics_file
+        self.snapshot_dir = snapshot_dir
+        self.partition_manifest = partition_manifest
+        self.memory_budget_mb = memory_budget_mb
+        self.columns = columns
         self.claims_data = None
         self.analytics_data = None
-        self.df = None
-        self.load_data()
+        self.snapshot = None
+        self.partitions = None
+        self.partition_cache = None
+        self._df = None
+        self._bboxes = None
+        self.data_version = 0
+        self.fragments = None
+        self._fragments_lock = threading.Lock()
+        self._claim_analytics = None
+        self._analytics_lock = threading.Lock()
+        if load:
+            self.load_data()
+    
+    @property
+    def df(self):
+        """Claims DataFrame; built from the snapshot on first use, None in partitioned mode (see partition_frame)."""
+        if self._df is None and self.snapshot is not None:
+            with self._fragments_lock:
+                if self._df is None:
+                    self._df = self.snapshot_frame()
+        return self._df
+    
+    @df.setter
+    def df(self, value):
+        self._df = value
     
     def load_data(self):
         """Load FRA claims and analytics data."""
+        import pandas as pd
+        
+        self.data_version += 1
+        self.partitions = None
+        self._bboxes = None
         try:
+            # Load analytics data
+            if self.analytics_file:
+                with open(self.analytics_file, 'r') as f:
+                    self.analytics_data = json.load(f)
+            
+            if not self.snapshot_dir and self.open_partitions():
+                print(f"Indexed {self.partitions.total} FRA claims in {len(self.partitions.partitions)} partitions "
+                      f"(loaded on demand, budget {self.memory_budget_mb:g} MB)")
+                return
+            
+            if self.open_snapshot(self.snapshot_dir or snapshot_path(self.geojson_file)):
+                print(f"Mapped {self.snapshot.count} FRA claims from snapshot {self.snapshot_dir}")
+                return
+            
             # Load claims data
             with open(self.geojson_file, 'r') as f:
                 self.claims_data = json.load(f)
             
-            # Load analytics data
-            with open(self.analytics_file, 'r') as f:
-                self.analytics_data = json.load(f)
-            
             # Convert to DataFrame for easier processing
             features = []
             for feature in self.claims_data['features']:
@@ -57,20 +136,161 @@ class FRAWebGISManager:
                 features.append(props)
             
             self.df = pd.DataFrame(features)
+            if self.columns:
+                # Partition shards share the column set of the whole dataset
+                self.df = self.df.reindex(columns=[c for c in self.columns if c != 'geometry'] + ['geometry'])
+            self.fragments = None
             print(f"Loaded {len(self.df)} FRA claims")
             
+            if self.snapshot_dir:
+                try:
+                    self.use_snapshot(self.snapshot_dir)
+                except OSError as e:
+                    print(f"Could not write FRA snapshot to {self.snapshot_dir}: {e}")
+            
         except Exception as e:
             print(f"Error loading FRA data: {e}")
             self.claims_data = {"type": "FeatureCollection", "features": []}
             self.analytics_data = {}
+            self.snapshot = None
             self.df = pd.DataFrame()
     
-    def get_filtered_claims(self, filters=None):
-        """Get filtered FRA claims based on provided filters."""
-        if self.df is None or len(self.df) == 0:
-            return {"type": "FeatureCollection", "features": []}
+    def open_partitions(self):
+        """Serve claims from per-partition shards listed in the manifest, if one is configured and present."""
+        if not self.partition_manifest or not os.path.exists(self.partition_manifest):
+            return False
+        partitions = PartitionManifest.open_if_fresh(self.partition_manifest)
+        if partitions is None:
+            print(f"Partition manifest {self.partition_manifest} does not match its shards; "
+                  f"serving {self.geojson_file} instead")
+            return False
+        self.partitions = partitions
+        self.partition_cache = PartitionCache(int(self.memory_budget_mb * 1024 * 1024))
+        self.snapshot = None
+        self.claims_data = None
+        self.df = None
+        self.fragments = None
+        return True
+    
+    def partition(self, key):
+        """Claims of one partition, loaded on first access and kept within the memory budget."""
+        return self.partition_cache.get(key, lambda: self._load_partition(key), FRAWebGISManager.memory_footprint)
+    
+    def _load_partition(self, key):
+        part = FRAWebGISManager(self.partitions.file(key), None, columns=self.partitions.columns)
+        part.build_fragments()
+        return part
+    
+    def partition_frame(self):
+        """All partitions as one DataFrame (loads every partition)."""
+        import pandas as pd
         
-        filtered_df = self.df.copy()
+        frames = [self.partition(key).df for key in self.partitions.partitions]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def partition_keys(self, filters=None):
+        """Partitions that can hold claims matching the filters, pruned with the manifest."""
+        filters = filters or {}
+        keys = self.partitions.select(filters, equality_columns=CLAIM_FILTER_COLUMNS)
+        low = float(filters['claim_area_min']) if filters.get('claim_area_min') else None
+        high = float(filters['claim_area_max']) if filters.get('claim_area_max') else None
+        if low is not None or high is not None:
+            keys = self.partitions.prune_range(keys, 'claim_area_ha', low, high)
+        return keys
+    
+    def memory_footprint(self):
+        """Approximate bytes held for the claims: mapped snapshot files, or DataFrame plus fragments."""
+        if self.snapshot is not None:
+            return sum(os.path.getsize(os.path.join(self.snapshot.path, name)) for name in os.listdir(self.snapshot.path))
+        if self._df is None:
+            return 0
+        size = int(self._df.drop(columns=['geometry'], errors='ignore').memory_usage(index=True, deep=True).sum())
+        if 'geometry' in self._df:
+            # Nested coordinate lists: roughly a list and two floats per vertex
+            size += 120 * sum(geometry_vertex_count(g) for g in self._df['geometry'] if isinstance(g, dict))
+        if self.fragments:
+            size += sum(len(fragment) + 49 for fragment in self.fragments)
+        return size
+    
+    def open_snapshot(self, snapshot_dir):
+        """Map an up-to-date snapshot of the claims file; returns False if it is missing or stale."""
+        snapshot = FeatureSnapshot.open_if_fresh(snapshot_dir, self.geojson_file)
+        if snapshot is None:
+            return False
+        self.snapshot = snapshot
+        self.snapshot_dir = snapshot.path
+        self.partitions = None
+        self.partition_cache = None
+        self._bboxes = None
+        self.claims_data = None
+        self.df = None
+        self.fragments = None
+        return True
+    
+    def write_snapshot(self, snapshot_dir):
+        """Write the loaded claims (columns, geometry and serialized fragments) as a snapshot."""
+        rows = [self._row_to_feature(row) for _, row in self.df.iterrows()]
+        fragments = self.fragments or [dumps_compact(feature) for feature in rows]
+        return write_snapshot(rows, snapshot_dir, fragments=fragments, source=self.geojson_file)
+    
+    def use_snapshot(self, snapshot_dir):
+        """Serve claims from a memory-mapped snapshot, writing it first if missing or stale."""
+        if not self.open_snapshot(snapshot_dir):
+            if self.snapshot is not None or self.partitions is not None:
+                # Mapped from another path or partitioned; materialize once before writing
+                self.df = self.snapshot_frame() if self.snapshot is not None else self.partition_frame()
+            if self.df is None or len(self.df) == 0:
+                return False
+            self.write_snapshot(snapshot_dir)
+            self.open_snapshot(snapshot_dir)
+        self.data_version += 1
+        return True
+    
+    def snapshot_frame(self):
+        """Build the claims DataFrame from the snapshot (column order as in the source file)."""
+        return self.snapshot.to_frame()
+    
+    def claim_count(self):
+        if self.partitions is not None:
+            return self.partitions.total
+        if self.snapshot is not None:
+            return self.snapshot.count
+        return len(self.df) if self.df is not None else 0
+    
+    def iter_claim_records(self):
+        """Claim properties (without geometry) as dicts, in dataset order."""
+        if self.partitions is not None:
+            for key in self.partitions.partitions:
+                yield from self.partition(key).iter_claim_records()
+            return
+        if self.snapshot is not None:
+            for row in range(self.snapshot.count):
+                yield self.snapshot.properties(row)
+            return
+        if self.df is not None and len(self.df) > 0:
+            for claim in self.df.drop(columns=['geometry'], errors='ignore').to_dict('records'):
+                yield claim
+    
+    def claim_tables(self, columns):
+        """Claim property tables in dataset order: the mapped snapshot(s), else ColumnTables of the columns.
+
+        Partition shards are mapped straight from their snapshots, outside the
+        partition cache; a shard without one is loaded once to build its table.
+        """
+        if self.partitions is not None:
+            tables = []
+            for key in self.partitions.partitions:
+                shard = self.partitions.file(key)
+                snapshot = FeatureSnapshot.open_if_fresh(snapshot_path(shard), shard)
+                tables.extend([snapshot] if snapshot is not None else self.partition(key).claim_tables(columns))
+            return tables
+        if self.snapshot is not None:
+            return [self.snapshot]
+        return [ColumnTable(self.iter_claim_records(), columns)]
+    
+    def filter_frame(self, filters=None):
+        """Rows of the claims DataFrame matching the provided filters."""
+        filtered_df = self.df
         
         if filters:
             # Apply filters
@@ -99,34 +319,43 @@ class FRAWebGISManager:
             if 'claim_area_max' in filters and filters['claim_area_max']:
                 max_area = float(filters['claim_area_max'])
                 filtered_df = filtered_df[filtered_df['claim_area_ha'] <= max_area]
-        
-        # Convert back to GeoJSON format
-        features = []
-        for _, row in filtered_df.iterrows():
-            # Clean properties to handle NaN values
-            properties = {}
-            for k, v in row.items():
-                if k != 'geometry':
-                    try:
-                        if pd.isna(v):
-                            properties[k] = None
-                        elif isinstance(v, (np.integer, np.floating)):
-                            if np.isnan(v):
-                                properties[k] = None
-                            else:
-                                properties[k] = float(v) if isinstance(v, np.floating) else int(v)
-                        else:
-                            properties[k] = v
-                    except (TypeError, ValueError):
-                        # Handle any other conversion issues
-                        properties[k] = str(v) if v is not None else None
             
-            feature = {
-                "type": "Feature",
-                "properties": properties,
-                "geometry": row['geometry']
-            }
-            features.append(feature)
+            if 'bbox' in filters and filters['bbox']:
+                in_bbox = bbox_mask(self.claim_bboxes(), filters['bbox'])
+                filtered_df = filtered_df[in_bbox[filtered_df.index.to_numpy()]]
+        
+        return filtered_df
+    
+    def claim_bboxes(self):
+        """(n, 4) bounding boxes of the claim geometries, by DataFrame position."""
+        if self.snapshot is not None:
+            return self.snapshot.bbox()
+        if self._bboxes is None:
+            self._bboxes = geometry_bboxes(self.df['geometry'].tolist() if 'geometry' in self.df else [])
+        return self._bboxes
+    
+    @staticmethod
+    def _row_to_feature(row):
+        """Convert a claims DataFrame row back to a GeoJSON feature (numpy values and NaN are left to the encoder)."""
+        return {
+            "type": "Feature",
+            "properties": {k: v for k, v in row.items() if k != 'geometry'},
+            "geometry": row['geometry']
+        }
+    
+    def get_filtered_claims(self, filters=None):
+        """Get filtered FRA claims based on provided filters."""
+        if self.partitions is not None:
+            features = []
+            for key in self.partition_keys(filters):
+                features.extend(self.partition(key).get_filtered_claims(filters)['features'])
+        elif self.snapshot is not None:
+            features = self.snapshot.features(self.filtered_positions(filters))
+        elif self.df is None or len(self.df) == 0:
+            return {"type": "FeatureCollection", "features": []}
+        else:
+            # Convert back to GeoJSON format
+            features = [self._row_to_feature(row) for _, row in self.filter_frame(filters).iterrows()]
         
         return {
             "type": "FeatureCollection",
@@ -137,28 +366,205 @@ class FRAWebGISManager:
             }
         }
     
+    def build_fragments(self):
+        """Pre-serialize every claim as a GeoJSON feature string, indexed by DataFrame position."""
+        if self.snapshot is not None or self.partitions is not None:
+            # Fragments live in the mapped snapshot or in each partition
+            return None
+        with self._fragments_lock:
+            if self.fragments is None and self.df is not None:
+                self.fragments = [dumps_compact(self._row_to_feature(row)) for _, row in self.df.iterrows()]
+        return self.fragments
+    
+    def snapshot_positions(self, filters=None):
+        """Same filters as filter_frame, evaluated on the snapshot's codes and numeric columns."""
+        snapshot = self.snapshot
+        mask = np.ones(snapshot.count, dtype=bool)
+        for key in ('state', 'district', 'village', 'fra_type', 'status', 'tribal_community'):
+            if filters and filters.get(key):
+                mask &= snapshot.equals(key, filters[key])
+        if filters and filters.get('claim_area_min'):
+            mask &= snapshot.numbers('claim_area_ha') >= float(filters['claim_area_min'])
+        if filters and filters.get('claim_area_max'):
+            mask &= snapshot.numbers('claim_area_ha') <= float(filters['claim_area_max'])
+        if filters and filters.get('bbox'):
+            mask &= bbox_mask(snapshot.bbox(), filters['bbox'])
+        return np.flatnonzero(mask)
+    
+    def filtered_positions(self, filters=None):
+        """DataFrame positions of the claims matching the provided filters (per partition when partitioned)."""
+        if self.partitions is not None:
+            return PartitionSelection((key, self.partition(key).filtered_positions(filters))
+                                      for key in self.partition_keys(filters))
+        if self.snapshot is not None:
+            return self.snapshot_positions(filters)
+        if self.df is None or len(self.df) == 0:
+            return []
+        return self.filter_frame(filters).index
+    
+    def render_filtered_claims(self, filters=None, extra=None, positions=None):
+        """Filtered claims as GeoJSON text, assembled from the pre-serialized fragments."""
+        return self.render_claims(filters, extra, positions)[0]
+    
+    def render_claims(self, filters=None, extra=None, positions=None):
+        """(GeoJSON text, number of claims) for the filtered claims."""
+        if self.claim_count() == 0:
+            return dumps_compact({"type": "FeatureCollection", "features": [], **(extra or {})}), 0
+        if positions is None and self.partitions is not None:
+            # One partition at a time, so a full scan never holds more than the budget
+            pieces, total = [], 0
+            for key in self.partition_keys(filters):
+                part = self.partition(key)
+                rows = part.filtered_positions(filters)
+                total += len(rows)
+                pieces.append(part.render_features(rows))
+            features = ','.join(piece for piece in pieces if piece)
+        else:
+            if positions is None:
+                positions = self.filtered_positions(filters)
+            total = len(positions)
+            features = self.render_features(positions)
+        head = {
+            "type": "FeatureCollection",
+            "properties": {
+                "total_claims": total,
+                "filters_applied": filters or {}
+            }
+        }
+        head.update(extra or {})
+        return '{"features":[' + features + '],' + dumps_compact(head)[1:], total
+    
+    def render_features(self, positions):
+        """Comma-joined serialized features at the given positions."""
+        if self.partitions is not None:
+            pieces = (self.partition(key).render_features(rows) for key, rows in positions)
+            return ','.join(piece for piece in pieces if piece)
+        if self.snapshot is not None:
+            return self.snapshot.join_fragments(positions).decode('utf-8')
+        fragments = self.build_fragments()
+        return ','.join(fragments[i] for i in positions)
+    
+    def get_filter_options(self):
+        """Distinct values for the claim filters."""
+        if self.claim_count() == 0:
+            return {}
+        if self.partitions is not None:
+            options = {}
+            for name, column in FILTER_OPTION_COLUMNS.items():
+                values = self.partitions.distinct_values(column)
+                if values is None:
+                    # Too many values to keep in the manifest; ask the partitions
+                    values = sorted({value for key in self.partitions.partitions
+                                     for value in self.partition(key).get_filter_options().get(name, [])})
+                options[name] = values
+            return options
+        if self.snapshot is not None:
+            values = self.snapshot.unique
+        else:
+            values = lambda column: sorted(self.df[column].unique().tolist())
+        return {name: values(column) for name, column in FILTER_OPTION_COLUMNS.items()}
+    
+    def _partition_record(self, method, value, columns):
+        """First match in partition order, opening only partitions whose id ranges could hold value."""
+        for key in self.partitions.candidates(value, columns):
+            record = getattr(self.partition(key), method)(value)
+            if record is not None:
+                return record
+        return None
+    
+    def _snapshot_record(self, columns, value):
+        """First claim whose value in any of the columns equals value, with its geometry."""
+        rows = [np.flatnonzero(self.snapshot.equals(column, value)) for column in columns
+                if column in self.snapshot.columns]
+        rows = [r[0] for r in rows if len(r)]
+        if not rows:
+            return None
+        row = int(min(rows))
+        record = self.snapshot.properties(row)
+        record['geometry'] = self.snapshot.geometry(row)
+        return record
+    
     def get_analytics(self):
         """Get comprehensive FRA analytics."""
-        try:
-            # Ensure all data is JSON serializable
-            import json
-            json.dumps(self.analytics_data)  # Test if it's serializable
-            return self.analytics_data
-        except (TypeError, ValueError) as e:
-            print(f"Analytics data not JSON serializable: {e}")
-            # Return a simplified version
-            return {
-                "summary": {
-                    "total_claims": len(self.df) if self.df is not None else 0,
-                    "claims_by_type": self.df['fra_type'].value_counts().to_dict() if self.df is not None and len(self.df) > 0 else {},
-                    "claims_by_status": self.df['status'].value_counts().to_dict() if self.df is not None and len(self.df) > 0 else {},
-                    "claims_by_state": self.df['state'].value_counts().to_dict() if self.df is not None and len(self.df) > 0 else {}
-                },
-                "error": "Analytics data simplified due to serialization issues"
+        return self.analytics_data
+    
+    def claim_analytics(self):
+        """Grouped counters over the loaded claims, built in one pass and kept until the next reload."""
+        with self._analytics_lock:
+            if self._claim_analytics is None or self._claim_analytics[0] != self.data_version:
+                self._claim_analytics = (self.data_version, ClaimAnalytics(self.iter_claim_records()))
+            return self._claim_analytics[1]
+    
+    @staticmethod
+    def _group_summary(groups):
+        return {
+            key: {
+                'total_claims': group.claims,
+                'claim_area_ha': round(group.area_ha, 2),
+                'approved_claims': group.approved,
+                'fra_type': group.type_counts()
+            }
+            for key, group in sorted(groups.items(), key=lambda item: str(item[0]))
+        }
+    
+    def get_state_wise_summary(self):
+        """Get state-wise summary of FRA claims."""
+        return self._group_summary(self.claim_analytics().states)
+    
+    def get_tribal_community_analysis(self):
+        """Get analysis by tribal community."""
+        return self._group_summary(self.claim_analytics().communities)
+    
+    def get_timeline_analysis(self):
+        """Get timeline analysis of FRA claims."""
+        analytics = self.claim_analytics()
+        if not analytics.total.claims:
+            return {}
+        
+        # Monthly analysis for current year
+        current_year = datetime.now().year
+        return {
+            'yearly': {
+                year: {
+                    'claims_submitted': group.claims,
+                    'claim_area_ha': round(group.area_ha, 2),
+                    'claims_approved': group.approved
+                }
+                for year, group in sorted(analytics.years.items())
+            },
+            'monthly': {
+                month: {'claims_submitted': group.claims, 'claim_area_ha': round(group.area_ha, 2)}
+                for (year, month), group in sorted(analytics.months.items()) if year == current_year
             }
+        }
+    
+    def get_performance_metrics(self):
+        """Get performance metrics for FRA implementation."""
+        analytics = self.claim_analytics()
+        total = analytics.total
+        if not total.claims:
+            return {}
+        
+        return {
+            'total_claims': total.claims,
+            'approved_claims': total.approved,
+            'pending_claims': total.pending,
+            'rejected_claims': total.rejected,
+            'approval_rate': round(total.approved / total.claims * 100, 2),
+            'pending_rate': round(total.pending / total.claims * 100, 2),
+            'total_area_ha': round(total.area_ha, 2),
+            'average_claim_size_ha': round(total.area_ha / total.claims, 2),
+            'field_verification_rate': round(analytics.field_verified / total.claims * 100, 2),
+            'gps_verification_rate': round(analytics.gps_verified / total.claims * 100, 2),
+            'processing_time_days': analytics.processing_time()
+        }
     
     def get_claim_details(self, claim_id):
         """Get detailed information for a specific claim."""
+        if self.partitions is not None:
+            return self._partition_record('get_claim_details', claim_id, ['claim_id'])
+        if self.snapshot is not None:
+            return self._snapshot_record(['claim_id'], claim_id)
         if self.df is None or len(self.df) == 0:
             return None
         
@@ -170,6 +576,10 @@ class FRAWebGISManager:
 
     def get_claim_by_polygon_id(self, polygon_id):
         """Lookup a feature by its claim_id/feature_id/fra_id for DSS."""
+        if self.partitions is not None:
+            return self._partition_record('get_claim_by_polygon_id', polygon_id, ['claim_id', 'feature_id', 'fra_id'])
+        if self.snapshot is not None:
+            return self._snapshot_record(['claim_id', 'feature_id', 'fra_id'], polygon_id)
         if self.df is None or len(self.df) == 0:
             return None
         candidates = self.df[(self.df['claim_id'] == polygon_id) |
@@ -206,9 +616,20 @@ def dss_rules_engine(attrs):
     return ordered
 
 
+@lru_cache(maxsize=None)
+def db_driver():
+    """psycopg2, imported on the first DB lookup instead of at app import (None if unavailable)."""
+    try:
+        import psycopg2  # type: ignore
+    except Exception:
+        return None
+    return psycopg2
+
+
 def load_polygon_attributes_from_db(polygon_id):
     db_url = os.getenv('DATABASE_URL')
-    if not db_url or psycopg2 is None:
+    psycopg2 = db_driver() if db_url else None
+    if psycopg2 is None:
         return None
     try:
         conn = psycopg2.connect(db_url)
@@ -234,6 +655,60 @@ def load_polygon_attributes_from_db(polygon_id):
         return None
 
 
+def load_all_polygon_attributes_from_db(polygon_ids=None, updated_since=None):
+    """Bulk variant of load_polygon_attributes_from_db: one query for every (or the given) polygon.
+
+    updated_since limits it to rows written at or after that updated_at.
+    """
+    db_url = os.getenv('DATABASE_URL')
+    psycopg2 = db_driver() if db_url else None
+    if psycopg2 is None:
+        return {}
+    query = "SELECT polygon_id, water_level, groundwater_index, soil_quality, crop_yield, forest_cover_percentage, poverty_index, infra_index FROM polygon_attributes"
+    try:
+        conn = psycopg2.connect(db_url)
+        with conn.cursor() as cur:
+            if polygon_ids is not None:
+                cur.execute(query + " WHERE polygon_id = ANY(%s)", (list(polygon_ids),))
+            elif updated_since is not None:
+                cur.execute(query + " WHERE updated_at >= %s", (updated_since,))
+            else:
+                cur.execute(query)
+            rows = cur.fetchall()
+        conn.close()
+    except Exception:
+        return {}
+    items = {}
+    for row in rows:
+        items[row[0]] = {
+            'water_level': row[1],
+            'groundwater_index': float(row[2]) if row[2] is not None else None,
+            'soil_quality': row[3],
+            'crop_yield': float(row[4]) if row[4] is not None else None,
+            'forest_cover_percentage': float(row[5]) if row[5] is not None else None,
+            'poverty_index': float(row[6]) if row[6] is not None else None,
+            'infra_index': float(row[7]) if row[7] is not None else None,
+        }
+    return items
+
+
+def polygon_attributes_db_version():
+    """(row count, latest updated_at) of the polygon_attributes table; None without a DB or updated_at column."""
+    db_url = os.getenv('DATABASE_URL')
+    psycopg2 = db_driver() if db_url else None
+    if psycopg2 is None:
+        return None
+    try:
+        conn = psycopg2.connect(db_url)
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*), max(updated_at) FROM polygon_attributes")
+            row = cur.fetchone()
+        conn.close()
+    except Exception:
+        return None
+    return tuple(row)
+
+
 def load_polygon_attributes_from_json(polygon_id):
     if not os.path.exists(POLY_ATTR_JSON):
         return None
@@ -245,17 +720,71 @@ def load_polygon_attributes_from_json(polygon_id):
         return None
 
 
-def load_all_schemes():
+def load_all_polygon_attributes_from_json(path=POLY_ATTR_JSON):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('items', {})
+    except Exception:
+        return {}
+
+
+def synthetic_polygon_attributes(polygon_id):
+    """Deterministic synthetic attributes (seeded by polygon id) for polygons without stored data."""
+    pid_seed = sum(ord(c) for c in str(polygon_id))
+    rng = random.Random(pid_seed)
+    soil_quality = rng.choice(['Poor', 'Moderate', 'Good'])
+    return {
+        'water_level': rng.randint(50, 200),
+        'groundwater_index': round(rng.uniform(0.3, 0.9), 2),
+        'soil_quality': soil_quality,
+        'crop_yield': round(rng.uniform(5, 25), 1),
+        'forest_cover_percentage': round(rng.uniform(20, 80), 1),
+        'poverty_index': round(rng.uniform(0, 1), 2),
+        'infra_index': round(rng.uniform(0, 1), 2)
+    }
+
+
+def resolve_polygon_attributes(polygon_id):
+    """Load attributes from DB or JSON fallback, else synthesize them."""
+    attrs = load_polygon_attributes_from_db(polygon_id) or load_polygon_attributes_from_json(polygon_id)
+    return attrs or synthetic_polygon_attributes(polygon_id)
+
+
+def build_recommendations(claim, attrs):
+    """Rules-engine recommendations enriched with state- and community-specific schemes."""
+    recommendations = dss_rules_engine(attrs)
+    state = claim.get('state')
+    if attrs.get('forest_cover_percentage', 0) > 40 and state == 'Odisha' and 'Ama Jungle Yojana' not in recommendations:
+        recommendations.append('Ama Jungle Yojana')
+    if ((attrs.get('water_level') or 999) < 80 or (attrs.get('groundwater_index') or 1) < 0.5) and state == 'Telangana' and 'Mission Kakatiya' not in recommendations:
+        recommendations.append('Mission Kakatiya')
+    if (attrs.get('poverty_index') or 0) > 0.6:
+        if state == 'Odisha' and 'KALIA' not in recommendations:
+            recommendations.append('KALIA')
+        if state == 'Telangana' and 'Rythu Bandhu' not in recommendations:
+            recommendations.append('Rythu Bandhu')
+    # Prefer community-based schemes for community polygons
+    fra_type = claim.get('fra_type') or claim.get('feature_type') or claim.get('claim_type')
+    if fra_type in ('Community Forest Resource Rights', 'Community Rights', 'CFR', 'CR'):
+        for name in ['OFSDP', 'Van Dhan Vikas Yojana', 'Mission Kakatiya']:
+            if name not in recommendations:
+                recommendations.append(name)
+    return recommendations
+
+
+def load_all_schemes(path=SCHEMES_FILE):
     try:
-        with open(SCHEMES_FILE, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception:
         return []
 
 
-def filter_applicable_schemes(claim_props, attrs):
-    """Filter central and state schemes by geography and sector relevance."""
-    state = claim_props.get('state')
+def polygon_sectors(claim_props, attrs):
+    """Sectors a polygon is relevant to, from its FRA type and attributes."""
     fra_type = claim_props.get('fra_type') or claim_props.get('feature_type') or claim_props.get('claim_type')
     sectors = set()
     # Determine sectors from fra_type and attributes
@@ -271,106 +800,746 @@ def filter_applicable_schemes(claim_props, attrs):
         sectors.add('Forest')
     if attrs.get('water_level', 999) < 100 or (attrs.get('groundwater_index') or 0) < 0.6:
         sectors.add('Water')
+    return sectors
 
-    schemes = load_all_schemes()
-    applicable = []
-    for s in schemes:
-        geo = s.get('geography', [])
-        if 'All-India' in geo or (state and state in geo):
-            if sectors.intersection(set(s.get('sectors', []))):
-                applicable.append(s)
-    return applicable
-    
-    def get_state_wise_summary(self):
-        """Get state-wise summary of FRA claims."""
-        if self.df is None or len(self.df) == 0:
-            return {}
-        
-        state_summary = self.df.groupby('state').agg({
-            'claim_id': 'count',
-            'claim_area_ha': 'sum',
-            'status': lambda x: (x == 'approved').sum(),
-            'fra_type': lambda x: x.value_counts().to_dict()
-        }).rename(columns={
-            'claim_id': 'total_claims',
-            'status': 'approved_claims'
-        })
-        
-        return state_summary.to_dict('index')
-    
-    def get_tribal_community_analysis(self):
-        """Get analysis by tribal community."""
-        if self.df is None or len(self.df) == 0:
-            return {}
-        
-        tribal_analysis = self.df.groupby('tribal_community').agg({
-            'claim_id': 'count',
-            'claim_area_ha': 'sum',
-            'status': lambda x: (x == 'approved').sum(),
-            'fra_type': lambda x: x.value_counts().to_dict()
-        }).rename(columns={
-            'claim_id': 'total_claims',
-            'status': 'approved_claims'
-        })
-        
-        return tribal_analysis.to_dict('index')
-    
-    def get_timeline_analysis(self):
-        """Get timeline analysis of FRA claims."""
-        if self.df is None or len(self.df) == 0:
-            return {}
-        
-        # Convert submission_date to datetime
-        self.df['submission_date'] = pd.to_datetime(self.df['submission_date'])
-        self.df['submission_year'] = self.df['submission_date'].dt.year
-        self.df['submission_month'] = self.df['submission_date'].dt.month
-        
-        # Yearly analysis
-        yearly = self.df.groupby('submission_year').agg({
-            'claim_id': 'count',
-            'claim_area_ha': 'sum',
-            'status': lambda x: (x == 'approved').sum()
-        }).rename(columns={
-            'claim_id': 'claims_submitted',
-            'status': 'claims_approved'
-        })
-        
-        # Monthly analysis for current year
-        current_year = datetime.now().year
-        monthly = self.df[self.df['submission_year'] == current_year].groupby('submission_month').agg({
-            'claim_id': 'count',
-            'claim_area_ha': 'sum'
-        }).rename(columns={'claim_id': 'claims_submitted'})
-        
+
+def scheme_applies(scheme, state, sectors):
+    """Whether a catalogue scheme covers the state and shares a sector."""
+    geo = scheme.get('geography', [])
+    if 'All-India' in geo or (state and state in geo):
+        return bool(sectors.intersection(set(scheme.get('sectors', []))))
+    return False
+
+
+def filter_applicable_schemes(claim_props, attrs):
+    """Filter central and state schemes by geography and sector relevance."""
+    state = claim_props.get('state')
+    sectors = polygon_sectors(claim_props, attrs)
+    return [s for s in load_all_schemes() if scheme_applies(s, state, sectors)]
+
+
+# Polygon sectors, one bit each in the matrix's uint8 sector column
+SECTOR_BITS = {'Forest': 1, 'Tribal Welfare': 2, 'Agriculture': 4, 'Water': 8}
+# Numeric polygon attributes kept per matrix row (soil_quality is coded separately)
+ATTRIBUTE_FIELDS = ('water_level', 'groundwater_index', 'crop_yield', 'forest_cover_percentage',
+                    'poverty_index', 'infra_index')
+# Claim columns the DSS indexes read: polygon ids, region, eligibility inputs and households
+DSS_ID_COLUMNS = ('claim_id', 'feature_id', 'fra_id', 'id')
+DSS_CLAIM_COLUMNS = DSS_ID_COLUMNS + (
+    'state', 'district', 'village', 'fra_type', 'claim_type', 'feature_type',
+    'applicant_type', 'total_households', 'beneficiary_households', 'community_members'
+)
+
+
+def sector_bits(sectors):
+    """Bit mask of the known sectors in a collection of sector names."""
+    bits = 0
+    for sector in sectors:
+        bits |= SECTOR_BITS.get(sector, 0)
+    return bits
+
+
+class PolygonSegment:
+    """One claim table (snapshot or ColumnTable) as rows offset..offset+count of the DSS matrix.
+
+    A row's polygon id is its first non-empty id column, as /dss resolves them.
+    first_rows maps each id column's dictionary codes to the first row taking
+    its id from that column, so an id lookup is a binary search and an array read.
+    """
+
+    def __init__(self, table, offset, id_columns):
+        self.table = table
+        self.offset = offset
+        self.count = table.count
+        self.id_columns = [column for column in id_columns if table.kind(column) in ('string', 'json')]
+        self.id_source = np.full(self.count, -1, dtype=np.int8)
+        for index in reversed(range(len(self.id_columns))):
+            codes = table.codes(self.id_columns[index])
+            present = codes >= 0
+            empty = table.dictionary(self.id_columns[index]).code_of('')
+            if empty is not None:
+                present &= codes != empty
+            self.id_source[present] = index
+        self.first_rows = []
+        for index, column in enumerate(self.id_columns):
+            rows = np.flatnonzero(self.id_source == index)
+            first = np.full(len(table.dictionary(column)), -1, dtype=np.int64)
+            codes, where = np.unique(table.codes(column)[rows], return_index=True)
+            first[codes] = rows[where]
+            self.first_rows.append(first)
+
+    def polygon_ids(self):
+        """Polygon id of every row (None without one), decoding each dictionary once."""
+        ids = [None] * self.count
+        for index, column in enumerate(self.id_columns):
+            values = self.table.dictionary(column).values()
+            rows = np.flatnonzero(self.id_source == index)
+            for row, code in zip(rows.tolist(), self.table.codes(column)[rows].tolist()):
+                ids[row] = values[code]
+        return ids
+
+    def polygon_id(self, row):
+        index = self.id_source[row]
+        if index < 0:
+            return None
+        column = self.id_columns[index]
+        return self.table.dictionary(column).decode(int(self.table.codes(column)[row]))
+
+    def row_of(self, polygon_id):
+        """First row with this polygon id, or None."""
+        rows = []
+        for column, first in zip(self.id_columns, self.first_rows):
+            code = self.table.dictionary(column).code_of(polygon_id)
+            if code is not None and first[code] >= 0:
+                rows.append(int(first[code]))
+        return min(rows) if rows else None
+
+    def claim(self, row, columns=DSS_CLAIM_COLUMNS):
+        """The DSS columns of one row as a dict."""
+        return {name: self.table.value(name, row) for name in columns}
+
+
+class SchemeEligibilityMatrix:
+    """Polygon x scheme eligibility matrix with forward and reverse lookup.
+
+    Rows are every DSS-addressable polygon (FRA claims first, then Vanachitra
+    features) in the row order of their claim tables: the mapped snapshots
+    where there are any, in-memory ColumnTables otherwise. Columns are scheme
+    names. A polygon is eligible for a scheme when the rules engine recommends
+    it or the catalogue filter (`filter_applicable_schemes`) admits it.
+
+    Everything kept per row is a NumPy array (eligibility and recommendation
+    flags, attributes, sector bits, households); ids, regions and FRA types
+    are read from the tables' dictionary-coded columns when needed. Rows whose
+    polygon id is empty or repeats an earlier one are inactive and never eligible.
+    """
+
+    def __init__(self, manager, vanachitra_file, schemes_file=SCHEMES_FILE, attrs_file=POLY_ATTR_JSON,
+                 poll_seconds=FRA_ATTRIBUTE_POLL_SECONDS):
+        self.manager = manager
+        self.vanachitra_file = vanachitra_file
+        self.schemes_file = schemes_file
+        self.attrs_file = attrs_file
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._built = False
+        self._claims_version = None
+        self._schemes_mtime = None
+        self._attrs_mtime = None
+        self._db_version = None
+        self._polled_at = 0.0
+        # Bumped when every row may have changed; single-row recomputes are logged in row_updates
+        self.version = 0
+        self.row_updates = []
+        self.segments = []
+        self._offsets = []
+        self.count = 0
+        self.active = np.zeros(0, dtype=bool)
+        self.stored = np.zeros(0, dtype=bool)
+        self.attributes = np.zeros((0, len(ATTRIBUTE_FIELDS)))
+        self.soil = np.zeros(0, dtype=np.int8)
+        self.soil_values = []
+        self.sectors = np.zeros(0, dtype=np.uint8)
+        self.households = np.zeros(0)
+        self.schemes = {}
+        self.scheme_names = []
+        self.scheme_columns = {}
+        self.recommended = np.zeros((0, 0), dtype=bool)
+        self.eligible = np.zeros((0, 0), dtype=bool)
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def _tables(self):
+        """(claim table, id columns) pairs in the order /dss resolves polygon ids."""
+        tables = [(table, ('claim_id',)) for table in self.manager.claim_tables(DSS_CLAIM_COLUMNS)]
+        vanachitra = cached_snapshot(self.vanachitra_file)
+        if vanachitra is None:
+            try:
+                with open(self.vanachitra_file, 'r', encoding='utf-8') as f:
+                    features = json.load(f).get('features', [])
+                vanachitra = ColumnTable((feat.get('properties', {}) for feat in features), DSS_CLAIM_COLUMNS)
+            except Exception:
+                vanachitra = None
+        if vanachitra is not None:
+            tables.append((vanachitra, DSS_ID_COLUMNS))
+        return tables
+
+    def _load_attributes(self):
+        items = dict(load_all_polygon_attributes_from_json(self.attrs_file))
+        items.update(load_all_polygon_attributes_from_db())
+        return items
+
+    def _segment(self, row):
+        segment = self.segments[bisect_right(self._offsets, row) - 1]
+        return segment, row - segment.offset
+
+    def polygon_id(self, row):
+        segment, local = self._segment(row)
+        return segment.polygon_id(local)
+
+    def row_of(self, polygon_id):
+        """Matrix row of a polygon id (its first occurrence), or None."""
+        for segment in self.segments:
+            local = segment.row_of(polygon_id)
+            if local is not None:
+                return segment.offset + local
+        return None
+
+    def claim(self, row):
+        """The DSS columns of a row's claim as a dict (built on demand, not kept)."""
+        segment, local = self._segment(row)
+        return segment.claim(local)
+
+    def describe(self, row, type_columns=('fra_type', 'feature_type', 'claim_type')):
+        """Polygon id, FRA type and location of a row, read from its claim table."""
+        segment, local = self._segment(row)
+        value = segment.table.value
+        fra_type = None
+        for column in type_columns:
+            fra_type = fra_type or value(column, local)
         return {
-            'yearly': yearly.to_dict('index'),
-            'monthly': monthly.to_dict('index')
+            'polygon_id': segment.polygon_id(local),
+            'fra_type': fra_type,
+            'state': value('state', local),
+            'district': value('district', local),
+            'village': value('village', local)
         }
-    
-    def get_performance_metrics(self):
-        """Get performance metrics for FRA implementation."""
-        if self.df is None or len(self.df) == 0:
-            return {}
-        
-        total_claims = len(self.df)
-        approved_claims = len(self.df[self.df['status'] == 'approved'])
-        pending_claims = len(self.df[self.df['status'].isin(['submitted', 'under_review', 'field_verification'])])
-        
+
+    def column_mask(self, column, value):
+        """Rows whose claim column equals value, from the tables' coded columns."""
+        if not self.segments:
+            return np.zeros(0, dtype=bool)
+        return np.concatenate([segment.table.equals(column, value) for segment in self.segments])
+
+    def region_mask(self, state=None, district=None, fra_type=None):
+        """Rows in the state and district whose fra_type, claim_type or feature_type matches (None without filters)."""
+        if not (state or district or fra_type):
+            return None
+        mask = np.ones(self.count, dtype=bool)
+        if state:
+            mask &= self.column_mask('state', state)
+        if district:
+            mask &= self.column_mask('district', district)
+        if fra_type:
+            mask &= (self.column_mask('fra_type', fra_type) | self.column_mask('claim_type', fra_type) |
+                     self.column_mask('feature_type', fra_type))
+        return mask
+
+    def _column(self, name):
+        """Column of a scheme, adding an empty one the first time the name is seen."""
+        column = self.scheme_columns.get(name)
+        if column is None:
+            column = self.scheme_columns[name] = len(self.scheme_names)
+            self.scheme_names.append(name)
+            self.recommended = np.pad(self.recommended, ((0, 0), (0, 1)))
+            self.eligible = np.pad(self.eligible, ((0, 0), (0, 1)))
+        return column
+
+    def _encode_attributes(self, attrs):
+        values = [_number_or_none(attrs.get(field)) for field in ATTRIBUTE_FIELDS]
+        return np.array([np.nan if v is None else v for v in values]), attrs.get('soil_quality')
+
+    def _attributes_changed(self, row, attrs):
+        values, soil = self._encode_attributes(attrs)
+        current = self.soil_values[self.soil[row]] if self.soil[row] >= 0 else None
+        return soil != current or not np.array_equal(values, self.attributes[row], equal_nan=True)
+
+    def _set_attributes(self, row, attrs):
+        values, soil = self._encode_attributes(attrs)
+        self.attributes[row] = values
+        if soil is not None and soil not in self.soil_values:
+            self.soil_values.append(soil)
+        self.soil[row] = self.soil_values.index(soil) if soil is not None else -1
+
+    def row_attributes(self, row):
+        """A row's attributes as a dict, the way the rules engine reads them (missing ones left out)."""
+        attrs = {field: value for field, value in zip(ATTRIBUTE_FIELDS, self.attributes[row].tolist())
+                 if value == value}
+        if self.soil[row] >= 0:
+            attrs['soil_quality'] = self.soil_values[self.soil[row]]
+        return attrs
+
+    def _compute_rules(self, row, attrs, claim):
+        """Store a row's attributes and set its sectors and rules-engine recommendations."""
+        self._set_attributes(row, attrs)
+        attrs = self.row_attributes(row)
+        sectors = polygon_sectors(claim, attrs)
+        columns = [self._column(name) for name in build_recommendations(claim, attrs)]
+        self.sectors[row] = sector_bits(sectors)
+        self.recommended[row] = False
+        self.recommended[row, columns] = True
+        return sectors
+
+    def _compute_row(self, row, attrs):
+        """(Re)compute one polygon's eligibility row in place."""
+        claim = self.claim(row)
+        sectors = self._compute_rules(row, attrs, claim)
+        self.eligible[row] = self.recommended[row]
+        for name, scheme in self.schemes.items():
+            if scheme_applies(scheme, claim.get('state'), sectors):
+                self.eligible[row, self._column(name)] = True
+        self.row_updates.append(row)
+        if len(self.row_updates) > max(1024, self.count):
+            # Cheaper for readers to rebuild than to replay a log this long
+            self.row_updates = []
+            self.version += 1
+
+    def _catalogue_rows(self, scheme):
+        """Rows the catalogue filter admits for a scheme: in its geography and sharing a sector."""
+        geography = scheme.get('geography', [])
+        if 'All-India' in geography:
+            rows = self.active.copy()
+        else:
+            rows = np.zeros(self.count, dtype=bool)
+            for state in geography:
+                if state:
+                    rows |= self.column_mask('state', state)
+            rows &= self.active
+        return rows & ((self.sectors & sector_bits(scheme.get('sectors', []))) != 0)
+
+    def _build(self):
+        self.segments, offset = [], 0
+        for table, id_columns in self._tables():
+            self.segments.append(PolygonSegment(table, offset, id_columns))
+            offset += table.count
+        self._offsets = [segment.offset for segment in self.segments]
+        n = self.count = offset
+        self.active = np.zeros(n, dtype=bool)
+        self.stored = np.zeros(n, dtype=bool)
+        self.attributes = np.full((n, len(ATTRIBUTE_FIELDS)), np.nan)
+        self.soil = np.full(n, -1, dtype=np.int8)
+        self.soil_values = []
+        self.sectors = np.zeros(n, dtype=np.uint8)
+        self.households = np.full(n, np.nan)
+        self.schemes = {s.get('name'): s for s in load_all_schemes(self.schemes_file)}
+        self.scheme_names = list(self.schemes)
+        self.scheme_columns = {name: column for column, name in enumerate(self.scheme_names)}
+        self.recommended = np.zeros((n, len(self.scheme_names)), dtype=bool)
+
+        # Taken before the read, so rows written meanwhile are picked up by the next poll
+        self._db_version = polygon_attributes_db_version()
+        self._polled_at = time.monotonic()
+        stored = self._load_attributes()
+        seen = set()
+        for segment in self.segments:
+            # Decoded columns of one table at a time; dropped once its rows are computed
+            columns = {name: segment.table.column_values(name) for name in DSS_CLAIM_COLUMNS
+                       if name not in DSS_ID_COLUMNS}
+            for local, polygon_id in enumerate(segment.polygon_ids()):
+                # Duplicate ids resolve to the first match, as in /dss
+                if not polygon_id or polygon_id in seen:
+                    continue
+                seen.add(polygon_id)
+                row = segment.offset + local
+                claim = {name: values[local] for name, values in columns.items()}
+                households = claim_households(claim)
+                if households is not None:
+                    self.households[row] = households
+                attrs = stored.get(polygon_id)
+                self.active[row] = True
+                self.stored[row] = bool(attrs)
+                self._compute_rules(row, attrs or synthetic_polygon_attributes(polygon_id), claim)
+        self.eligible = self.recommended.copy()
+        for name, scheme in self.schemes.items():
+            self.eligible[:, self.scheme_columns[name]] |= self._catalogue_rows(scheme)
+        self.row_updates = []
+        self.version += 1
+
+        self._claims_version = self.manager.data_version
+        self._schemes_mtime = self._mtime(self.schemes_file)
+        self._attrs_mtime = self._mtime(self.attrs_file)
+        self._built = True
+        print(f"Built eligibility matrix: {int(self.active.sum())} polygons x "
+              f"{int(self.eligible.any(axis=0).sum())} schemes")
+
+    def _refresh_catalogue(self):
+        """Recompute only the scheme columns whose catalogue entry changed."""
+        new = {s.get('name'): s for s in load_all_schemes(self.schemes_file)}
+        changed = {name for name in set(self.schemes) | set(new) if self.schemes.get(name) != new.get(name)}
+        self.schemes = new
+        for name in changed:
+            column = self._column(name)
+            # Rules-engine recommendations keep their cells regardless of the catalogue
+            rows = self.recommended[:, column].copy()
+            if name in new:
+                rows |= self._catalogue_rows(new[name])
+            self.eligible[:, column] = rows
+
+    def _apply_attributes(self, polygon_id, attrs):
+        """Store a polygon's attributes, recomputing its row only if they changed; returns its row."""
+        row = self.row_of(polygon_id)
+        if row is None or not attrs:
+            return None
+        self.stored[row] = True
+        if self._attributes_changed(row, attrs):
+            self._compute_row(row, attrs)
+        return row
+
+    def _refresh_attributes(self):
+        """Recompute only the rows whose stored attributes changed."""
+        stored = self._load_attributes()
+        kept = np.zeros(self.count, dtype=bool)
+        for polygon_id, attrs in stored.items():
+            row = self._apply_attributes(polygon_id, attrs)
+            if row is not None:
+                kept[row] = True
+        for row in np.flatnonzero(self.stored & ~kept).tolist():
+            # Dropped from the stores: back to the synthetic attributes
+            self.stored[row] = False
+            attrs = synthetic_polygon_attributes(self.polygon_id(row))
+            if self._attributes_changed(row, attrs):
+                self._compute_row(row, attrs)
+
+    def _poll_database(self):
+        """Apply the polygon_attributes rows written since the last poll (all rows if some were deleted)."""
+        self._polled_at = time.monotonic()
+        version = polygon_attributes_db_version()
+        if version is None or version == self._db_version:
+            return
+        previous, self._db_version = self._db_version, version
+        if previous is None or version[0] < previous[0]:
+            self._refresh_attributes()
+            return
+        for polygon_id, attrs in load_all_polygon_attributes_from_db(updated_since=previous[1]).items():
+            self._apply_attributes(polygon_id, attrs)
+
+    def refresh(self):
+        """Bring the matrix up to date with the claims, attributes and scheme catalogue.
+
+        Changes to the attributes JSON and the catalogue are noticed by mtime;
+        the polygon_attributes table is polled every poll_seconds.
+        """
+        with self._lock:
+            if not self._built or self._claims_version != self.manager.data_version:
+                self._build()
+                return
+            schemes_mtime = self._mtime(self.schemes_file)
+            if schemes_mtime != self._schemes_mtime:
+                self._refresh_catalogue()
+                self._schemes_mtime = schemes_mtime
+            attrs_mtime = self._mtime(self.attrs_file)
+            if attrs_mtime != self._attrs_mtime:
+                self._refresh_attributes()
+                self._attrs_mtime = attrs_mtime
+            if self.poll_seconds is not None and time.monotonic() - self._polled_at >= self.poll_seconds:
+                self._poll_database()
+
+    def update_attributes(self, polygon_id, attrs):
+        """Apply new attributes for a single polygon written in this process; False if it is unknown."""
+        self.refresh()
+        with self._lock:
+            return self._apply_attributes(polygon_id, attrs) is not None
+
+    def scheme_column(self, scheme_name):
+        """Eligibility flags of every row for a scheme (all False for an unknown one)."""
+        column = self.scheme_columns.get(scheme_name)
+        if column is None:
+            return np.zeros(self.count, dtype=bool)
+        return self.eligible[:, column]
+
+    def scheme_names_in_use(self):
+        """Catalogue schemes plus every scheme some polygon is eligible for, sorted."""
+        used = self.eligible.any(axis=0)
+        return sorted({name for name, column in self.scheme_columns.items() if used[column]} | set(self.schemes))
+
+    def schemes_for_polygon(self, polygon_id):
+        self.refresh()
+        with self._lock:
+            row = self.row_of(polygon_id)
+            if row is None:
+                return None
+            return sorted(self.scheme_names[column] for column in np.flatnonzero(self.eligible[row]).tolist())
+
+    def has_scheme(self, scheme_name):
+        self.refresh()
+        with self._lock:
+            return scheme_name in self.schemes or bool(self.scheme_column(scheme_name).any())
+
+    def polygons_for_scheme(self, scheme_name, state=None, page=1, per_page=50):
+        """Paginated reverse lookup: polygons eligible for a scheme, optionally within a state."""
+        self.refresh()
+        with self._lock:
+            rows = self.scheme_column(scheme_name)
+            if state:
+                rows = rows & self.column_mask('state', state)
+            rows = np.flatnonzero(rows)
+            start = (page - 1) * per_page
+            items = [self.describe(row) for row in rows[start:start + per_page].tolist()]
         return {
-            'total_claims': total_claims,
-            'approved_claims': approved_claims,
-            'pending_claims': pending_claims,
-            'rejected_claims': len(self.df[self.df['status'] == 'rejected']),
-            'approval_rate': round(approved_claims / total_claims * 100, 2) if total_claims > 0 else 0,
-            'pending_rate': round(pending_claims / total_claims * 100, 2) if total_claims > 0 else 0,
-            'total_area_ha': round(self.df['claim_area_ha'].sum(), 2),
-            'average_claim_size_ha': round(self.df['claim_area_ha'].mean(), 2),
-            'field_verification_rate': round(len(self.df[self.df['field_verification_done']]) / total_claims * 100, 2) if total_claims > 0 else 0,
-            'gps_verification_rate': round(len(self.df[self.df['gps_coordinates_verified']]) / total_claims * 100, 2) if total_claims > 0 else 0
+            'scheme': scheme_name,
+            'state': state,
+            'total': len(rows),
+            'page': page,
+            'per_page': per_page,
+            'pages': (len(rows) + per_page - 1) // per_page,
+            'polygons': items
         }
 
-# Initialize FRA manager
-fra_manager = FRAWebGISManager(FRA_GEOJSON_FILE, FRA_ANALYTICS_FILE)
+def find_dss_claims(polygon_ids):
+    """Resolve polygon ids to claim properties: FRA dataset first, then the raw Vanachitra GeoJSON."""
+    claims = {}
+    for polygon_id in polygon_ids:
+        claim = fra_manager.get_claim_details(polygon_id) or fra_manager.get_claim_by_polygon_id(polygon_id)
+        if claim:
+            claims[polygon_id] = claim
+    missing = set(polygon_ids) - set(claims)
+    if missing:
+        # Try scanning the raw GeoJSON for non-tabular ids
+        try:
+            with open(VANACHITRA_FRA_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for feat in data.get('features', []):
+                props = feat.get('properties', {})
+                for key in (props.get('claim_id'), props.get('feature_id'), props.get('fra_id'), props.get('id')):
+                    if key in missing:
+                        claims[key] = props
+                        missing.discard(key)
+                if not missing:
+                    break
+        except Exception:
+            pass
+    return claims
+
+
+def find_dss_claim(polygon_id):
+    return find_dss_claims([polygon_id]).get(polygon_id)
+
+
+def build_dss_report(polygon_id, claim, attrs):
+    """DSS payload for one polygon: attributes, metadata, recommendations and applicable schemes."""
+    return {
+        'polygon_id': polygon_id,
+        'attributes': attrs,
+        'metadata': {
+            'fra_type': claim.get('fra_type') or claim.get('feature_type') or claim.get('claim_type'),
+            'state': claim.get('state'),
+            'district': claim.get('district'),
+            'village': claim.get('village'),
+            'households': claim.get('total_households') or claim.get('beneficiary_households'),
+            'area_hectares': claim.get('area_claimed') or claim.get('area_hectares')
+        },
+        'recommendations': build_recommendations(claim, attrs),
+        'applicable_schemes': filter_applicable_schemes(claim, attrs)
+    }
+
+
+def build_dss_batch(polygon_ids, stored_attrs=None):
+    """DSS reports for many polygons, reading the attribute stores once for the whole batch."""
+    claims = find_dss_claims(polygon_ids)
+    if stored_attrs is None:
+        stored_attrs = dict(load_all_polygon_attributes_from_json())
+        stored_attrs.update(load_all_polygon_attributes_from_db(list(claims)))
+    results = []
+    not_found = []
+    for polygon_id in polygon_ids:
+        claim = claims.get(polygon_id)
+        if not claim:
+            not_found.append(polygon_id)
+            continue
+        attrs = stored_attrs.get(polygon_id) or synthetic_polygon_attributes(polygon_id)
+        results.append(build_dss_report(polygon_id, claim, attrs))
+    return {'results': results, 'not_found': not_found}
+
+# Weights of the multi-criteria priority score; each criterion is scaled to 0-1, higher = needier
+PRIORITY_WEIGHTS = {
+    'poverty': 0.4,
+    'infrastructure_gap': 0.2,
+    'groundwater_stress': 0.2,
+    'households': 0.2
+}
+
+
+def _number_or_none(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else value
+
+
+def claim_households(claim):
+    """Households a polygon serves: recorded counts, community size, or one for individual claims."""
+    for key in ('total_households', 'beneficiary_households', 'community_members'):
+        value = _number_or_none(claim.get(key))
+        if value is not None:
+            return value
+    fra_type = claim.get('claim_type') or claim.get('fra_type')
+    if fra_type in ('IFR', 'Individual Forest Rights') or claim.get('applicant_type') == 'Individual':
+        return 1.0
+    return None
+
+
+def top_rows(rows, scores, k):
+    """The k of the (ascending) rows with the highest scores, ties to the lower row, best first.
+
+    Only the selected rows are sorted; the rest are split off with a partition.
+    """
+    if len(rows) > k:
+        values = scores[rows]
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        above = rows[values > threshold]
+        rows = np.concatenate([above, rows[values == threshold][:k - len(above)]])
+    return rows[np.lexsort((rows, -scores[rows]))]
+
+
+class PriorityRanker:
+    """Top-K neediest eligible polygons per scheme and region.
+
+    Criterion and score arrays are computed from the eligibility matrix's
+    attribute and household columns. They are rebuilt when the matrix is
+    rebuilt and patched row by row when single polygons are recomputed;
+    queries select from the eligible rows of the region with a partition
+    instead of sorting the dataset.
+    """
+
+    criteria = ('poverty', 'infrastructure_gap', 'groundwater_stress', 'households')
+
+    def __init__(self, matrix, weights=None):
+        self.matrix = matrix
+        self.weights = dict(weights or PRIORITY_WEIGHTS)
+        self._lock = threading.Lock()
+        self._version = None
+        self._applied = 0
+        self._max_households = 0
+        self.components = np.zeros((0, len(self.criteria)))
+        self.scores = np.zeros(0)
+
+    def _weight_vector(self, weights):
+        return np.array([weights.get(c, 0.0) for c in self.criteria], dtype=float)
+
+    def _components(self, rows):
+        """Criterion values of the given rows (a slice or index array) of the matrix."""
+        attributes = self.matrix.attributes[rows]
+        poverty = attributes[:, ATTRIBUTE_FIELDS.index('poverty_index')]
+        infra = attributes[:, ATTRIBUTE_FIELDS.index('infra_index')]
+        groundwater = attributes[:, ATTRIBUTE_FIELDS.index('groundwater_index')]
+        log_households = np.log1p(self.matrix.households[rows])
+        components = np.column_stack([
+            np.clip(poverty, 0, 1),
+            1 - np.clip(infra, 0, 1),
+            1 - np.clip(groundwater, 0, 1),
+            log_households / self._max_households if self._max_households > 0 else np.zeros(len(attributes))
+        ])
+        # Unknown criteria count as neutral rather than excluding the polygon
+        return np.where(np.isnan(components), 0.5, components)
+
+    def _rebuild(self):
+        m = self.matrix
+        log_households = np.log1p(m.households)
+        self._max_households = np.nanmax(log_households) if not np.all(np.isnan(log_households)) else 0
+        self.components = self._components(slice(None))
+        self.scores = self.components @ self._weight_vector(self.weights)
+        self._version = m.version
+        self._applied = len(m.row_updates)
+
+    def _sync(self):
+        """Catch up with the matrix (its lock held): rebuild after a rebuild, else patch the recomputed rows."""
+        m = self.matrix
+        if self._version != m.version:
+            self._rebuild()
+        elif self._applied < len(m.row_updates):
+            # Households come from the claims, so their scale only changes on a rebuild
+            rows = np.unique(m.row_updates[self._applied:])
+            self.components[rows] = self._components(rows)
+            self.scores[rows] = self.components[rows] @ self._weight_vector(self.weights)
+            self._applied = len(m.row_updates)
+
+    def refresh(self):
+        self.matrix.refresh()
+        with self.matrix._lock, self._lock:
+            self._sync()
+
+    def top_k(self, schemes=None, k=50, state=None, district=None, fra_type=None, weights=None):
+        """Top-k polygons for each scheme, restricted to the region and FRA type."""
+        m = self.matrix
+        m.refresh()
+        # The matrix lock keeps eligibility and attributes still while the rankings are read
+        with m._lock, self._lock:
+            self._sync()
+            scores = self.scores
+            if weights:
+                merged = dict(self.weights, **weights)
+                scores = self.components @ self._weight_vector(merged)
+            region = m.region_mask(state, district, fra_type)
+            if not schemes:
+                schemes = m.scheme_names_in_use()
+            rankings = {}
+            for scheme in schemes:
+                eligible = m.scheme_column(scheme)
+                candidates = np.flatnonzero(eligible if region is None else eligible & region)
+                top = []
+                for rank, row in enumerate(top_rows(candidates, scores, k).tolist(), start=1):
+                    polygon = m.describe(row, type_columns=('fra_type', 'claim_type', 'feature_type'))
+                    top.append({
+                        'rank': rank,
+                        'polygon_id': polygon['polygon_id'],
+                        'score': round(float(scores[row]), 4),
+                        'criteria': dict(zip(self.criteria, (round(float(v), 4) for v in self.components[row]))),
+                        'fra_type': polygon['fra_type'],
+                        'state': polygon['state'],
+                        'district': polygon['district'],
+                        'village': polygon['village']
+                    })
+                rankings[scheme] = {'eligible_polygons': len(candidates), 'top': top}
+        return rankings
+
+# Initialize FRA manager; the claims are loaded by the startup loader, not at import
+fra_manager = FRAWebGISManager(FRA_GEOJSON_FILE, FRA_ANALYTICS_FILE, snapshot_dir=FRA_SNAPSHOT_DIR,
+                               partition_manifest=FRA_PARTITION_MANIFEST, load=False)
+eligibility_matrix = SchemeEligibilityMatrix(fra_manager, VANACHITRA_FRA_FILE)
+priority_ranker = PriorityRanker(eligibility_matrix)
+
+
+def load_datasets():
+    """Load the claims and build the serialized fragments.
+
+    The DSS eligibility matrix and priority ranker are built on the first
+    /api/schemes or /api/dss/priority request, so partitioned claims stay
+    unloaded until a partition is actually asked for.
+    """
+    fra_manager.load_data()
+    fra_manager.build_fragments()
+
+
+startup = DeferredStartup('fra-webgis', load_datasets)
+metrics.add_cache('snapshots', snapshot_cache_stats)
+metrics.add_cache('fra_partitions', lambda: fra_manager.partition_cache.stats() if fra_manager.partition_cache else None)
+metrics.add_gauge('app_ready', 'Datasets loaded (1) or still loading (0).', lambda: int(startup.ready))
+# Pages, static files, metrics and profiles are served while the datasets are still loading
+STARTUP_EXEMPT_ENDPOINTS = {
+    'readiness', 'metrics', 'list_profiles', 'get_profile', 'static', 'serve_static', 'serve_react_css',
+    'serve_react_js', 'serve_react_images', 'index', 'webgis', 'india_webgis', 'enhanced_webgis', 'vanachitra', 'test_page', 'react_upload'
+}
+
+
+def warm_up():
+    """Load the datasets ahead of the first request."""
+    startup.ensure_ready()
+
+
+@app.before_request
+def wait_for_datasets():
+    """Hold data requests until the startup loader has finished (running it here if nobody started it)."""
+    if request.endpoint not in STARTUP_EXEMPT_ENDPOINTS:
+        startup.ensure_ready()
+
+
+# Registered after the startup hook so profiles cover the view, not the dataset load
+profiler = RequestProfiler(app, enabled=FRA_PROFILING, secret=FRA_PROFILE_SECRET, keep=FRA_PROFILE_KEEP)
+
+
+@app.route('/api/ready')
+def readiness():
+    """Readiness probe: 200 once the datasets are loaded, 503 (and a background warm-up) until then."""
+    status = startup.status()
+    if not status['ready']:
+        startup.start()
+    return jsonify(status), 200 if status['ready'] else 503
 
 @app.route('/')
 def index():
@@ -400,124 +1569,145 @@ def vanachitra():
 @app.route('/dss/<polygon_id>')
 def dss_details(polygon_id):
     """Decision Support System: show attributes and recommendations for a polygon."""
-    # Load polygon properties from FRA dataset
-    claim = fra_manager.get_claim_details(polygon_id) or fra_manager.get_claim_by_polygon_id(polygon_id)
-    if not claim:
-        # Try scanning the raw GeoJSON for non-tabular ids
-        try:
-            with open(VANACHITRA_FRA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            for feat in data.get('features', []):
-                props = feat.get('properties', {})
-                if polygon_id in (
-                    props.get('claim_id'), props.get('feature_id'), props.get('fra_id'), props.get('id')
-                ):
-                    claim = props
-                    break
-        except Exception:
-            claim = None
-
+    claim = find_dss_claim(polygon_id)
     if not claim:
         return jsonify({'error': 'Polygon not found'}), 404
 
-    # Load attributes from DB or JSON fallback
-    attrs = load_polygon_attributes_from_db(polygon_id) or load_polygon_attributes_from_json(polygon_id)
-
-    # If still missing, generate deterministic synthetic attributes (seeded by polygon id)
-    if not attrs:
-        pid_seed = sum(ord(c) for c in str(polygon_id))
-        rng = random.Random(pid_seed)
-        soil_quality = rng.choice(['Poor', 'Moderate', 'Good'])
-        attrs = {
-            'water_level': rng.randint(50, 200),
-            'groundwater_index': round(rng.uniform(0.3, 0.9), 2),
-            'soil_quality': soil_quality,
-            'crop_yield': round(rng.uniform(5, 25), 1),
-            'forest_cover_percentage': round(rng.uniform(20, 80), 1),
-            'poverty_index': round(rng.uniform(0, 1), 2),
-            'infra_index': round(rng.uniform(0, 1), 2)
-        }
-
-    recommendations = dss_rules_engine(attrs)
-    applicable_schemes = filter_applicable_schemes(claim, attrs)
-    # Enrich recommendations with state-specific where applicable
-    state = claim.get('state')
-    if attrs.get('forest_cover_percentage', 0) > 40 and state == 'Odisha' and 'Ama Jungle Yojana' not in recommendations:
-        recommendations.append('Ama Jungle Yojana')
-    if ((attrs.get('water_level') or 999) < 80 or (attrs.get('groundwater_index') or 1) < 0.5) and state == 'Telangana' and 'Mission Kakatiya' not in recommendations:
-        recommendations.append('Mission Kakatiya')
-    if (attrs.get('poverty_index') or 0) > 0.6:
-        if state == 'Odisha' and 'KALIA' not in recommendations:
-            recommendations.append('KALIA')
-        if state == 'Telangana' and 'Rythu Bandhu' not in recommendations:
-            recommendations.append('Rythu Bandhu')
-    # Prefer community-based schemes for community polygons
-    fra_type = claim.get('fra_type') or claim.get('feature_type') or claim.get('claim_type')
-    if fra_type in ('Community Forest Resource Rights', 'Community Rights', 'CFR', 'CR'):
-        for name in ['OFSDP', 'Van Dhan Vikas Yojana', 'Mission Kakatiya']:
-            if name not in recommendations:
-                recommendations.append(name)
+    # Load attributes from DB or JSON fallback, else deterministic synthetic attributes
+    attrs = resolve_polygon_attributes(polygon_id)
+    report = build_dss_report(polygon_id, claim, attrs)
 
     # API response if JSON requested
     if request.args.get('format') == 'json' or request.headers.get('Accept') == 'application/json':
-        return jsonify({
-            'polygon_id': polygon_id,
-            'attributes': attrs,
-            'metadata': {
-                'fra_type': claim.get('fra_type') or claim.get('feature_type') or claim.get('claim_type'),
-                'state': claim.get('state'),
-                'district': claim.get('district'),
-                'village': claim.get('village'),
-                'households': claim.get('total_households') or claim.get('beneficiary_households'),
-                'area_hectares': claim.get('area_claimed') or claim.get('area_hectares')
-            },
-            'recommendations': recommendations,
-            'applicable_schemes': applicable_schemes
-        })
+        return jsonify(report)
 
     # Render dashboard
     return render_template('dss_details.html',
                            polygon_id=polygon_id,
-                           attrs=attrs,
-                           recs=recommendations,
-                           schemes=applicable_schemes,
-                           meta={
-                               'fra_type': claim.get('fra_type') or claim.get('feature_type') or claim.get('claim_type'),
-                               'state': claim.get('state'),
-                               'district': claim.get('district'),
-                               'village': claim.get('village'),
-                               'households': claim.get('total_households') or claim.get('beneficiary_households'),
-                               'area_hectares': claim.get('area_claimed') or claim.get('area_hectares')
-                           })
+                           attrs=report['attributes'],
+                           recs=report['recommendations'],
+                           schemes=report['applicable_schemes'],
+                           meta=report['metadata'])
+
+@app.route('/api/dss/batch', methods=['GET', 'POST'])
+def dss_batch():
+    """API endpoint for DSS reports of many polygons in one request."""
+    try:
+        if request.method == 'POST':
+            polygon_ids = (request.get_json(silent=True) or {}).get('polygon_ids', [])
+        else:
+            polygon_ids = [pid for pid in request.args.get('ids', '').split(',') if pid]
+        if not isinstance(polygon_ids, list) or not polygon_ids:
+            return jsonify({'error': 'Provide polygon_ids (POST JSON) or ids (comma-separated query)'}), 400
+        if len(polygon_ids) > DSS_BATCH_LIMIT:
+            return jsonify({'error': f'At most {DSS_BATCH_LIMIT} polygons per batch'}), 400
+        return jsonify(build_dss_batch(polygon_ids))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/schemes/<path:scheme_name>/polygons')
+def get_scheme_polygons(scheme_name):
+    """API endpoint for the reverse DSS lookup: polygons eligible for a scheme."""
+    try:
+        if not eligibility_matrix.has_scheme(scheme_name):
+            return jsonify({'error': f'Scheme not found: {scheme_name}'}), 404
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(500, max(1, request.args.get('per_page', 50, type=int)))
+        result = eligibility_matrix.polygons_for_scheme(
+            scheme_name, state=request.args.get('state'), page=page, per_page=per_page
+        )
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/dss/priority')
+def get_priority_ranking():
+    """API endpoint for the top-K neediest eligible polygons per scheme and region."""
+    try:
+        k = min(1000, max(1, request.args.get('k', 50, type=int)))
+        schemes = [s for name in request.args.getlist('scheme') for s in name.split(',') if s]
+        weights = {c: request.args.get(f'w_{c}', type=float) for c in PriorityRanker.criteria}
+        weights = {c: w for c, w in weights.items() if w is not None}
+        rankings = priority_ranker.top_k(
+            schemes=schemes or None,
+            k=k,
+            state=request.args.get('state'),
+            district=request.args.get('district'),
+            fra_type=request.args.get('fra_type'),
+            weights=weights or None
+        )
+        return jsonify({
+            'k': k,
+            'region': {
+                'state': request.args.get('state'),
+                'district': request.args.get('district'),
+                'fra_type': request.args.get('fra_type')
+            },
+            'weights': dict(priority_ranker.weights, **weights),
+            'rankings': rankings
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/vanachitra_fra_data')
 def api_vanachitra_fra_data():
     """Serve Vanachitra.AI FRA data as GeoJSON."""
     try:
+        snapshot = cached_snapshot(VANACHITRA_FRA_FILE)
+        if snapshot is not None:
+            metrics.count_features(snapshot.count)
+            return Response(render_collection(snapshot), mimetype='application/json')
+        
         if not os.path.exists(VANACHITRA_FRA_FILE):
             return jsonify({'error': 'Vanachitra FRA data not found. Please generate it first.'}), 404
         
         with open(VANACHITRA_FRA_FILE, 'r') as f:
             data = json.load(f)
         
+        metrics.count_features(len(data.get('features', [])))
         return jsonify(data)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def filter_asset_rows(snapshot, filters):
+    """Rows of an asset snapshot matching the /api/assets filters (missing area counts as 0)."""
+    mask = np.ones(snapshot.count, dtype=bool)
+    if filters['asset_type']:
+        mask &= snapshot.equals('class', filters['asset_type'])
+    if filters['state']:
+        mask &= snapshot.equals('state', filters['state'])
+    area = np.nan_to_num(snapshot.numbers('area_km2'), nan=0.0)
+    if filters['min_area']:
+        mask &= area >= float(filters['min_area'])
+    if filters['max_area']:
+        mask &= area <= float(filters['max_area'])
+    return np.flatnonzero(mask)
+
 @app.route('/api/assets')
 def get_assets():
     """API endpoint to get asset data."""
     try:
+        # Add filtering based on query parameters
+        filters = {
+            'asset_type': request.args.get('asset_type'),
+            'state': request.args.get('state'),
+            'min_area': request.args.get('min_area'),
+            'max_area': request.args.get('max_area')
+        }
+        
         # Try to load enhanced assets first, fallback to original
-        assets_files = ['output/assets_enhanced.geojson', 'output/assets.geojson']
         assets_data = None
         
-        for assets_file in assets_files:
+        for assets_file in ASSETS_FILES:
+            snapshot = cached_snapshot(assets_file)
+            if snapshot is not None:
+                rows = filter_asset_rows(snapshot, filters) if any(filters.values()) else None
+                metrics.count_features(snapshot.count if rows is None else len(rows))
+                return Response(render_collection(snapshot, rows), mimetype='application/json')
             try:
                 with open(assets_file, 'r') as f:
                     assets_data = json.load(f)
-                print(f"Loaded assets from {assets_file}")
                 break
             except FileNotFoundError:
                 continue
@@ -525,14 +1715,6 @@ def get_assets():
         if assets_data is None:
             raise FileNotFoundError("No assets file found")
             
-        # Add filtering based on query parameters
-        filters = {
-            'asset_type': request.args.get('asset_type'),
-            'state': request.args.get('state'),
-            'min_area': request.args.get('min_area'),
-            'max_area': request.args.get('max_area')
-        }
-        
         # Apply filters if provided
         if any(filters.values()):
             filtered_features = []
@@ -558,6 +1740,7 @@ def get_assets():
             
             assets_data['features'] = filtered_features
         
+        metrics.count_features(len(assets_data.get('features', [])))
         return jsonify(assets_data)
     except Exception as e:
         return jsonify({
@@ -579,14 +1762,16 @@ def get_fra_claims():
             'status': request.args.get('status'),
             'tribal_community': request.args.get('tribal_community'),
             'claim_area_min': request.args.get('claim_area_min'),
-            'claim_area_max': request.args.get('claim_area_max')
+            'claim_area_max': request.args.get('claim_area_max'),
+            'bbox': request.args.get('bbox')
         }
         
         # Remove empty filters
         filters = {k: v for k, v in filters.items() if v}
         
-        data = fra_manager.get_filtered_claims(filters)
-        return jsonify(data)
+        body, total = fra_manager.render_claims(filters)
+        metrics.count_features(total)
+        return Response(body, mimetype='application/json')
     
     except Exception as e:
         return jsonify({
@@ -665,17 +1850,7 @@ def get_performance_metrics():
 def get_filter_options():
     """API endpoint to get available filter options."""
     try:
-        if fra_manager.df is None or len(fra_manager.df) == 0:
-            return jsonify({})
-        
-        options = {
-            'states': sorted(fra_manager.df['state'].unique().tolist()),
-            'districts': sorted(fra_manager.df['district'].unique().tolist()),
-            'villages': sorted(fra_manager.df['village'].unique().tolist()),
-            'fra_types': sorted(fra_manager.df['fra_type'].unique().tolist()),
-            'statuses': sorted(fra_manager.df['status'].unique().tolist()),
-            'tribal_communities': sorted(fra_manager.df['tribal_community'].unique().tolist())
-        }
+        options = fra_manager.get_filter_options()
         
         return jsonify(options)
     except Exception as e:
@@ -694,22 +1869,25 @@ def export_claims():
             'status': request.args.get('status'),
             'tribal_community': request.args.get('tribal_community'),
             'claim_area_min': request.args.get('claim_area_min'),
-            'claim_area_max': request.args.get('claim_area_max')
+            'claim_area_max': request.args.get('claim_area_max'),
+            'bbox': request.args.get('bbox')
         }
         
         # Remove empty filters
         filters = {k: v for k, v in filters.items() if v}
         
-        data = fra_manager.get_filtered_claims(filters)
+        positions = fra_manager.filtered_positions(filters)
         
         # Add export metadata
-        data['export_info'] = {
+        export_info = {
             'exported_at': datetime.now().isoformat(),
             'filters_applied': filters,
-            'total_claims': len(data['features'])
+            'total_claims': len(positions)
         }
         
-        return jsonify(data)
+        metrics.count_features(len(positions))
+        return Response(fra_manager.render_filtered_claims(filters, extra={'export_info': export_info}, positions=positions),
+                        mimetype='application/json')
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -767,4 +1945,5 @@ if __name__ == '__main__':
         print("Generating FRA data...")
         os.system('python scripts/fra_webgis_generator.py')
     
+    startup.start()
     app.run(debug=True, host='127.0.0.1', port=5001)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Deferred App Startup
+Keeps dataset loading and index building off the import path of the Flask
+apps. The loader runs once: in a background warm-up thread when start() is
+called (the __main__ blocks, the ASGI lifespan and readiness probes do), or
+otherwise on the first request that needs the data.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class DeferredStartup:
+    """Run a loader once, in the background or on demand, and report readiness."""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.thread = None
+        self.error = None
+        self.started_at = None
+        self.load_seconds = None
+        self._ready = threading.Event()
+        self._thread_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Start the background warm-up thread (no-op once started or ready)."""
+        with self._thread_lock:
+            if self.ready or (self.thread is not None and self.thread.is_alive()):
+                return self
+            self.thread = threading.Thread(target=self._background, name=f'{self.name}-warm-up', daemon=True)
+            self.thread.start()
+        return self
+
+    def _background(self):
+        try:
+            self.ensure_ready()
+        except Exception as e:
+            print(f"[{self.name}] warm-up failed: {e}")
+
+    def ensure_ready(self):
+        """Block until the loader has run, running it in this thread if nobody has yet."""
+        if self.ready:
+            return
+        with self._load_lock:
+            if self.ready:
+                return
+            self.started_at = datetime.now().isoformat()
+            start = time.perf_counter()
+            try:
+                self.loader()
+            except Exception as e:
+                # Left not ready: the next request or probe retries the load
+                self.error = str(e)
+                raise
+            self.error = None
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self._ready.set()
+            print(f"[{self.name}] ready in {self.load_seconds:.2f}s")
+
+    def status(self):
+        """Readiness document for the /api/ready probes."""
+        if self.ready:
+            state = 'ready'
+        elif self.error:
+            state = 'failed'
+        elif self.started_at:
+            state = 'loading'
+        else:
+            state = 'pending'
+        return {
+            'ready': self.ready,
+            'state': state,
+            'started_at': self.started_at,
+            'load_seconds': self.load_seconds,
+            'error': self.error
+        }
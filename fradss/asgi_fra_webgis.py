@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+FRA WebGIS ASGI Entry Point
+Serves the same routes as app_fra_webgis.py under an ASGI server:
+
+    uvicorn asgi_fra_webgis:application --host 127.0.0.1 --port 5001
+
+The DB- and file-bound routes (/dss/<polygon_id>, /api/dss/batch and the
+exports) have native async handlers. They read polygon attributes through an
+asyncpg connection pool when DATABASE_URL is set, and run claim lookups, rule
+evaluation and JSON encoding in a thread pool so one slow lookup never blocks
+the event loop. Every other route is delegated to the Flask app.
+
+The datasets load in a background thread started by the lifespan startup
+event; /api/ready reports when they are available. The native handlers are
+recorded in the Flask app's /metrics like every delegated route; requests
+asking for a profile (see request_profiler.py) run through the Flask view so
+the whole request is profiled on one thread.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, unquote
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import render_template
+
+import app_fra_webgis as webgis
+from request_profiler import PROFILE_HEADER
+
+try:
+    import asyncpg  # type: ignore
+except Exception:
+    asyncpg = None
+
+# Configuration
+CPU_WORKERS = int(os.getenv('FRA_ASGI_CPU_WORKERS', '4'))
+DB_POOL_MIN_SIZE = int(os.getenv('FRA_DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('FRA_DB_POOL_MAX_SIZE', '10'))
+EXPORT_FILTERS = ('state', 'district', 'village', 'fra_type', 'status',
+                  'tribal_community', 'claim_area_min', 'claim_area_max', 'bbox')
+
+
+class AsyncAttributeStore:
+    """Polygon attributes from an asyncpg pool, falling back to the JSON cache and synthetic values."""
+
+    query = (
+        "SELECT polygon_id, water_level, groundwater_index, soil_quality, crop_yield, "
+        "forest_cover_percentage, poverty_index, infra_index "
+        "FROM polygon_attributes WHERE polygon_id = ANY($1::text[])"
+    )
+
+    def __init__(self, db_url, executor):
+        self.db_url = db_url
+        self.executor = executor
+        self.pool = None
+        self._started = False
+
+    async def start(self):
+        if self._started:
+            return
+        self._started = True
+        if not self.db_url or asyncpg is None:
+            return
+        try:
+            self.pool = await asyncpg.create_pool(
+                self.db_url, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE
+            )
+        except Exception as e:
+            print(f"Async DB pool unavailable, using JSON/synthetic attributes: {e}")
+            self.pool = None
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def fetch_from_db(self, polygon_ids):
+        await self.start()
+        if self.pool is None or not polygon_ids:
+            return {}
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(self.query, list(polygon_ids))
+        except Exception:
+            return {}
+        return {
+            row['polygon_id']: {
+                'water_level': row['water_level'],
+                'groundwater_index': float(row['groundwater_index']) if row['groundwater_index'] is not None else None,
+                'soil_quality': row['soil_quality'],
+                'crop_yield': float(row['crop_yield']) if row['crop_yield'] is not None else None,
+                'forest_cover_percentage': float(row['forest_cover_percentage']) if row['forest_cover_percentage'] is not None else None,
+                'poverty_index': float(row['poverty_index']) if row['poverty_index'] is not None else None,
+                'infra_index': float(row['infra_index']) if row['infra_index'] is not None else None,
+            }
+            for row in rows
+        }
+
+    async def fetch(self, polygon_ids):
+        """Stored attributes keyed by polygon id; the DB wins over the JSON cache as in the Flask app."""
+        loop = asyncio.get_running_loop()
+        json_items, db_items = await asyncio.gather(
+            loop.run_in_executor(self.executor, webgis.load_all_polygon_attributes_from_json),
+            self.fetch_from_db(polygon_ids)
+        )
+        stored = {pid: json_items[pid] for pid in polygon_ids if pid in json_items}
+        stored.update(db_items)
+        return stored
+
+
+class FRAWebGISASGI:
+    """ASGI application: async DSS and export handlers, Flask for everything else."""
+
+    def __init__(self, flask_app):
+        self.flask = WsgiToAsgi(flask_app)
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix='fra-cpu')
+        self.attributes = AsyncAttributeStore(os.getenv('DATABASE_URL'), self.executor)
+        # (methods, metrics route label, path pattern, handler)
+        self.routes = [
+            ({'GET'}, '/dss/<polygon_id>', re.compile(r'^/dss/(?P<polygon_id>[^/]+)$'), self.dss_details),
+            ({'GET', 'POST'}, '/api/dss/batch', re.compile(r'^/api/dss/batch$'), self.dss_batch),
+            ({'GET'}, '/api/export', re.compile(r'^/api/export$'), self.export_claims),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http':
+            for methods, rule, pattern, handler in self.routes:
+                match = pattern.match(scope['path'])
+                if match and scope['method'] in methods:
+                    if webgis.profiler.enabled and self.profile_requested(scope):
+                        break
+                    return await self.dispatch(scope, receive, send, rule, handler, match)
+        return await self.flask(scope, receive, send)
+
+    async def dispatch(self, scope, receive, send, rule, handler, match):
+        """Run a native handler and record it in the request metrics."""
+        start = time.perf_counter()
+        sent = {'status': 500, 'bytes': 0, 'started': False, 'finished': False}
+
+        async def send_recorded(message):
+            if message['type'] == 'http.response.start':
+                sent['status'] = message['status']
+                sent['started'] = True
+            elif message['type'] == 'http.response.body':
+                sent['bytes'] += len(message.get('body', b''))
+                sent['finished'] = not message.get('more_body', False)
+            await send(message)
+
+        features = None
+        try:
+            if not webgis.startup.ready:
+                await self.run_cpu(webgis.startup.ensure_ready)
+            features = await handler(scope, receive, send_recorded,
+                                     **{k: unquote(v) for k, v in match.groupdict().items()})
+        except Exception as e:
+            if not sent['started']:
+                await self.send_json(send_recorded, {'error': str(e)}, status=500)
+            else:
+                # Headers are out: the status can no longer change, so end the response where it stopped
+                print(f"{scope['method']} {scope['path']} failed after the response started: {e!r}")
+                sent['status'] = 500
+                if not sent['finished']:
+                    await send_recorded({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        webgis.metrics.observe(rule, scope['method'], sent['status'], time.perf_counter() - start,
+                               sent['bytes'], features)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                webgis.startup.start()
+                await self.attributes.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.attributes.close()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def run_cpu(self, func, *args):
+        """Run CPU-heavy or blocking work off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def send_body(self, send, body, status=200, content_type='application/json'):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', content_type.encode('latin-1')),
+                (b'content-length', str(len(body)).encode('latin-1')),
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def send_json(self, send, payload, status=200, encode_in_executor=False):
+        if encode_in_executor:
+            text = await self.run_cpu(self.flask_app.json.dumps, payload)
+        else:
+            text = self.flask_app.json.dumps(payload)
+        await self.send_body(send, (text + '\n').encode('utf-8'), status=status)
+
+    @staticmethod
+    async def read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    @staticmethod
+    def query_args(scope):
+        return {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+
+    def profile_requested(self, scope):
+        headers = {PROFILE_HEADER: self.header(scope, PROFILE_HEADER.lower())}
+        return webgis.profiler.requested(headers, self.query_args(scope)) is not None
+
+    @staticmethod
+    def header(scope, name):
+        for key, value in scope.get('headers', []):
+            if key.decode('latin-1').lower() == name:
+                return value.decode('latin-1')
+        return None
+
+    async def resolve_attributes(self, polygon_ids):
+        stored = await self.attributes.fetch(polygon_ids)
+        return {pid: stored.get(pid) or webgis.synthetic_polygon_attributes(pid) for pid in polygon_ids}
+
+    async def dss_details(self, scope, receive, send, polygon_id):
+        """Async /dss/<polygon_id>: same JSON and dashboard as the Flask route."""
+        claim, attrs = await asyncio.gather(
+            self.run_cpu(webgis.find_dss_claim, polygon_id),
+            self.resolve_attributes([polygon_id])
+        )
+        if not claim:
+            return await self.send_json(send, {'error': 'Polygon not found'}, status=404)
+        report = await self.run_cpu(webgis.build_dss_report, polygon_id, claim, attrs[polygon_id])
+
+        if self.query_args(scope).get('format') == 'json' or self.header(scope, 'accept') == 'application/json':
+            return await self.send_json(send, report)
+
+        html = await self.run_cpu(self.render_dss, report)
+        await self.send_body(send, html.encode('utf-8'), content_type='text/html; charset=utf-8')
+
+    def render_dss(self, report):
+        with self.flask_app.app_context():
+            return render_template('dss_details.html',
+                                   polygon_id=report['polygon_id'],
+                                   attrs=report['attributes'],
+                                   recs=report['recommendations'],
+                                   schemes=report['applicable_schemes'],
+                                   meta=report['metadata'])
+
+    async def dss_batch(self, scope, receive, send):
+        """Async /api/dss/batch: one pooled attribute query for the whole batch."""
+        if scope['method'] == 'POST':
+            try:
+                polygon_ids = json.loads(await self.read_body(receive) or b'{}').get('polygon_ids', [])
+            except (ValueError, AttributeError):
+                polygon_ids = []
+        else:
+            polygon_ids = [pid for pid in self.query_args(scope).get('ids', '').split(',') if pid]
+        if not isinstance(polygon_ids, list) or not polygon_ids:
+            return await self.send_json(
+                send, {'error': 'Provide polygon_ids (POST JSON) or ids (comma-separated query)'}, status=400
+            )
+        if len(polygon_ids) > webgis.DSS_BATCH_LIMIT:
+            return await self.send_json(
+                send, {'error': f'At most {webgis.DSS_BATCH_LIMIT} polygons per batch'}, status=400
+            )
+        stored = await self.attributes.fetch(polygon_ids)
+        result = await self.run_cpu(webgis.build_dss_batch, polygon_ids, stored)
+        await self.send_json(send, result, encode_in_executor=True)
+
+    async def export_claims(self, scope, receive, send):
+        """Async /api/export: filtering and encoding happen in the executor; returns the claim count."""
+        args = self.query_args(scope)
+        filters = {k: args[k] for k in EXPORT_FILTERS if args.get(k)}
+        body, total = await self.run_cpu(self.render_export, filters)
+        await self.send_body(send, body.encode('utf-8'))
+        return total
+
+    @staticmethod
+    def render_export(filters):
+        positions = webgis.fra_manager.filtered_positions(filters)
+        export_info = {
+            'exported_at': datetime.now().isoformat(),
+            'filters_applied': filters,
+            'total_claims': len(positions)
+        }
+        return webgis.fra_manager.render_claims(filters, extra={'export_info': export_info}, positions=positions)
+
+
+application = FRAWebGISASGI(webgis.app)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("=== FRA WebGIS Integration Application (ASGI) ===")
+    print("Open your browser to: http://127.0.0.1:5001")
+    uvicorn.run(application, host='127.0.0.1', port=5001)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Throughput comparison: Flask (WSGI) vs the ASGI entry point under concurrent load
+
+Starts each server in a subprocess on a local port, simulates a slow
+polygon_attributes database (every lookup sleeps --db-latency-ms), then fires
+the same mix of DSS, batch and export requests from a pool of client threads.
+
+Usage (from the fradss/ directory):
+    python benchmarks/asgi_throughput.py --requests 400 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+SERVERS = {
+    'wsgi': 'Flask dev server, single thread (one blocked request blocks the worker)',
+    'wsgi-threaded': 'Flask dev server, thread per request',
+    'asgi': 'uvicorn + asgi_fra_webgis (async handlers, pooled DB, executor)',
+}
+
+
+def serve(kind, port, db_latency):
+    """Run one server with a simulated DB latency; used by the benchmark subprocesses."""
+    os.chdir(PROJECT_ROOT)
+    import app_fra_webgis as webgis
+
+    def slow_lookup(polygon_id):
+        time.sleep(db_latency)
+        return None
+
+    def slow_bulk_lookup(polygon_ids=None):
+        time.sleep(db_latency)
+        return {}
+
+    webgis.load_polygon_attributes_from_db = slow_lookup
+    webgis.load_all_polygon_attributes_from_db = slow_bulk_lookup
+    webgis.warm_up()
+
+    if kind == 'asgi':
+        import uvicorn
+        import asgi_fra_webgis
+
+        async def slow_async_lookup(polygon_ids):
+            await asyncio.sleep(db_latency)
+            return {}
+
+        asgi_fra_webgis.application.attributes.fetch_from_db = slow_async_lookup
+        uvicorn.run(asgi_fra_webgis.application, host='127.0.0.1', port=port, log_level='warning')
+    else:
+        webgis.app.run(host='127.0.0.1', port=port, threaded=(kind == 'wsgi-threaded'))
+
+
+def wait_for_server(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/filter-options')
+            conn.getresponse().read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def request_mix(polygon_ids):
+    mix = []
+    for i, pid in enumerate(polygon_ids):
+        mix.append(('GET', f'/dss/{pid}?format=json', None))
+        if i % 4 == 0:
+            batch = polygon_ids[i:i + 10]
+            mix.append(('POST', '/api/dss/batch', json.dumps({'polygon_ids': batch})))
+        if i % 8 == 0:
+            mix.append(('GET', '/api/export?state=Odisha', None))
+    return mix
+
+
+def run_load(port, mix, total_requests, concurrency):
+    latencies = []
+    errors = 0
+
+    def worker(offset):
+        nonlocal errors
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local = []
+        for i in range(offset, total_requests, concurrency):
+            method, path, body = mix[i % len(mix)]
+            headers = {'Content-Type': 'application/json'} if body else {}
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            local.append(time.perf_counter() - start)
+        conn.close()
+        return local
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for result in pool.map(worker, range(concurrency)):
+            latencies.extend(result)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': round(pct(50), 2),
+        'p95_ms': round(pct(95), 2),
+        'p99_ms': round(pct(99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--db-latency-ms', type=float, default=20.0)
+    parser.add_argument('--servers', default=','.join(SERVERS))
+    parser.add_argument('--base-port', type=int, default=5101)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--serve', choices=list(SERVERS), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.db_latency_ms / 1000.0)
+        return 0
+
+    os.chdir(PROJECT_ROOT)
+    import app_fra_webgis as webgis
+    webgis.warm_up()
+    records = webgis.fra_manager.iter_claim_records()
+    polygon_ids = [record['claim_id'] for _, record in zip(range(50), records)]
+    mix = request_mix(polygon_ids)
+
+    results = {}
+    for offset, kind in enumerate(args.servers.split(',')):
+        port = args.base_port + offset
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', kind, '--port', str(port),
+             '--db-latency-ms', str(args.db_latency_ms)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not wait_for_server(port):
+                print(f"{kind}: server did not start")
+                continue
+            run_load(port, mix, min(len(mix), args.concurrency * 2), args.concurrency)  # warm-up
+            results[kind] = run_load(port, mix, args.requests, args.concurrency)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"\n{args.requests} requests, concurrency {args.concurrency}, simulated DB latency {args.db_latency_ms} ms")
+    print(f"{'server':<15}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for kind, r in results.items():
+        print(f"{kind:<15}{r['throughput_rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+    for kind in results:
+        print(f"  {kind}: {SERVERS[kind]}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
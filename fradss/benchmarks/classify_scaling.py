@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark: parallel tile-level land use classification
+
+Classifies one scene with LandUseClassifier.classify_image_parallel for 1 to N
+worker processes and reports the wall time, pixel throughput and speedup over
+the first worker count (1 by default), next to the in-process block-wise
+classification (classify_image_blocks). Every parallel map is checked against
+the in-process one.
+
+Without --image a synthetic tiled 6-band scene (three land cover regions with
+distinct spectra) is written to the work directory, and the model is trained
+on pixels of its known class map with train_model()'s parameters. With
+--image and --model an existing scene and land_classifier.pkl are used.
+
+Usage (from the fradss/ directory):
+    python benchmarks/classify_scaling.py --size 4000 --workers 1,2,4,8 --workdir /tmp/fra_classify
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from sklearn.ensemble import RandomForestClassifier
+import joblib
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.train_and_classify import LandUseClassifier  # noqa: E402
+
+# Band means of the synthetic water, forest and agriculture regions
+CLASS_SPECTRA = {
+    1: (300, 400, 200, 100, 50, 30),
+    2: (500, 800, 600, 2500, 1800, 900),
+    3: (900, 1000, 1100, 2000, 2200, 1600)
+}
+
+
+def synthetic_class_map(rows, cols, size):
+    """Class of every (row, col): water in the left third, forest top right, agriculture bottom right."""
+    return np.where(cols < size // 3, 1, np.where(rows < size // 2, 2, 3))
+
+
+def build_scene(path, size, seed, block=256):
+    """Write a size x size tiled uint16 6-band GeoTIFF, one row of blocks at a time."""
+    rng = np.random.RandomState(seed)
+    profile = {
+        'driver': 'GTiff', 'height': size, 'width': size, 'count': len(CLASS_SPECTRA[1]), 'dtype': 'uint16',
+        'crs': 'EPSG:4326', 'transform': from_origin(80.0, 22.0, 0.0001, 0.0001),
+        'tiled': True, 'blockxsize': block, 'blockysize': block
+    }
+    spectra = np.array([CLASS_SPECTRA[class_id] for class_id in sorted(CLASS_SPECTRA)], dtype=float)
+    with rasterio.open(path, 'w', **profile) as dst:
+        for row in range(0, size, block):
+            height = min(block, size - row)
+            rows, cols = np.mgrid[row:row + height, 0:size]
+            classes = synthetic_class_map(rows, cols, size)
+            values = spectra[classes - 1].transpose(2, 0, 1) + rng.normal(0, 80, (profile['count'], height, size))
+            dst.write(values.clip(0, 65535).astype('uint16'), window=Window(0, row, size, height))
+
+
+def train_synthetic_model(path, size, seed, samples=20000):
+    """Random forest (train_model()'s parameters) on random pixels of the synthetic scene."""
+    rng = np.random.RandomState(seed)
+    rows, cols = rng.randint(0, size, samples), rng.randint(0, size, samples)
+    with rasterio.open(path) as src:
+        image = src.read()
+    X = image[:, rows, cols].T
+    y = synthetic_class_map(rows, cols, size)
+    return RandomForestClassifier(n_estimators=100, max_depth=10, min_samples_split=5, min_samples_leaf=2,
+                                  random_state=42, n_jobs=-1).fit(X, y)
+
+
+def pixel_count(path):
+    with rasterio.open(path) as src:
+        return src.width * src.height
+
+
+def same_map(path, reference):
+    with rasterio.open(path) as a, rasterio.open(reference) as b:
+        return all(np.array_equal(a.read(1, window=window), b.read(1, window=window))
+                   for _, window in a.block_windows(1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=4000, help='Side of the synthetic scene in pixels')
+    parser.add_argument('--workers', default=None,
+                        help='Comma-separated worker counts (default: powers of two up to the CPU count)')
+    parser.add_argument('--workdir', default='/tmp/fra_classify_benchmark')
+    parser.add_argument('--image', help='Classify this scene instead of a synthetic one (needs --model)')
+    parser.add_argument('--model', help='land_classifier.pkl to classify --image with')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(',')]
+    else:
+        worker_counts = sorted({min(2 ** k, cpus) for k in range(cpus.bit_length() + 1)})
+
+    if args.image:
+        if not args.model:
+            parser.error('--image needs --model')
+        image_path, model = args.image, joblib.load(args.model)
+    else:
+        image_path = os.path.join(args.workdir, f'scene_{args.size}.tif')
+        if not os.path.exists(image_path):
+            print(f"Building a {args.size}x{args.size} scene in {image_path}...")
+            build_scene(image_path, args.size, args.seed)
+        model = train_synthetic_model(image_path, args.size, args.seed)
+
+    classifier = LandUseClassifier(image_path, None, args.workdir)
+    classifier.model = model
+    pixels = pixel_count(image_path)
+
+    start = time.perf_counter()
+    reference = classifier.classify_image_blocks(os.path.join(args.workdir, 'classified_blocks.tif'))
+    results = {'in_process': {'seconds': round(time.perf_counter() - start, 2)}}
+
+    model_path = os.path.join(args.workdir, 'land_classifier.pkl')
+    joblib.dump(model, model_path)
+    for workers in worker_counts:
+        output_path = os.path.join(args.workdir, f'classified_{workers}.tif')
+        start = time.perf_counter()
+        classifier.classify_image_parallel(workers=workers, output_path=output_path, model_path=model_path)
+        results[workers] = {'seconds': round(time.perf_counter() - start, 2),
+                            'identical': same_map(output_path, reference)}
+
+    base = results[worker_counts[0]]['seconds']
+    print(f"\n{pixels} pixels, {cpus} CPUs")
+    print(f"{'workers':>10}{'seconds':>10}{'Mpx/s':>10}{'speedup':>10}{'identical':>11}")
+    for key, result in results.items():
+        result['mpixels_per_s'] = round(pixels / result['seconds'] / 1e6, 2)
+        if key == 'in_process':
+            print(f"{'blocks':>10}{result['seconds']:>10}{result['mpixels_per_s']:>10}")
+            continue
+        result['speedup'] = round(base / result['seconds'], 2)
+        print(f"{key:>10}{result['seconds']:>10}{result['mpixels_per_s']:>10}{result['speedup']:>10}"
+              f"{str(result['identical']):>11}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'pixels': pixels, 'cpus': cpus,
+                       'results': {str(key): value for key, value in results.items()}}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Import-time and cold-start regression check for the Flask apps
+
+Each app module is imported in a fresh interpreter under `python -X importtime`
+and the cumulative import time (median of --runs) is compared with the budget
+in import_budget.json, together with the modules that must not be imported
+eagerly (pandas, psycopg2, ...). The cold start - import plus the startup
+loader until /api/ready answers 200 - is checked the same way.
+
+Exits with status 1 when a budget is exceeded or a deferred module is imported.
+
+Usage (from the fradss/ directory):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --update-budget   # record current timings x headroom
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+COLD_START_TIMEOUT = 600
+
+
+def import_profile(module):
+    """Cumulative import time in ms per module, from -X importtime in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {proc.stderr.strip().splitlines()[-1:]}")
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative) / 1000.0
+    return profile
+
+
+def cold_start(module):
+    """Run in a fresh interpreter: ms from the import until /api/ready answers 200."""
+    os.chdir(PROJECT_ROOT)
+    start = time.perf_counter()
+    app_module = __import__(module)
+    imported = time.perf_counter()
+    client = app_module.app.test_client()
+    while client.get('/api/ready').status_code != 200:
+        if app_module.startup.error:
+            raise RuntimeError(app_module.startup.error)
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    return {'import_ms': round((imported - start) * 1000, 1), 'ready_ms': round((ready - start) * 1000, 1)}
+
+
+def measure(module, runs):
+    imports, imported, top = [], set(), {}
+    for _ in range(runs):
+        profile = import_profile(module)
+        imports.append(profile[module])
+        imported.update(profile)
+        top = profile
+    starts = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--cold-start', module],
+                              cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=COLD_START_TIMEOUT)
+        if proc.returncode != 0:
+            raise RuntimeError(f"cold start of {module} failed: {proc.stderr.strip()[-500:]}")
+        starts.append(json.loads(proc.stdout.strip().splitlines()[-1])['ready_ms'])
+    heaviest = sorted(((ms, name) for name, ms in top.items()
+                       if name != module and '.' not in name), reverse=True)[:8]
+    return {
+        'import_ms': round(statistics.median(imports), 1),
+        'cold_start_ms': round(statistics.median(starts), 1),
+        'imported_modules': imported,
+        'heaviest_imports': {name: round(ms, 1) for ms, name in heaviest}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', default=BUDGET_FILE)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--update-budget', action='store_true',
+                        help='Write the measured timings times the headroom factor as the new budget')
+    parser.add_argument('--headroom', type=float, default=1.5)
+    parser.add_argument('--cold-start', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start:
+        print(json.dumps(cold_start(args.cold_start)))
+        return 0
+
+    with open(args.budget, 'r') as f:
+        budget = json.load(f)
+
+    failures = []
+    for module, limits in budget['modules'].items():
+        result = measure(module, args.runs)
+        eager = sorted(set(limits.get('deferred_imports', [])) & result['imported_modules'])
+        print(f"{module}: import {result['import_ms']} ms (budget {limits['import_ms']}), "
+              f"cold start {result['cold_start_ms']} ms (budget {limits['cold_start_ms']})")
+        print(f"    heaviest imports: " + ', '.join(f"{name} {ms} ms" for name, ms in result['heaviest_imports'].items()))
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} eagerly")
+        if args.update_budget:
+            limits['import_ms'] = round(result['import_ms'] * args.headroom)
+            limits['cold_start_ms'] = round(result['cold_start_ms'] * args.headroom)
+            continue
+        if result['import_ms'] > limits['import_ms']:
+            failures.append(f"{module} import {result['import_ms']} ms > {limits['import_ms']} ms")
+        if result['cold_start_ms'] > limits['cold_start_ms']:
+            failures.append(f"{module} cold start {result['cold_start_ms']} ms > {limits['cold_start_ms']} ms")
+
+    if args.update_budget:
+        budget['recorded_with'] = f"Python {sys.version.split()[0]}, {os.cpu_count()} CPU"
+        with open(args.budget, 'w') as f:
+            json.dump(budget, f, indent=2)
+            f.write('\n')
+        print(f"Budget written to {args.budget}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("Import-time budget OK")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint JSON response benchmark for app.py, app_enhanced.py and app_fra_webgis.py
+
+Every JSON endpoint is requested through the Flask test client (no network),
+after a warm-up, and the median latency and response size are reported. Point
+--project-root at another checkout (e.g. a `git worktree` of the previous
+commit) and pass its results as --baseline to print per-endpoint speedups.
+
+Usage (from the fradss/ directory):
+    python benchmarks/json_endpoints.py --project-root /tmp/base/fradss --output /tmp/before.json
+    python benchmarks/json_endpoints.py --baseline /tmp/before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = {
+    'app_fra_webgis': [
+        '/api/fra-claims',
+        '/api/fra-claims?state=Odisha',
+        '/api/export',
+        '/api/analytics',
+        '/api/filter-options',
+        '/api/claim/FRA_000010',
+        '/dss/FRA_000010?format=json',
+        '/api/dss/batch?ids={claim_ids}',
+        '/api/schemes/{scheme}/polygons?per_page=500',
+        '/api/dss/priority?k=10',
+        '/api/vanachitra_fra_data',
+        '/api/assets',
+    ],
+    'app_enhanced': [
+        '/api/data',
+        '/api/data?class=fra_area',
+        '/api/statistics',
+        '/api/filter-options',
+        '/api/fra-progress',
+        '/api/layers',
+        '/api/export',
+    ],
+    'app': [
+        '/data',
+        '/status',
+    ],
+}
+
+
+def measure(module, iterations):
+    """Run in a fresh interpreter inside the project root: time every endpoint of one app."""
+    sys.path.insert(0, os.getcwd())
+    app_module = __import__(module)
+    client = app_module.app.test_client()
+    fill = {}
+    if module == 'app_fra_webgis':
+        if hasattr(app_module, 'warm_up'):
+            app_module.warm_up()
+        records = app_module.fra_manager.iter_claim_records()
+        fill['claim_ids'] = ','.join(record['claim_id'] for _, record in zip(range(50), records))
+        fill['scheme'] = sorted(scheme['name'] for scheme in app_module.load_all_schemes())[0]
+
+    results = {}
+    for url in ENDPOINTS[module]:
+        path = url.format(**fill)
+        for _ in range(2):
+            response = client.get(path)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = client.get(path)
+            body = response.get_data()
+            timings.append(time.perf_counter() - start)
+        results[url] = {
+            'status': response.status_code,
+            'bytes': len(body),
+            'median_ms': round(statistics.median(timings) * 1000, 3)
+        }
+    return results
+
+
+def run(project_root, iterations):
+    results = {}
+    for module in ENDPOINTS:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', module,
+                               '--iterations', str(iterations)],
+                              cwd=project_root, capture_output=True, text=True)
+        if proc.returncode != 0:
+            results[module] = {'error': proc.stderr.strip()[-500:]}
+            continue
+        results[module] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--project-root', default=PROJECT_ROOT)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--baseline', help='Results JSON of an earlier run to compare against')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.iterations)))
+        return 0
+
+    results = run(os.path.abspath(args.project_root), args.iterations)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+
+    print(f"{'endpoint':<52}{'status':>7}{'KB':>10}{'ms':>10}" + (f"{'base ms':>10}{'speedup':>9}" if baseline else ''))
+    for module, endpoints in results.items():
+        if 'error' in endpoints:
+            print(f"{module}: {endpoints['error']}")
+            continue
+        for url, r in endpoints.items():
+            line = f"{module.replace('app_', '') + ' ' + url:<52}{r['status']:>7}{r['bytes'] / 1024:>10.1f}{r['median_ms']:>10.2f}"
+            base = baseline.get(module, {}).get(url)
+            if base and 'median_ms' in base:
+                line += f"{base['median_ms']:>10.2f}{base['median_ms'] / r['median_ms']:>8.1f}x"
+            print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
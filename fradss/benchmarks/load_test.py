@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark and load test for app_fra_webgis.py and app_enhanced.py on scaled datasets
+
+For every dataset size the existing generators produce the base data once (FRA
+claims from fra_webgis_generator.py, land-use assets from
+india_land_classification.py or its committed output, enhanced assets from enhance_assets.py), which is
+replicated (shifted coordinates, fresh claim ids) into <workdir>/<size>/output
+together with the columnar snapshots. The apps read their data relative to the
+working directory, so they run against a dataset directory unchanged.
+
+Two passes per app and size, each in fresh processes:
+    sequential  every route through the Flask test client: p50/p95/p99 per request, peak RSS
+    load        the app behind a threaded werkzeug server, the same requests fired
+                round-robin by --concurrency client threads for --load-seconds:
+                throughput, p50/p95/p99 per request and overall, server peak RSS
+
+Results are written as JSON (--output). Pass an earlier results file as
+--baseline to print the changes; the exit status is 1 when a p95 latency, the
+throughput or the peak RSS is worse than the baseline by more than --tolerance.
+
+Usage (from the fradss/ directory):
+    python benchmarks/load_test.py --sizes 10000 --output /tmp/load.json
+    python benchmarks/load_test.py --sizes 10000,100000,1000000 --baseline benchmarks/load_baseline.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from feature_snapshot import SnapshotWriter, dumps_compact, snapshot_path  # noqa: E402
+from json_provider import dumps_bytes  # noqa: E402
+
+MODULES = ('app_fra_webgis', 'app_enhanced')
+READY_TIMEOUT = 3600
+REQUEST_TIMEOUT = 600
+
+# (method, path, JSON body); {placeholders} are filled from the loaded data
+REQUESTS = {
+    'app_fra_webgis': [
+        ('GET', '/', None),
+        ('GET', '/webgis', None),
+        ('GET', '/india', None),
+        ('GET', '/enhanced', None),
+        ('GET', '/vanachitra', None),
+        ('GET', '/test', None),
+        ('GET', '/upload', None),
+        ('GET', '/api/ready', None),
+        ('GET', '/metrics', None),
+        ('GET', '/api/profiles', None),
+        ('GET', '/api/profiles/1', None),
+        ('GET', '/api/fra-claims', None),
+        ('GET', '/api/fra-claims?state={state}', None),
+        ('GET', '/api/fra-claims?state={state}&fra_type=IFR&status=approved', None),
+        ('GET', '/api/fra-claims?bbox={bbox}', None),
+        ('GET', '/api/claims', None),
+        ('GET', '/api/claim/{claim_id}', None),
+        ('GET', '/dss/{claim_id}', None),
+        ('GET', '/dss/{claim_id}?format=json', None),
+        ('GET', '/api/dss/batch?ids={claim_ids}', None),
+        ('POST', '/api/dss/batch', {'polygon_ids': '{claim_id_list}'}),
+        ('GET', '/api/schemes/{scheme}/polygons?per_page=500', None),
+        ('GET', '/api/dss/priority?k=10', None),
+        ('GET', '/api/analytics', None),
+        ('GET', '/api/state-summary', None),
+        ('GET', '/api/tribal-analysis', None),
+        ('GET', '/api/timeline', None),
+        ('GET', '/api/performance', None),
+        ('GET', '/api/filter-options', None),
+        ('GET', '/api/export', None),
+        ('GET', '/api/export?state={state}', None),
+        ('GET', '/api/vanachitra_fra_data', None),
+        ('GET', '/api/assets', None),
+        ('GET', '/api/assets?asset_type=forest', None),
+        ('GET', '/static/schemes.json', None),
+        ('GET', '/static/css/main.css', None),
+        ('GET', '/static/js/main.js', None),
+        ('GET', '/images/logo.png', None),
+    ],
+    'app_enhanced': [
+        ('GET', '/', None),
+        ('GET', '/api/ready', None),
+        ('GET', '/metrics', None),
+        ('GET', '/api/data', None),
+        ('GET', '/api/data?class=fra_area', None),
+        ('GET', '/api/data?state={state}', None),
+        ('GET', '/api/statistics', None),
+        ('GET', '/api/filter-options', None),
+        ('GET', '/api/fra-progress', None),
+        ('GET', '/api/layers', None),
+        ('GET', '/api/export', None),
+        ('GET', '/api/export?class=fra_area', None),
+        ('GET', '/static/schemes.json', None),
+    ],
+}
+
+
+def memory_mb(pid='self'):
+    """Current and peak RSS of a process in MB (Linux /proc)."""
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    memory[line.split(':')[0]] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return memory.get('VmRSS', 0.0), memory.get('VmHWM', 0.0)
+
+
+def percentiles(seconds):
+    p50, p95, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3), 'p99_ms': round(float(p99), 3)}
+
+
+def label(method, path):
+    return f'{method} {path}'
+
+
+def fill_request(method, path, body, fill):
+    """Concrete (method, path, body bytes) for one REQUESTS entry; '{name}' body values become fill[name]."""
+    if body is not None:
+        body = dumps_bytes({key: fill[value[1:-1]] if isinstance(value, str) and value.startswith('{') else value
+                            for key, value in body.items()})
+    return method, path.format(**fill), body
+
+
+# --- datasets ---------------------------------------------------------------
+
+def shift_coordinates(coordinates, shift):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [coordinates[0] + shift, coordinates[1] + shift] + list(coordinates[2:])
+    return [shift_coordinates(c, shift) for c in coordinates]
+
+
+def write_scaled_collection(path, base, size, id_key=None, pad_properties=False, properties=None):
+    """Stream `size` copies of the base features to an indent=2 GeoJSON file and its snapshot."""
+    keys = {}
+    if pad_properties:
+        for feature in base:
+            keys.update(dict.fromkeys(feature['properties']))
+    collection = {'type': 'FeatureCollection', 'properties': dict(properties or {}, total_features=size)}
+    writer = SnapshotWriter(snapshot_path(path), source=path, metadata={'collection': collection})
+    with open(path, 'w') as f:
+        f.write('{\n  "type": "FeatureCollection",\n  "features": [\n')
+        for i in range(size):
+            template = base[i % len(base)]
+            copy_index = i // len(base)
+            props = dict(template['properties'])
+            if id_key is not None and copy_index:
+                props[id_key] = f"{props[id_key]}-{copy_index}"
+            geometry = template['geometry']
+            if copy_index:
+                geometry = {'type': geometry['type'],
+                            'coordinates': shift_coordinates(geometry['coordinates'], 0.001 * (copy_index % 100))}
+            feature = {'type': 'Feature', 'properties': props, 'geometry': geometry}
+            f.write((',\n' if i else '') + dumps_bytes(feature, indent=True).decode('utf-8'))
+            fragment = None
+            if pad_properties:
+                fragment = dumps_compact({'type': 'Feature',
+                                          'properties': {key: props.get(key) for key in keys},
+                                          'geometry': geometry})
+            writer.add(feature, fragment)
+        f.write('\n  ],\n  "properties": ' + dumps_bytes(collection['properties']).decode('utf-8') + '\n}\n')
+    writer.close()
+
+
+def base_datasets(seed, workdir):
+    """Base features from the repo's generators, seeded so every size replicates the same data."""
+    from scripts.fra_webgis_generator import FRAWebGISGenerator
+    from scripts.enhance_assets import AssetEnhancer
+
+    random.seed(seed)
+    np.random.seed(seed)
+    base_dir = os.path.join(workdir, 'base')
+    fra = FRAWebGISGenerator(base_dir)
+    claims = fra.generate_fra_claims()
+    try:
+        from scripts.india_land_classification import IndiaLandUseClassifier
+        land_use = IndiaLandUseClassifier(base_dir).generate_india_sample_data()
+    except ImportError as e:
+        # The land-use generator needs the raster stack; its committed output is the same kind of data
+        print(f"india_land_classification unavailable ({e}); using output/india_assets.geojson")
+        with open(os.path.join(PROJECT_ROOT, 'output', 'india_assets.geojson'), 'r') as f:
+            land_use = json.load(f)
+    assets_file = os.path.join(base_dir, 'assets_enhanced.geojson')
+    AssetEnhancer().enhance_assets_data(None, assets_file, num_assets_per_type=20)
+    with open(assets_file, 'r') as f:
+        assets = json.load(f)
+    return {
+        'claims': claims,
+        'analytics': fra.generate_fra_analytics(claims),
+        'land_use': land_use,
+        'assets': assets
+    }
+
+
+def build_dataset(directory, size, base):
+    """Write the scaled datasets and link the files the apps serve unscaled."""
+    output = os.path.join(directory, 'output')
+    os.makedirs(output, exist_ok=True)
+    start = time.perf_counter()
+    write_scaled_collection(os.path.join(output, 'fra_claims.geojson'), base['claims'], size, id_key='claim_id',
+                            pad_properties=True)
+    with open(os.path.join(output, 'fra_analytics.json'), 'wb') as f:
+        f.write(dumps_bytes(base['analytics'], indent=True))
+    write_scaled_collection(os.path.join(output, 'india_assets.geojson'), base['land_use']['features'], size,
+                            pad_properties=True, properties=base['land_use'].get('properties'))
+    write_scaled_collection(os.path.join(output, 'assets_enhanced.geojson'), base['assets']['features'], size,
+                            properties=base['assets'].get('properties'))
+
+    links = [('static', 'static'), ('react_build', 'react_build'),
+             ('output/vanachitra_fra_data.geojson', 'output/vanachitra_fra_data.geojson'),
+             ('output/polygon_attributes.json', 'output/polygon_attributes.json')]
+    for source, target in links:
+        source, target = os.path.join(PROJECT_ROOT, source), os.path.join(directory, target)
+        if os.path.exists(source) and not os.path.lexists(target):
+            os.symlink(source, target)
+    return time.perf_counter() - start
+
+
+def dataset_ready(directory):
+    names = ('fra_claims', 'india_assets', 'assets_enhanced')
+    return all(os.path.exists(os.path.join(directory, 'output', f'{name}.snapshot', 'manifest.json')) for name in names)
+
+
+# --- sequential pass (test client) ------------------------------------------
+
+def load_app(module, directory):
+    """Import an app inside a dataset directory and wait for its datasets."""
+    os.chdir(directory)
+    sys.path.insert(0, PROJECT_ROOT)
+    app_module = __import__(module)
+    start = time.perf_counter()
+    app_module.startup.ensure_ready()
+    return app_module, time.perf_counter() - start
+
+
+def request_fill(module, app_module):
+    """Values for the REQUESTS placeholders, taken from the loaded data."""
+    if module == 'app_fra_webgis':
+        records = app_module.fra_manager.iter_claim_records()
+        claim_ids = [record['claim_id'] for _, record in zip(range(50), records)]
+        return {
+            'state': 'Odisha',
+            'claim_id': claim_ids[0],
+            'claim_ids': ','.join(claim_ids),
+            'claim_id_list': claim_ids,
+            'scheme': quote(sorted(scheme['name'] for scheme in app_module.load_all_schemes())[0]),
+            'bbox': '84.0,19.5,86.0,21.5'
+        }
+    return {'state': 'Odisha'}
+
+
+def uncovered_endpoints(app, requests):
+    adapter = app.url_map.bind('localhost')
+    covered = set()
+    for method, path, _ in requests:
+        try:
+            covered.add(adapter.match(path.split('?')[0], method=method)[0])
+        except Exception:
+            pass
+    return sorted({rule.endpoint for rule in app.url_map.iter_rules()} - covered)
+
+
+def measure(module, directory, iterations, request_seconds):
+    """Run in a fresh interpreter: time every request of one app through the test client."""
+    app_module, load_s = load_app(module, directory)
+    client = app_module.app.test_client()
+    fill = request_fill(module, app_module)
+    requests = [fill_request(*entry, fill) for entry in REQUESTS[module]]
+
+    results = {}
+    for (method, path, _), (_, url, body) in zip(REQUESTS[module], requests):
+        kwargs = {'data': body, 'content_type': 'application/json'} if body is not None else {}
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        timings = []
+        deadline = time.perf_counter() + request_seconds
+        while len(timings) < iterations and (len(timings) < 3 or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            response = client.open(url, method=method, **kwargs)
+            body_bytes = response.get_data()
+            timings.append(time.perf_counter() - start)
+        results[label(method, path)] = dict(percentiles(timings), status=response.status_code,
+                                            bytes=len(body_bytes), samples=len(timings))
+    _, peak = memory_mb()
+    return {
+        'load_s': round(load_s, 3),
+        'peak_rss_mb': round(peak, 1),
+        'uncovered_endpoints': uncovered_endpoints(app_module.app, requests),
+        'fill': fill,
+        'requests': results
+    }
+
+
+def run_measurement(module, directory, args):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', module, directory,
+                           '--iterations', str(args.iterations), '--request-seconds', str(args.request_seconds)],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'error': f'exit status {proc.returncode}', 'stderr': proc.stderr[-500:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# --- load pass (threaded server + client threads) ---------------------------
+
+def serve(module, directory, port):
+    """Run in a fresh interpreter: serve one app on a local port with a thread per request."""
+    import logging
+    from werkzeug.serving import make_server
+
+    app_module, _ = load_app(module, directory)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    make_server('127.0.0.1', port, app_module.app, threaded=True).serve_forever()
+
+
+def wait_for_server(port, proc, timeout=READY_TIMEOUT):
+    deadline = time.time() + timeout
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/api/ready')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def run_load(port, requests, concurrency, seconds):
+    """Fire the requests round-robin from `concurrency` threads until the time is up."""
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            index = i % len(requests)
+            method, url, body = requests[index]
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=REQUEST_TIMEOUT)
+                conn.request(method, url, body=body, headers=headers)
+                response = conn.getresponse()
+                size = len(response.read())
+                status = response.status
+                conn.close()
+            except (OSError, http.client.HTTPException):
+                size, status = 0, 0
+            with lock:
+                samples.append((index, time.perf_counter() - start, status, size))
+            i += 1
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def load_test(module, directory, fill, port, args):
+    log_file = os.path.join(directory, f'{module}.server.log')
+    with open(log_file, 'w') as log:
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', module, directory,
+                                 '--port', str(port)], cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        if not wait_for_server(port, proc):
+            return {'error': f'server did not become ready (see {log_file})'}
+        _, baseline_peak = memory_mb(proc.pid)
+        requests = [fill_request(*entry, fill) for entry in REQUESTS[module]]
+        samples, elapsed = run_load(port, requests, args.concurrency, args.load_seconds)
+        _, peak = memory_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    per_request = {}
+    for index, (method, path, _) in enumerate(REQUESTS[module]):
+        timings = [s[1] for s in samples if s[0] == index]
+        if timings:
+            statuses = sorted({s[2] for s in samples if s[0] == index})
+            per_request[label(method, path)] = dict(percentiles(timings), samples=len(timings), statuses=statuses)
+    return dict(
+        percentiles([s[1] for s in samples]),
+        requests=len(samples),
+        errors=sum(1 for s in samples if s[2] == 0 or s[2] >= 500),
+        seconds=round(elapsed, 2),
+        throughput_rps=round(len(samples) / elapsed, 2),
+        megabytes=round(sum(s[3] for s in samples) / 1e6, 1),
+        ready_peak_rss_mb=round(baseline_peak, 1),
+        peak_rss_mb=round(peak, 1),
+        per_request=per_request
+    )
+
+
+# --- report -----------------------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """Rows (size, app, metric, base, now, change) worse than the baseline by more than `tolerance`."""
+    regressions = []
+
+    def check(size, module, metric, base, now, higher_is_better=False):
+        if not base or now is None:
+            return
+        change = now / base - 1
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append((size, module, metric, base, now, change))
+
+    for size, modules in results.items():
+        for module, result in modules.items():
+            base = baseline.get(size, {}).get(module, {})
+            now_seq, base_seq = result.get('sequential', {}), base.get('sequential', {})
+            for name, r in now_seq.get('requests', {}).items():
+                check(size, module, f'p95 {name}', base_seq.get('requests', {}).get(name, {}).get('p95_ms'), r['p95_ms'])
+            check(size, module, 'sequential peak RSS MB', base_seq.get('peak_rss_mb'), now_seq.get('peak_rss_mb'))
+            now_load, base_load = result.get('load', {}), base.get('load', {})
+            check(size, module, 'load throughput rps', base_load.get('throughput_rps'),
+                  now_load.get('throughput_rps'), higher_is_better=True)
+            check(size, module, 'load p95 ms', base_load.get('p95_ms'), now_load.get('p95_ms'))
+            check(size, module, 'load peak RSS MB', base_load.get('peak_rss_mb'), now_load.get('peak_rss_mb'))
+    return regressions
+
+
+def print_report(results):
+    for size, modules in results.items():
+        for module, result in modules.items():
+            seq, load = result['sequential'], result['load']
+            print(f"\n== {module} @ {size} features ==")
+            if 'error' in seq:
+                print(f"sequential: {seq['error']} {seq.get('stderr', '')}")
+            else:
+                print(f"loaded in {seq['load_s']}s, peak RSS {seq['peak_rss_mb']} MB")
+                print(f"{'request':<66}{'status':>7}{'KB':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+                for name, r in seq['requests'].items():
+                    print(f"{name:<66}{r['status']:>7}{r['bytes'] / 1024:>10.1f}"
+                          f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+                if seq['uncovered_endpoints']:
+                    print(f"not covered: {', '.join(seq['uncovered_endpoints'])}")
+            if 'error' in load:
+                print(f"load: {load['error']}")
+            else:
+                print(f"load: {load['requests']} requests in {load['seconds']}s = {load['throughput_rps']} req/s, "
+                      f"p50 {load['p50_ms']} / p95 {load['p95_ms']} / p99 {load['p99_ms']} ms, "
+                      f"{load['errors']} errors, server peak RSS {load['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--apps', default=','.join(MODULES))
+    parser.add_argument('--workdir', default='/tmp/fra_load_test')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=30, help='Test-client requests per route')
+    parser.add_argument('--request-seconds', type=float, default=5.0,
+                        help='Stop repeating a route after this long (at least 3 samples are taken)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--load-seconds', type=float, default=10.0)
+    parser.add_argument('--base-port', type=int, default=5201)
+    parser.add_argument('--skip-load', action='store_true', help='Only run the test-client pass')
+    parser.add_argument('--baseline', help='Results JSON of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative regression against the baseline (0.25 = 25%%)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--measure', nargs=2, metavar=('MODULE', 'DIR'), help=argparse.SUPPRESS)
+    parser.add_argument('--serve', nargs=2, metavar=('MODULE', 'DIR'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure, args.iterations, args.request_seconds)))
+        return 0
+    if args.serve:
+        serve(*args.serve, args.port)
+        return 0
+
+    workdir = os.path.abspath(args.workdir)
+    base = None
+    results = {}
+    for size in [s.strip() for s in args.sizes.split(',')]:
+        directory = os.path.join(workdir, size)
+        if not dataset_ready(directory):
+            if base is None:
+                base = base_datasets(args.seed, workdir)
+            print(f"Building {size} features in {directory}...")
+            print(f"Built in {build_dataset(directory, int(size), base):.1f}s")
+        results[size] = {}
+        for offset, module in enumerate(m.strip() for m in args.apps.split(',')):
+            print(f"Measuring {module} @ {size}...")
+            sequential = run_measurement(module, directory, args)
+            if args.skip_load or 'error' in sequential:
+                load = {'error': 'skipped'}
+            else:
+                load = load_test(module, directory, sequential['fill'], args.base_port + offset, args)
+            results[size][module] = {'sequential': sequential, 'load': load}
+
+    print_report(results)
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\n{len(regressions)} regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        for size, module, metric, before, now, change in regressions:
+            print(f"  {module} @ {size}: {metric}: {before} -> {now} ({change:+.0%})")
+        status = 1 if regressions else 0
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'recorded_with': f"Python {platform.python_version()}, "
+                       f"{os.cpu_count()} CPU", 'results': results}, f, indent=2)
+    return status
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark: GeoJSON parsing vs the memory-mapped columnar snapshot
+
+For each dataset size the FRA generator's claims are replicated (fresh claim
+ids, shifted coordinates) into an indent=2 GeoJSON file exactly like the one
+fra_webgis_generator.py writes, together with its snapshot. Every measurement
+runs in a fresh interpreter and times FRAWebGISManager construction, the first
+filtered /api/fra-claims response and the filter options, and reports RSS.
+
+Usage (from the fradss/ directory):
+    python benchmarks/startup_time.py --sizes 10000,100000,1000000 --workdir /tmp/fra_startup
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from feature_snapshot import SnapshotWriter, dumps_compact  # noqa: E402
+
+MEASURE_TIMEOUT = 3600
+
+
+def memory_mb():
+    """Current and peak RSS of this process in MB (Linux /proc)."""
+    memory = {}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    memory[line.split(':')[0]] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return memory.get('VmRSS', 0.0), memory.get('VmHWM', 0.0)
+
+
+def base_claims(seed):
+    from scripts.fra_webgis_generator import FRAWebGISGenerator
+
+    random.seed(seed)
+    np.random.seed(seed)
+    generator = FRAWebGISGenerator(os.path.join(PROJECT_ROOT, 'output'))
+    return generator.generate_fra_claims()
+
+
+def build_dataset(directory, size, base):
+    """Write fra_claims.geojson (indent=2) and its snapshot for `size` claims."""
+    os.makedirs(directory, exist_ok=True)
+    geojson_file = os.path.join(directory, 'fra_claims.geojson')
+    keys = {}
+    for feature in base:
+        keys.update(dict.fromkeys(feature['properties']))
+
+    writer = SnapshotWriter(os.path.join(directory, 'fra_claims.snapshot'), source=geojson_file,
+                            metadata={'collection': {'type': 'FeatureCollection'}})
+    start = time.perf_counter()
+    with open(geojson_file, 'w') as f:
+        f.write('{\n  "type": "FeatureCollection",\n  "features": [\n')
+        for i in range(size):
+            template = base[i % len(base)]
+            copy_index = i // len(base)
+            props = dict(template['properties'])
+            props['claim_id'] = f"{props['claim_id']}-{copy_index}"
+            shift = 0.001 * (copy_index % 100)
+            ring = [[x + shift, y + shift] for x, y in template['geometry']['coordinates'][0]]
+            feature = {'type': 'Feature', 'properties': props,
+                       'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+            f.write((',\n' if i else '') + json.dumps(feature, indent=2))
+            writer.add(feature, dumps_compact({
+                'type': 'Feature',
+                'properties': {key: props.get(key) for key in keys},
+                'geometry': feature['geometry']
+            }))
+        f.write('\n  ],\n  "properties": {"total_claims": %d}\n}\n' % size)
+    writer.close()
+    shutil.copy(os.path.join(PROJECT_ROOT, 'output', 'fra_analytics.json'), directory)
+
+    # A directory without the snapshot next to the GeoJSON forces the JSON path
+    json_dir = os.path.join(directory, 'json')
+    os.makedirs(json_dir, exist_ok=True)
+    for name in ('fra_claims.geojson', 'fra_analytics.json'):
+        link = os.path.join(json_dir, name)
+        if not os.path.exists(link):
+            os.symlink(os.path.join('..', name), link)
+    return time.perf_counter() - start
+
+
+def directory_size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1e6
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names) / 1e6
+
+
+def measure(directory):
+    """Run in a fresh interpreter: time the manager startup against one dataset directory."""
+    os.chdir(PROJECT_ROOT)
+    import app_fra_webgis as webgis
+
+    rss_before, _ = memory_mb()
+    start = time.perf_counter()
+    manager = webgis.FRAWebGISManager(os.path.join(directory, 'fra_claims.geojson'),
+                                      os.path.join(directory, 'fra_analytics.json'))
+    loaded = time.perf_counter()
+    body = manager.render_filtered_claims({'state': 'Odisha'})
+    first = time.perf_counter()
+    manager.get_filter_options()
+    options = time.perf_counter()
+    rss, peak = memory_mb()
+    return {
+        'mode': 'snapshot' if manager.snapshot is not None else 'json',
+        'claims': manager.claim_count(),
+        'load_s': round(loaded - start, 4),
+        'first_response_s': round(first - loaded, 4),
+        'filter_options_s': round(options - first, 4),
+        'startup_to_first_response_s': round(first - start, 4),
+        'response_mb': round(len(body) / 1e6, 2),
+        'rss_delta_mb': round(rss - rss_before, 1),
+        'peak_rss_mb': round(peak, 1)
+    }
+
+
+def run_measurement(directory):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', directory],
+                          capture_output=True, text=True, timeout=MEASURE_TIMEOUT)
+    if proc.returncode != 0:
+        return {'error': f'exit status {proc.returncode}', 'stderr': proc.stderr[-500:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--workdir', default='/tmp/fra_startup_benchmark')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json-max', type=int, default=None,
+                        help='Skip the GeoJSON measurement above this size (it needs several GB of RAM at 1M)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure)))
+        return 0
+
+    base = base_claims(args.seed)
+    results = {}
+    for size in [int(s) for s in args.sizes.split(',')]:
+        directory = os.path.join(args.workdir, str(size))
+        if not os.path.exists(os.path.join(directory, 'fra_claims.snapshot', 'manifest.json')):
+            print(f"Building {size} claims in {directory}...")
+            build_s = build_dataset(directory, size, base)
+        else:
+            build_s = None
+        result = {
+            'geojson_mb': round(directory_size_mb(os.path.join(directory, 'fra_claims.geojson')), 1),
+            'snapshot_mb': round(directory_size_mb(os.path.join(directory, 'fra_claims.snapshot')), 1),
+            'build_s': round(build_s, 2) if build_s is not None else None,
+            'snapshot': run_measurement(directory)
+        }
+        if args.json_max is None or size <= args.json_max:
+            result['json'] = run_measurement(os.path.join(directory, 'json'))
+        else:
+            result['json'] = {'error': f'skipped (--json-max {args.json_max})'}
+        results[size] = result
+
+    print(f"\n{'features':>10}{'mode':>10}{'load s':>10}{'1st resp s':>12}{'total s':>10}{'RSS +MB':>10}{'peak MB':>10}")
+    for size, result in results.items():
+        for mode in ('json', 'snapshot'):
+            r = result[mode]
+            if 'error' in r:
+                print(f"{size:>10}{mode:>10}  {r['error']}")
+                continue
+            print(f"{size:>10}{mode:>10}{r['load_s']:>10}{r['first_response_s']:>12}"
+                  f"{r['startup_to_first_response_s']:>10}{r['rss_delta_mb']:>10}{r['peak_rss_mb']:>10}")
+        print(f"{'':>10}{'files':>10}  geojson {result['geojson_mb']} MB, snapshot {result['snapshot_mb']} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Partitioned Feature Datasets
+Manifest, pruning and a memory-bounded cache for datasets split into one
+GeoJSON shard per partition (fra_claims.geojson -> fra_claims_<state>.geojson).
+
+The manifest (fra_claims.partitions.json) lists every partition with its
+feature count, bounding box, numeric and identifier value ranges and the
+distinct values of low-cardinality columns, so a filter can skip partitions
+without opening them. It also records the size and modification time of every
+shard and of the monolithic file; a manifest that no longer matches them
+(regenerated data, or shards written by an older generator) is not used.
+
+Usage:
+    python feature_partitions.py output/fra_claims.geojson
+"""
+
+import glob
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from parallel_generation import generation_time
+
+PARTITION_FORMAT = 'fra-feature-partitions'
+PARTITION_VERSION = 1
+VALUE_LIMIT = 256
+RANGE_COLUMNS = ('claim_id', 'feature_id', 'fra_id')
+
+
+def manifest_path(geojson_file):
+    """Partition manifest stored next to the monolithic GeoJSON file."""
+    return os.path.splitext(geojson_file)[0] + '.partitions.json'
+
+
+def partition_file(geojson_file, key):
+    """Shard file for one partition key, named as the FRA generator names them."""
+    base = os.path.splitext(geojson_file)[0]
+    return f"{base}_{str(key).replace(' ', '_').lower()}.geojson"
+
+
+def file_stamp(path):
+    """Size and modification time of a file (None if it is missing), as snapshots stamp their source."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _iter_positions(coordinates):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates
+        return
+    for item in coordinates or []:
+        yield from _iter_positions(item)
+
+
+def geometry_vertex_count(geometry):
+    """Number of coordinate positions in a GeoJSON geometry."""
+    return sum(1 for _ in _iter_positions((geometry or {}).get('coordinates')))
+
+
+def geometry_bounds(geometry):
+    """[minx, miny, maxx, maxy] of a GeoJSON geometry, or None if it has no coordinates."""
+    points = [p[:2] for p in _iter_positions((geometry or {}).get('coordinates'))]
+    if not points:
+        return None
+    arr = np.asarray(points, dtype=np.float64)
+    return [float(arr[:, 0].min()), float(arr[:, 1].min()), float(arr[:, 0].max()), float(arr[:, 1].max())]
+
+
+def geometry_bboxes(geometries):
+    """(n, 4) bounding boxes for a sequence of geometries (NaN rows for empty ones)."""
+    boxes = np.full((len(geometries), 4), np.nan)
+    for row, geometry in enumerate(geometries):
+        bounds = geometry_bounds(geometry)
+        if bounds is not None:
+            boxes[row] = bounds
+    return boxes
+
+
+def parse_bbox(value):
+    """Parse 'minx,miny,maxx,maxy' (or a 4-sequence) into a float tuple."""
+    parts = value.split(',') if isinstance(value, str) else list(value)
+    if len(parts) != 4:
+        raise ValueError("bbox must be minx,miny,maxx,maxy")
+    minx, miny, maxx, maxy = (float(p) for p in parts)
+    if minx > maxx or miny > maxy:
+        raise ValueError("bbox min values must not exceed max values")
+    return minx, miny, maxx, maxy
+
+
+def bbox_mask(bboxes, bbox):
+    """Rows of an (n, 4) bbox array that intersect bbox; empty geometries never match."""
+    minx, miny, maxx, maxy = parse_bbox(bbox)
+    bboxes = np.asarray(bboxes)
+    return ((bboxes[:, 0] <= maxx) & (bboxes[:, 2] >= minx) &
+            (bboxes[:, 1] <= maxy) & (bboxes[:, 3] >= miny))
+
+
+class PartitionStats:
+    """partition_stats() accumulated one feature at a time, for writers that stream the shards.
+
+    Identifier columns and string columns past value_limit distinct values only
+    keep their range, so the memory does not grow with the feature count.
+    """
+
+    def __init__(self, value_limit=VALUE_LIMIT):
+        self.value_limit = value_limit
+        self.count = 0
+        self.bounds = [np.inf, np.inf, -np.inf, -np.inf]
+        self.numbers, self.strings, self.string_ranges, self.columns = {}, {}, {}, {}
+
+    def add(self, feature):
+        self.count += 1
+        feature_bounds = geometry_bounds(feature.get('geometry'))
+        if feature_bounds is not None:
+            bounds = self.bounds
+            self.bounds = [min(bounds[0], feature_bounds[0]), min(bounds[1], feature_bounds[1]),
+                           max(bounds[2], feature_bounds[2]), max(bounds[3], feature_bounds[3])]
+        for key, value in (feature.get('properties') or {}).items():
+            self.columns[key] = True
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                if value == value:
+                    low, high = self.numbers.get(key, (value, value))
+                    self.numbers[key] = (min(low, value), max(high, value))
+            elif isinstance(value, str):
+                self._add_string(key, value)
+
+    def _add_string(self, key, value):
+        if key in self.string_ranges:
+            low, high = self.string_ranges[key]
+            self.string_ranges[key] = (min(low, value), max(high, value))
+            return
+        distinct = self.strings.setdefault(key, set())
+        distinct.add(value)
+        if key in RANGE_COLUMNS or len(distinct) > self.value_limit:
+            self.string_ranges[key] = (min(distinct), max(distinct))
+            del self.strings[key]
+
+    def result(self):
+        ranges = {key: [low, high] for key, (low, high) in self.numbers.items()}
+        ranges.update({key: [low, high] for key, (low, high) in self.string_ranges.items()})
+        return {
+            'count': self.count,
+            'bbox': self.bounds if self.bounds[0] <= self.bounds[2] else None,
+            'columns': list(self.columns),
+            'ranges': ranges,
+            'values': {key: sorted(distinct) for key, distinct in self.strings.items()}
+        }
+
+
+def partition_stats(features, value_limit=VALUE_LIMIT):
+    """Count, bbox, numeric/identifier ranges and low-cardinality value sets of a partition."""
+    stats = PartitionStats(value_limit)
+    for feature in features:
+        stats.add(feature)
+    return stats.result()
+
+
+def write_partition_manifest(geojson_file, partitions, partition_key='state'):
+    """Write the manifest for a dataset; partitions is a list of (key, shard_file, features or PartitionStats)."""
+    entries, columns = [], {}
+    for key, shard_file, features in partitions:
+        entry = {'key': key, 'file': os.path.basename(shard_file), 'bytes': os.path.getsize(shard_file),
+                 'source': file_stamp(shard_file)}
+        entry.update(features.result() if isinstance(features, PartitionStats) else partition_stats(features))
+        columns.update(dict.fromkeys(entry['columns']))
+        entries.append(entry)
+    manifest = {
+        'format': PARTITION_FORMAT,
+        'version': PARTITION_VERSION,
+        'generated_at': generation_time().isoformat(),
+        'dataset': os.path.basename(geojson_file),
+        'source': file_stamp(geojson_file),
+        'partition_key': partition_key,
+        'total_features': sum(entry['count'] for entry in entries),
+        'columns': list(columns),
+        'partitions': entries
+    }
+    path = manifest_path(geojson_file)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def build_partition_manifest(geojson_file, partition_key='state'):
+    """Manifest for existing shards, ordered as the partitions first appear in the main file."""
+    shards = {}
+    for shard_file in sorted(glob.glob(os.path.splitext(geojson_file)[0] + '_*.geojson')):
+        with open(shard_file, 'r', encoding='utf-8') as f:
+            features = json.load(f).get('features', [])
+        if features:
+            key = (features[0].get('properties') or {}).get(partition_key)
+            shards[key] = (key, shard_file, features)
+    order = []
+    if os.path.exists(geojson_file):
+        with open(geojson_file, 'r', encoding='utf-8') as f:
+            for feature in json.load(f).get('features', []):
+                key = (feature.get('properties') or {}).get(partition_key)
+                if key in shards and key not in order:
+                    order.append(key)
+    order += [key for key in shards if key not in order]
+    return write_partition_manifest(geojson_file, [shards[key] for key in order], partition_key)
+
+
+class PartitionSelection:
+    """Matching row positions per partition key; len() is the total number of matches."""
+
+    def __init__(self, parts):
+        self.parts = [(key, rows) for key, rows in parts if len(rows)]
+
+    def __len__(self):
+        return sum(len(rows) for _, rows in self.parts)
+
+    def __iter__(self):
+        return iter(self.parts)
+
+
+class PartitionManifest:
+    """Partition metadata and filter pruning; no shard is opened here."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'r') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != PARTITION_FORMAT or self.manifest.get('version') != PARTITION_VERSION:
+            raise ValueError(f"Unsupported partition manifest: {path}")
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.partition_key = self.manifest.get('partition_key', 'state')
+        self.partitions = OrderedDict((entry['key'], entry) for entry in self.manifest['partitions'])
+        self.columns = self.manifest.get('columns', [])
+        self.total = self.manifest.get('total_features', 0)
+
+    @classmethod
+    def open_if_fresh(cls, path):
+        """Open a manifest unless it is missing, unsupported or out of date with its files."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            manifest = cls(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return manifest if manifest.is_fresh() else None
+
+    def is_fresh(self):
+        """True if every shard, and the monolithic file if present, is the one the manifest was written from.
+
+        Manifests without stamps (older generators) cannot be checked and count as stale.
+        """
+        for key, entry in self.partitions.items():
+            stamp = file_stamp(self.file(key))
+            if stamp is None or entry.get('source') != stamp:
+                return False
+        dataset = file_stamp(os.path.join(self.directory, self.manifest.get('dataset', '')))
+        return dataset is None or self.manifest.get('source') == dataset
+
+    def file(self, key):
+        return os.path.join(self.directory, self.partitions[key]['file'])
+
+    @staticmethod
+    def _could_equal(entry, column, value):
+        if column not in entry.get('columns', []):
+            return False
+        if column in entry.get('values', {}):
+            return value in entry['values'][column]
+        if column in entry.get('ranges', {}):
+            low, high = entry['ranges'][column]
+            try:
+                return low <= value <= high
+            except TypeError:
+                return True
+        return True
+
+    def select(self, filters=None, equality_columns=()):
+        """Keys of the partitions that can hold a feature matching the filters."""
+        filters = filters or {}
+        keys = []
+        for key, entry in self.partitions.items():
+            if filters.get(self.partition_key) and filters[self.partition_key] != key:
+                continue
+            if any(filters.get(column) and not self._could_equal(entry, column, filters[column])
+                   for column in equality_columns):
+                continue
+            if filters.get('bbox'):
+                if entry.get('bbox') is None or not bbox_mask([entry['bbox']], filters['bbox'])[0]:
+                    continue
+            keys.append(key)
+        return keys
+
+    def prune_range(self, keys, column, low=None, high=None):
+        """Drop partitions whose [min, max] for a numeric column lies outside [low, high]."""
+        kept = []
+        for key in keys:
+            bounds = self.partitions[key].get('ranges', {}).get(column)
+            if bounds is None and column not in self.partitions[key].get('columns', []):
+                continue
+            if bounds is not None and ((low is not None and bounds[1] < low) or
+                                       (high is not None and bounds[0] > high)):
+                continue
+            kept.append(key)
+        return kept
+
+    def candidates(self, value, columns):
+        """Partitions whose value range or set for any of the columns could contain value."""
+        return [key for key, entry in self.partitions.items()
+                if any(self._could_equal(entry, column, value) for column in columns)]
+
+    def distinct_values(self, column):
+        """Union of a column's values from the manifest, or None if some partition did not record them."""
+        values = set()
+        for entry in self.partitions.values():
+            if column not in entry.get('columns', []):
+                continue
+            if column not in entry.get('values', {}):
+                return None
+            values.update(entry['values'][column])
+        return sorted(values)
+
+
+class PartitionCache:
+    """LRU of loaded partitions that evicts the coldest ones above a memory budget."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.loaded = OrderedDict()
+        self.footprints = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def get(self, key, loader, footprint):
+        """Partition for key, loading it (once, even under concurrency) on first access."""
+        with self._lock:
+            if key in self.loaded:
+                self.loaded.move_to_end(key)
+                self.hits += 1
+                return self.loaded[key]
+            event = self._loading.get(key)
+            if event is None:
+                event = self._loading[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            event.wait()
+            with self._lock:
+                if key in self.loaded:
+                    self.hits += 1
+                    return self.loaded[key]
+            return self.get(key, loader, footprint)
+        try:
+            value = loader()
+            size = footprint(value)
+            with self._lock:
+                self.misses += 1
+                self.loaded[key] = value
+                self.footprints[key] = size
+                self._evict(keep=key)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+
+    def _evict(self, keep):
+        while len(self.loaded) > 1 and self.total_bytes() > self.budget_bytes:
+            coldest = next(iter(self.loaded))
+            if coldest == keep:
+                break
+            self.loaded.pop(coldest)
+            self.footprints.pop(coldest, None)
+            self.evictions += 1
+
+    def total_bytes(self):
+        return sum(self.footprints.values())
+
+    def clear(self):
+        with self._lock:
+            self.loaded.clear()
+            self.footprints.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': list(self.loaded),
+                'loaded_bytes': self.total_bytes(),
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python feature_partitions.py <dataset.geojson>")
+        return 1
+    path = build_partition_manifest(sys.argv[1])
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    print(f"Partition manifest with {len(manifest['partitions'])} partitions "
+          f"({manifest['total_features']} features) written to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
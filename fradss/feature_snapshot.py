@@ -0,0 +1,827 @@
+#!/usr/bin/env python3
+"""
+Columnar Feature Snapshots
+Read-only, memory-mapped snapshots of GeoJSON FeatureCollections.
+
+A snapshot is a directory of flat NumPy buffers that every process maps with
+mmap, so N workers share one copy of the data in the page cache and Python
+reference counting never touches (and un-shares) those pages:
+
+    manifest.json                 counts, column kinds, source file stamp
+    <column>.values.npy           numeric columns (float64, NaN = missing)
+    <column>.bool.npy             boolean columns (int8, -1 = missing)
+    <column>.codes.npy            dictionary codes (int32, -1 = missing)
+    <column>.dict.bin/.dict_offsets.npy   sorted dictionary (UTF-8 strings)
+    geometry.types.npy            geometry type per feature
+    geometry.parts.npy / .rings.npy / .coords_offsets.npy   ragged offsets
+    geometry.coords.npy           (n_points, 2) float64 coordinate buffer
+    geometry.bbox.npy             (n_features, 4) minx, miny, maxx, maxy
+    fragments.bin/.offsets.npy    pre-serialized compact GeoJSON features
+
+Strings and other non-numeric values (lists, dicts) are dictionary coded;
+the latter are stored as their JSON text. The generators write a snapshot
+next to each GeoJSON they produce (fra_claims.geojson -> fra_claims.snapshot)
+and the apps map it at startup instead of parsing the JSON.
+
+Usage:
+    python feature_snapshot.py output/india_assets.geojson
+    python feature_snapshot.py output/fra_claims.geojson --pad-properties
+"""
+
+import json
+import os
+import shutil
+import threading
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+# Compact, key-sorted JSON for the pre-serialized fragments (numpy-aware, orjson when installed)
+from json_provider import dumps_compact
+from parallel_generation import generation_time
+
+SNAPSHOT_FORMAT = 'fra-feature-snapshot'
+SNAPSHOT_VERSION = 1
+
+GEOMETRY_TYPES = {None: 0, 'Point': 1, 'LineString': 2, 'Polygon': 3, 'MultiPolygon': 4}
+GEOMETRY_NAMES = {code: name for name, code in GEOMETRY_TYPES.items()}
+
+
+def snapshot_path(geojson_file):
+    """Snapshot directory stored next to a GeoJSON file."""
+    return os.path.splitext(geojson_file)[0] + '.snapshot'
+
+
+def source_stamp(path, start=None):
+    """Identify a source file by size and modification time; its path is kept relative to start if given."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {'path': os.path.relpath(path, start) if start else os.path.abspath(path),
+            'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+# Bytes a spilled buffer collects in memory before it is appended to the spill file
+SPILL_CHUNK = 8192
+
+
+class _Spill:
+    """Append-only typed array kept in a spill file, SPILL_CHUNK bytes at a time.
+
+    Only the unwritten tail is held in memory, so a writer's footprint does not
+    grow with the number of features; read() loads the whole array at close().
+    """
+
+    def __init__(self, spill_file, typecode, initial=()):
+        self.file = spill_file
+        self.typecode = typecode
+        self.buffer = array(typecode)
+        self.capacity = SPILL_CHUNK // self.buffer.itemsize
+        self.segments = []
+        self.spilled = 0
+        self.last = None
+        self.extend(initial)
+
+    def append(self, value):
+        self.buffer.append(value)
+        self.last = value
+        if len(self.buffer) >= self.capacity:
+            self._flush()
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def extend_bytes(self, data):
+        """Append raw bytes (typecode 'B' only)."""
+        self.buffer.frombytes(data)
+        if len(self.buffer) >= self.capacity:
+            self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            self.file.seek(0, os.SEEK_END)
+            self.segments.append((self.file.tell(), len(self.buffer) * self.buffer.itemsize))
+            self.buffer.tofile(self.file)
+            self.spilled += len(self.buffer)
+            self.buffer = array(self.typecode)
+
+    def read(self):
+        """Everything appended so far as a NumPy array."""
+        self.file.flush()
+        chunks = []
+        for offset, size in self.segments:
+            self.file.seek(offset)
+            chunks.append(self.file.read(size))
+        chunks.append(self.buffer.tobytes())
+        self.file.seek(0, os.SEEK_END)
+        return np.frombuffer(b''.join(chunks), dtype=np.dtype(self.typecode))
+
+    def __len__(self):
+        return self.spilled + len(self.buffer)
+
+
+class _Column:
+    """Growable column that settles on the narrowest kind its values allow.
+
+    Values are spilled (_Spill): numbers and booleans as typed values, strings
+    and JSON text as UTF-8 bytes with their lengths. The sorted dictionary is
+    built at close(), one column at a time.
+    """
+
+    def __init__(self, spill_file, missing_before=0):
+        self.file = spill_file
+        self.kind = None
+        self.pending = missing_before
+        self.integer = True
+        self.values = None
+        self.text = None
+
+    def _start(self, kind):
+        self.kind = kind
+        if kind == 'number':
+            self.values = _Spill(self.file, 'd', [float('nan')] * self.pending)
+        elif kind == 'bool':
+            self.values = _Spill(self.file, 'b', [-1] * self.pending)
+        else:
+            # UTF-8 length per row (-1 = missing) and the concatenated text
+            self.values = _Spill(self.file, 'i', [-1] * self.pending)
+            self.text = _Spill(self.file, 'B')
+
+    @staticmethod
+    def _kind_of(value):
+        if isinstance(value, (bool, np.bool_)):
+            return 'bool'
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return 'number'
+        if isinstance(value, str):
+            return 'string'
+        return 'json'
+
+    def _promote_to_json(self):
+        """Re-encode everything seen so far as JSON text once the kinds conflict."""
+        decoded = self.decoded()
+        self.kind, self.pending, self.text = None, 0, None
+        self._start('json')
+        for value in decoded:
+            self.append(value, force_json=True)
+
+    def _strings(self):
+        """(lengths, UTF-8 text of every present row in order) of a string or JSON column."""
+        lengths = self.values.read()
+        text = self.text.read().tobytes()
+        ends = np.cumsum(np.maximum(lengths, 0))
+        starts = ends - np.maximum(lengths, 0)
+        present = np.flatnonzero(lengths >= 0)
+        return lengths, present, [text[start:end] for start, end in zip(starts[present].tolist(), ends[present].tolist())]
+
+    def decoded(self):
+        if self.kind is None:
+            return [None] * self.pending
+        values = self.values.read()
+        if self.kind == 'number':
+            return [None if v != v else (int(v) if self.integer else v) for v in values.tolist()]
+        if self.kind == 'bool':
+            return [None if v < 0 else bool(v) for v in values.tolist()]
+        lengths, present, texts = self._strings()
+        decoded = [None] * len(lengths)
+        for row, text in zip(present.tolist(), texts):
+            value = text.decode('utf-8')
+            decoded[row] = json.loads(value) if self.kind == 'json' else value
+        return decoded
+
+    def dictionary(self):
+        """(codes, sorted UTF-8 dictionary) of a string or JSON column; only its distinct values are held."""
+        lengths = self.values.read()
+        text = self.text.read().tobytes()
+        lookup, codes, start = {}, array('i'), 0
+        for length in lengths.tolist():
+            if length < 0:
+                codes.append(-1)
+                continue
+            value = text[start:start + length]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            codes.append(code)
+            start += length
+        # UTF-8 byte order is code point order, so this sorts like the decoded strings
+        ordered = sorted(lookup)
+        remap = np.empty(len(ordered) + 1, dtype=np.int32)
+        remap[-1] = -1
+        for new_code, value in enumerate(ordered):
+            remap[lookup[value]] = new_code
+        return remap[np.frombuffer(codes, dtype=np.int32)], ordered
+
+    def append(self, value, force_json=False):
+        if value is None or (isinstance(value, float) and value != value):
+            if self.kind is None:
+                self.pending += 1
+            elif self.kind == 'number':
+                self.values.append(float('nan'))
+            else:
+                self.values.append(-1)
+            return
+        kind = 'json' if force_json else self._kind_of(value)
+        if self.kind is None:
+            self._start(kind)
+        elif kind != self.kind:
+            if self.kind == 'json':
+                kind = 'json'
+            else:
+                self._promote_to_json()
+                kind = 'json'
+        if kind == 'number':
+            if not isinstance(value, (int, np.integer)):
+                self.integer = False
+            self.values.append(float(value))
+        elif kind == 'bool':
+            self.values.append(1 if value else 0)
+        else:
+            data = (value if kind == 'string' else dumps_compact(value)).encode('utf-8')
+            self.values.append(len(data))
+            self.text.extend_bytes(data)
+
+    def __len__(self):
+        return self.pending if self.kind is None else len(self.values)
+
+
+class SnapshotWriter:
+    """Incrementally write a snapshot; column and geometry buffers are spilled to disk as they fill.
+
+    source is the file the snapshot mirrors; its size and mtime are recorded on close().
+    """
+
+    def __init__(self, path, fragments=True, source=None, metadata=None):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.with_fragments = fragments
+        self.source = source
+        self.metadata = metadata or {}
+        self.count = 0
+        self.columns = {}
+        if os.path.isdir(self.tmp_path):
+            shutil.rmtree(self.tmp_path)
+        os.makedirs(self.tmp_path)
+        self._spill = open(os.path.join(self.tmp_path, 'buffers.spill'), 'w+b')
+        self.geometry_types = _Spill(self._spill, 'b')
+        self.part_offsets = _Spill(self._spill, 'q', [0])
+        self.ring_offsets = _Spill(self._spill, 'q', [0])
+        self.coord_offsets = _Spill(self._spill, 'q', [0])
+        self.bbox = _Spill(self._spill, 'd')
+        self._coords = open(os.path.join(self.tmp_path, 'geometry.coords.bin'), 'wb')
+        self._fragments = open(os.path.join(self.tmp_path, 'fragments.bin'), 'wb') if fragments else None
+        self._fragment_offsets = _Spill(self._spill, 'q', [0])
+
+    def _add_rings(self, rings, bounds):
+        for ring in rings:
+            flat = array('d')
+            for point in ring:
+                flat.append(float(point[0]))
+                flat.append(float(point[1]))
+            if flat:
+                xs, ys = flat[0::2], flat[1::2]
+                bounds[0] = min(bounds[0], min(xs))
+                bounds[1] = min(bounds[1], min(ys))
+                bounds[2] = max(bounds[2], max(xs))
+                bounds[3] = max(bounds[3], max(ys))
+            flat.tofile(self._coords)
+            self.coord_offsets.append(self.coord_offsets.last + len(flat) // 2)
+        self.ring_offsets.append(self.ring_offsets.last + len(rings))
+
+    def _add_geometry(self, geometry):
+        gtype = (geometry or {}).get('type')
+        coords = (geometry or {}).get('coordinates')
+        if gtype not in GEOMETRY_TYPES:
+            raise ValueError(f"Unsupported geometry type for snapshot: {gtype}")
+        bounds = [np.inf, np.inf, -np.inf, -np.inf]
+        if gtype == 'Point':
+            parts = [[[coords]]]
+        elif gtype == 'LineString':
+            parts = [[coords]]
+        elif gtype == 'Polygon':
+            parts = [coords]
+        elif gtype == 'MultiPolygon':
+            parts = coords
+        else:
+            parts = []
+        for rings in parts:
+            self._add_rings(rings, bounds)
+        self.part_offsets.append(self.part_offsets.last + len(parts))
+        self.geometry_types.append(GEOMETRY_TYPES[gtype])
+        self.bbox.extend(bounds if bounds[0] <= bounds[2] else [np.nan] * 4)
+
+    def add(self, feature, fragment=None):
+        """Append one GeoJSON feature (and optionally its already-serialized text)."""
+        props = feature.get('properties') or {}
+        for name, column in self.columns.items():
+            if name not in props:
+                column.append(None)
+        for name, value in props.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = _Column(self._spill, missing_before=self.count)
+            column.append(value)
+        self._add_geometry(feature.get('geometry'))
+        if self._fragments is not None:
+            data = (fragment if fragment is not None else dumps_compact(feature)).encode('utf-8')
+            self._fragments.write(data)
+            self._fragment_offsets.append(self._fragment_offsets.last + len(data))
+        self.count += 1
+
+    def extend(self, features):
+        for feature in features:
+            self.add(feature)
+        return self
+
+    def _save(self, name, values):
+        np.save(os.path.join(self.tmp_path, name + '.npy'), values)
+
+    def _write_column(self, name, column):
+        meta = {'kind': column.kind or 'empty'}
+        if column.kind == 'number':
+            meta['integer'] = column.integer
+            self._save(f'{name}.values', column.values.read())
+        elif column.kind == 'bool':
+            self._save(f'{name}.bool', column.values.read())
+        elif column.kind in ('string', 'json'):
+            # Sorted dictionary so lookups can binary search without decoding everything
+            codes, ordered = column.dictionary()
+            offsets = np.zeros(len(ordered) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(b) for b in ordered])
+            self._save(f'{name}.codes', codes)
+            self._save(f'{name}.dict_offsets', offsets)
+            with open(os.path.join(self.tmp_path, f'{name}.dict.bin'), 'wb') as f:
+                f.write(b''.join(ordered))
+            meta['cardinality'] = len(ordered)
+        return meta
+
+    def close(self):
+        """Finalize the buffers and atomically move the snapshot into place."""
+        self._coords.close()
+        # Copied behind an .npy header rather than loaded: the coordinates are the largest buffer
+        raw = os.path.join(self.tmp_path, 'geometry.coords.bin')
+        with open(raw, 'rb') as src, open(os.path.join(self.tmp_path, 'geometry.coords.npy'), 'wb') as dst:
+            header = {'descr': np.lib.format.dtype_to_descr(np.dtype(np.float64)), 'fortran_order': False,
+                      'shape': (os.path.getsize(raw) // 16, 2)}
+            np.lib.format.write_array_header_1_0(dst, header)
+            shutil.copyfileobj(src, dst)
+        os.remove(raw)
+        self._save('geometry.types', self.geometry_types.read())
+        self._save('geometry.parts', self.part_offsets.read())
+        self._save('geometry.rings', self.ring_offsets.read())
+        self._save('geometry.coords_offsets', self.coord_offsets.read())
+        self._save('geometry.bbox', self.bbox.read().reshape(-1, 4))
+        if self._fragments is not None:
+            self._fragments.close()
+            self._save('fragments.offsets', self._fragment_offsets.read())
+
+        columns = {}
+        for name, column in self.columns.items():
+            columns[name] = self._write_column(name, column)
+        self._spill.close()
+        os.remove(os.path.join(self.tmp_path, 'buffers.spill'))
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'version': SNAPSHOT_VERSION,
+            'created_at': generation_time().isoformat(),
+            'count': self.count,
+            'columns': columns,
+            'column_order': list(self.columns),
+            'fragments': self._fragments is not None,
+            # Relative to the snapshot, so the manifest does not depend on where the data was generated
+            'source': source_stamp(self.source, self.path) if self.source else None,
+            'metadata': self.metadata
+        }
+        with open(os.path.join(self.tmp_path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Processes that still map the old files keep their (unlinked) pages
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+
+def write_snapshot(features, path, fragments=None, source=None, metadata=None):
+    """Write an iterable of features (with optional parallel fragment strings) as a snapshot."""
+    writer = SnapshotWriter(path, source=source, metadata=metadata)
+    if fragments is None:
+        writer.extend(features)
+    else:
+        for feature, fragment in zip(features, fragments):
+            writer.add(feature, fragment)
+    return writer.close()
+
+
+def write_collection_snapshot(collection, geojson_file, pad_properties=False):
+    """Snapshot a FeatureCollection just written to geojson_file, keeping its top-level members.
+
+    With pad_properties every fragment carries the union of property keys (missing
+    ones as null), the shape the DataFrame-backed APIs serve; pass a list of keys
+    to pad to a wider set, e.g. the columns of the whole dataset for a partition.
+    """
+    features = collection.get('features', [])
+    fragments = None
+    if pad_properties:
+        keys = {} if pad_properties is True else dict.fromkeys(pad_properties)
+        for feature in features:
+            keys.update(dict.fromkeys(feature.get('properties') or {}))
+        fragments = (
+            dumps_compact({
+                'type': 'Feature',
+                'properties': {key: (feature.get('properties') or {}).get(key) for key in keys},
+                'geometry': feature.get('geometry')
+            })
+            for feature in features
+        )
+    metadata = {'collection': {k: v for k, v in collection.items() if k != 'features'}}
+    return write_snapshot(features, snapshot_path(geojson_file), fragments=fragments,
+                          source=geojson_file, metadata=metadata)
+
+
+class StringDictionary:
+    """Sorted dictionary of a coded column, decoded lazily from the mapped buffer."""
+
+    def __init__(self, blob, offsets, is_json=False):
+        self.blob = blob
+        self.offsets = offsets
+        self.is_json = is_json
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def text(self, code):
+        start, end = int(self.offsets[code]), int(self.offsets[code + 1])
+        return bytes(self.blob[start:end]).decode('utf-8')
+
+    def __getitem__(self, code):
+        return self.text(code)
+
+    def decode(self, code):
+        if code < 0:
+            return None
+        text = self.text(code)
+        return json.loads(text) if self.is_json else text
+
+    def code_of(self, value):
+        key = dumps_compact(value) if self.is_json else value
+        if not isinstance(key, str):
+            return None
+        code = bisect_left(self, key)
+        return code if code < len(self) and self.text(code) == key else None
+
+    def values(self):
+        return [self.decode(code) for code in range(len(self))]
+
+
+class FeatureSnapshot:
+    """Read-only view over a snapshot directory; every buffer is memory-mapped."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json'), 'r') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != SNAPSHOT_FORMAT or self.manifest.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot format in {path}")
+        self.count = self.manifest['count']
+        self.columns = self.manifest['columns']
+        self.column_order = self.manifest['column_order']
+        self._arrays = {}
+        self._dictionaries = {}
+
+    @classmethod
+    def open_if_fresh(cls, path, source=None):
+        """Open a snapshot unless it is missing or older than the source it was built from."""
+        if not path or not os.path.exists(os.path.join(path, 'manifest.json')):
+            return None
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError):
+            return None
+        return snapshot if snapshot.is_fresh(source) else None
+    
+    def is_fresh(self, source=None):
+        """True unless the source file exists and differs from the one the snapshot was built from."""
+        current = source_stamp(source) if source else None
+        if current is None:
+            return True
+        stamp = self.manifest.get('source') or {}
+        return stamp.get('size') == current['size'] and stamp.get('mtime') == current['mtime']
+    
+    @property
+    def collection(self):
+        """Top-level FeatureCollection members other than the features."""
+        return (self.manifest.get('metadata') or {}).get('collection') or {'type': 'FeatureCollection'}
+
+    def __len__(self):
+        return self.count
+
+    def _array(self, name):
+        arr = self._arrays.get(name)
+        if arr is None:
+            arr = self._arrays[name] = np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+        return arr
+
+    def _blob(self, name):
+        arr = self._arrays.get(name)
+        if arr is None:
+            file_path = os.path.join(self.path, name)
+            if os.path.getsize(file_path) == 0:
+                arr = np.zeros(0, dtype=np.uint8)
+            else:
+                arr = np.memmap(file_path, dtype=np.uint8, mode='r')
+            self._arrays[name] = arr
+        return arr
+
+    def kind(self, name):
+        return self.columns.get(name, {}).get('kind')
+
+    def dictionary(self, name):
+        dictionary = self._dictionaries.get(name)
+        if dictionary is None:
+            dictionary = self._dictionaries[name] = StringDictionary(
+                self._blob(f'{name}.dict.bin'), self._array(f'{name}.dict_offsets'),
+                is_json=self.kind(name) == 'json'
+            )
+        return dictionary
+
+    def codes(self, name):
+        return self._array(f'{name}.codes')
+
+    def numbers(self, name):
+        """Numeric column as float64 with NaN for missing values."""
+        kind = self.kind(name)
+        if kind == 'number':
+            return self._array(f'{name}.values')
+        if kind == 'bool':
+            raw = self._array(f'{name}.bool')
+            return np.where(raw < 0, np.nan, raw.astype(np.float64))
+        return np.full(self.count, np.nan)
+
+    def missing(self, name):
+        """Boolean mask of rows without a value for the column."""
+        kind = self.kind(name)
+        if kind == 'number':
+            return np.isnan(self._array(f'{name}.values'))
+        if kind == 'bool':
+            return self._array(f'{name}.bool') < 0
+        if kind in ('string', 'json'):
+            return self.codes(name) < 0
+        return np.ones(self.count, dtype=bool)
+
+    def bools(self, name):
+        """Boolean column with missing values as False."""
+        if self.kind(name) == 'bool':
+            return self._array(f'{name}.bool') == 1
+        return np.zeros(self.count, dtype=bool)
+
+    def equals(self, name, value):
+        """Boolean mask of rows whose column equals value (dictionary lookup, no decoding)."""
+        kind = self.kind(name)
+        if kind in ('string', 'json'):
+            code = self.dictionary(name).code_of(value)
+            if code is None:
+                return np.zeros(self.count, dtype=bool)
+            return self.codes(name) == code
+        if kind == 'number':
+            try:
+                return self.numbers(name) == float(value)
+            except (TypeError, ValueError):
+                return np.zeros(self.count, dtype=bool)
+        if kind == 'bool' and isinstance(value, bool):
+            return self._array(f'{name}.bool') == int(value)
+        return np.zeros(self.count, dtype=bool)
+
+    def unique(self, name):
+        """Distinct non-missing values of a column, sorted."""
+        kind = self.kind(name)
+        if kind in ('string', 'json'):
+            used = np.unique(self.codes(name))
+            dictionary = self.dictionary(name)
+            return [dictionary.decode(int(code)) for code in used if code >= 0]
+        if kind in ('number', 'bool'):
+            values = self.numbers(name)
+            values = np.unique(values[~np.isnan(values)])
+            if kind == 'bool':
+                return [bool(v) for v in values]
+            return [int(v) if self.columns[name].get('integer') else float(v) for v in values]
+        return []
+
+    def value(self, name, row):
+        kind = self.kind(name)
+        if kind == 'number':
+            v = float(self._array(f'{name}.values')[row])
+            if v != v:
+                return None
+            return int(v) if self.columns[name].get('integer') else v
+        if kind == 'bool':
+            v = int(self._array(f'{name}.bool')[row])
+            return None if v < 0 else bool(v)
+        if kind in ('string', 'json'):
+            return self.dictionary(name).decode(int(self.codes(name)[row]))
+        return None
+
+    def column_values(self, name):
+        """Decoded column as a Python list (materializes; use for small or derived views)."""
+        kind = self.kind(name)
+        if kind == 'number':
+            values = self._array(f'{name}.values')
+            if self.columns[name].get('integer'):
+                return [None if v != v else int(v) for v in values.tolist()]
+            return [None if v != v else v for v in values.tolist()]
+        if kind == 'bool':
+            return [None if v < 0 else bool(v) for v in self._array(f'{name}.bool').tolist()]
+        if kind in ('string', 'json'):
+            decoded = self.dictionary(name).values()
+            return [decoded[c] if c >= 0 else None for c in self.codes(name).tolist()]
+        return [None] * self.count
+
+    def properties(self, row, include_missing=True):
+        props = {}
+        for name in self.column_order:
+            value = self.value(name, row)
+            if value is not None or include_missing:
+                props[name] = value
+        return props
+
+    def geometry(self, row):
+        gtype = GEOMETRY_NAMES[int(self._array('geometry.types')[row])]
+        if gtype is None:
+            return None
+        parts = self._array('geometry.parts')
+        rings = self._array('geometry.rings')
+        coord_offsets = self._array('geometry.coords_offsets')
+        coords = self._array('geometry.coords')
+        polygons = []
+        for part in range(int(parts[row]), int(parts[row + 1])):
+            polygons.append([
+                coords[int(coord_offsets[ring]):int(coord_offsets[ring + 1])].tolist()
+                for ring in range(int(rings[part]), int(rings[part + 1]))
+            ])
+        if gtype == 'Point':
+            coordinates = polygons[0][0][0]
+        elif gtype == 'LineString':
+            coordinates = polygons[0][0]
+        elif gtype == 'Polygon':
+            coordinates = polygons[0]
+        else:
+            coordinates = polygons
+        return {'type': gtype, 'coordinates': coordinates}
+
+    def bbox(self):
+        """(n, 4) array of feature bounding boxes: minx, miny, maxx, maxy."""
+        return self._array('geometry.bbox')
+
+    def feature(self, row, include_missing=True):
+        return {
+            'type': 'Feature',
+            'properties': self.properties(row, include_missing=include_missing),
+            'geometry': self.geometry(row)
+        }
+
+    def fragment(self, row):
+        """Pre-serialized feature text as bytes."""
+        offsets = self._array('fragments.offsets')
+        return bytes(self._blob('fragments.bin')[int(offsets[row]):int(offsets[row + 1])])
+
+    def join_fragments(self, rows, separator=b','):
+        """Concatenate the fragments of the given rows straight from the mapped buffer."""
+        if not self.manifest.get('fragments'):
+            return separator.join(dumps_compact(self.feature(int(r))).encode('utf-8') for r in rows)
+        offsets = self._array('fragments.offsets')
+        blob = self._blob('fragments.bin')
+        return separator.join(bytes(blob[offsets[r]:offsets[r + 1]]) for r in rows)
+
+    def features(self, rows=None):
+        rows = range(self.count) if rows is None else rows
+        if self.manifest.get('fragments'):
+            return [json.loads(self.fragment(int(r))) for r in rows]
+        return [self.feature(int(r)) for r in rows]
+
+    def to_frame(self, geometry=True):
+        """Properties (and optionally geometry) as a pandas DataFrame, one row per feature."""
+        import pandas as pd
+
+        columns = {name: self.column_values(name) for name in self.column_order}
+        if geometry:
+            columns['geometry'] = [self.geometry(row) for row in range(self.count)]
+        return pd.DataFrame(columns, index=pd.RangeIndex(self.count))
+
+
+class ArrayDictionary(StringDictionary):
+    """Sorted dictionary held in a NumPy string array (for ColumnTable)."""
+
+    def __init__(self, values, is_json=False):
+        self.array = values
+        self.is_json = is_json
+
+    def __len__(self):
+        return len(self.array)
+
+    def text(self, code):
+        return str(self.array[code])
+
+
+class ColumnTable(FeatureSnapshot):
+    """Properties-only FeatureSnapshot built in memory, for sources without a snapshot.
+
+    Only the named columns are kept, in the snapshot's layout (float64 numbers,
+    int32 codes into a sorted dictionary), so the lookups (equals, value,
+    column_values, ...) work unchanged and no per-feature Python objects are
+    held once the table is built. There is no geometry or fragment buffer.
+    """
+
+    def __init__(self, records, columns):
+        collected = {name: [] for name in columns}
+        count = 0
+        for record in records:
+            for name, values in collected.items():
+                values.append(record.get(name))
+            count += 1
+        self.path = None
+        self.manifest = {'count': count, 'fragments': False}
+        self.count = count
+        self.columns = {}
+        self.column_order = list(columns)
+        self._arrays = {}
+        self._dictionaries = {}
+        for name, values in collected.items():
+            self._add_column(name, values)
+
+    def _add_column(self, name, values):
+        present = [v for v in values if v is not None and not (isinstance(v, float) and v != v)]
+        if not present:
+            return
+        if all(_Column._kind_of(v) == 'number' for v in present):
+            self.columns[name] = {'kind': 'number', 'integer': all(isinstance(v, (int, np.integer)) for v in present)}
+            self._arrays[f'{name}.values'] = np.array([np.nan if v is None else float(v) for v in values])
+            return
+        kind = 'string' if all(isinstance(v, str) for v in present) else 'json'
+        texts = [None if v is None or (isinstance(v, float) and v != v)
+                 else (v if kind == 'string' else dumps_compact(v)) for v in values]
+        ordered = sorted(set(text for text in texts if text is not None))
+        lookup = {text: code for code, text in enumerate(ordered)}
+        self.columns[name] = {'kind': kind, 'cardinality': len(ordered)}
+        self._arrays[f'{name}.codes'] = np.fromiter((-1 if text is None else lookup[text] for text in texts),
+                                                     dtype=np.int32, count=len(texts))
+        self._dictionaries[name] = ArrayDictionary(np.array(ordered, dtype=str), is_json=kind == 'json')
+
+    def _array(self, name):
+        return self._arrays[name]
+
+
+_snapshot_cache = {}
+_snapshot_cache_lock = threading.Lock()
+_snapshot_cache_counts = {'hits': 0, 'misses': 0}
+
+
+def cached_snapshot(geojson_file):
+    """Fresh snapshot for a GeoJSON file, mapped once per process; None if there is none."""
+    path = snapshot_path(geojson_file)
+    with _snapshot_cache_lock:
+        snapshot = _snapshot_cache.get(path)
+        if snapshot is None or not snapshot.is_fresh(geojson_file) or not os.path.exists(path):
+            _snapshot_cache_counts['misses'] += 1
+            snapshot = _snapshot_cache[path] = FeatureSnapshot.open_if_fresh(path, geojson_file)
+        else:
+            _snapshot_cache_counts['hits'] += 1
+        return snapshot
+
+
+def snapshot_cache_stats():
+    """Hits and misses of cached_snapshot in this process (a miss also covers 'no snapshot')."""
+    with _snapshot_cache_lock:
+        return dict(_snapshot_cache_counts, mapped=sum(1 for s in _snapshot_cache.values() if s is not None))
+
+
+def render_collection(snapshot, rows=None, extra=None):
+    """FeatureCollection text for the given rows (all by default), built from the fragments."""
+    rows = range(snapshot.count) if rows is None else rows
+    head = dict(snapshot.collection)
+    head.update(extra or {})
+    features = snapshot.join_fragments(rows).decode('utf-8')
+    rest = dumps_compact(head)[1:]
+    return '{"features":[' + features + ']' + ('}' if rest == '}' else ',' + rest)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a memory-mapped snapshot of a GeoJSON FeatureCollection')
+    parser.add_argument('geojson_file')
+    parser.add_argument('--pad-properties', action='store_true',
+                        help='Serialize every feature with the full set of property keys (missing as null)')
+    args = parser.parse_args()
+
+    with open(args.geojson_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    path = write_collection_snapshot(data, args.geojson_file, pad_properties=args.pad_properties)
+    print(f"Snapshot of {len(data.get('features', []))} features written to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
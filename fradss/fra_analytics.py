@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+FRA Claim Analytics
+Grouped, incrementally updatable analytics over FRA claims. ClaimAnalytics
+keeps counters per group (all claims, state, tribal community, submission
+year and month) and visits every claim once; a batch of new or changed claims
+updates the counters in place instead of recomputing the whole dataset:
+
+    analytics = ClaimAnalytics(track=True)
+    analytics.update(claims)            # features or property dicts
+    analytics.update(changed_claims)    # replaces the earlier versions of these claims
+    analytics.result()                  # the fra_analytics.json document
+
+With track=True a compact record of every claim is kept, so a claim that
+arrives again is subtracted before it is re-added; without it the memory does
+not depend on the number of claims and every update is treated as new.
+
+Processing time is the number of days from submission_date to last_updated of
+decided (approved or rejected) claims; claims last updated before their
+submission date are left out. Areas are summed in hundredths of a hectare so
+that updates add and subtract exactly.
+"""
+
+from collections import Counter
+from datetime import date
+
+DECIDED_STATUSES = ('approved', 'rejected')
+PENDING_STATUSES = ('submitted', 'under_review', 'field_verification')
+
+
+def _date(value):
+    """date of an ISO date(time) string, datetime or Timestamp, or None."""
+    if value is None or value != value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _rate(part, total):
+    return round(part / total * 100, 2) if total else 0
+
+
+class ClaimGroup:
+    """Counters of one group of claims."""
+
+    __slots__ = ('claims', 'area', 'approved', 'pending', 'rejected', 'fra_types')
+
+    def __init__(self):
+        self.claims = self.area = self.approved = self.pending = self.rejected = 0
+        self.fra_types = Counter()
+
+    def add(self, record, sign=1):
+        self.claims += sign
+        self.area += sign * record.area
+        self.approved += sign * (record.status == 'approved')
+        self.pending += sign * (record.status in PENDING_STATUSES)
+        self.rejected += sign * (record.status == 'rejected')
+        self.fra_types[record.fra_type] += sign
+        if not self.fra_types[record.fra_type]:
+            del self.fra_types[record.fra_type]
+
+    @property
+    def area_ha(self):
+        return self.area / 100
+
+    def type_counts(self):
+        return {fra_type: count for fra_type, count in self.fra_types.most_common()}
+
+
+class ClaimRecord:
+    """The fields of a claim the analytics use."""
+
+    __slots__ = ('state', 'fra_type', 'status', 'tribal_community', 'area', 'submitted',
+                 'documents', 'field_verified', 'gps_verified', 'processing_days')
+
+    def __init__(self, props):
+        self.state = props.get('state')
+        self.fra_type = props.get('fra_type')
+        self.status = props.get('status')
+        self.tribal_community = props.get('tribal_community')
+        area = props.get('claim_area_ha')
+        self.area = int(round(area * 100)) if area is not None and area == area else 0
+        self.submitted = _date(props.get('submission_date'))
+        documents = props.get('documents_submitted')
+        self.documents = int(documents) if documents is not None and documents == documents else None
+        self.field_verified = bool(props.get('field_verification_done'))
+        self.gps_verified = bool(props.get('gps_coordinates_verified'))
+        self.processing_days = None
+        updated = _date(props.get('last_updated'))
+        if self.status in DECIDED_STATUSES and self.submitted and updated and updated >= self.submitted:
+            self.processing_days = (updated - self.submitted).days
+
+
+class ClaimAnalytics:
+    """Single-pass analytics over FRA claims; see the module docstring."""
+
+    def __init__(self, claims=None, track=False):
+        self.total = ClaimGroup()
+        self.states = {}
+        self.communities = {}
+        self.years = {}
+        self.months = {}
+        self.statuses = Counter()
+        self.documents = [0, 0]          # sum, claims reporting it
+        self.field_verified = 0
+        self.gps_verified = 0
+        self.processing_days = Counter()
+        self.records = {} if track else None
+        if claims is not None:
+            self.update(claims)
+
+    @staticmethod
+    def _props(claim):
+        """Properties of a GeoJSON feature, or the claim itself when it is a property dict."""
+        if claim.get('type') == 'Feature':
+            return claim.get('properties') or {}
+        return claim
+
+    @staticmethod
+    def _group(groups, key):
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = ClaimGroup()
+        return group
+
+    def _apply(self, record, sign):
+        self.total.add(record, sign)
+        keyed = [(self.states, record.state), (self.communities, record.tribal_community)]
+        if record.submitted is not None:
+            keyed.append((self.years, record.submitted.year))
+            keyed.append((self.months, (record.submitted.year, record.submitted.month)))
+        for groups, key in keyed:
+            group = self._group(groups, key)
+            group.add(record, sign)
+            if not group.claims:
+                del groups[key]
+        self.statuses[record.status] += sign
+        if not self.statuses[record.status]:
+            del self.statuses[record.status]
+        if record.documents is not None:
+            self.documents[0] += sign * record.documents
+            self.documents[1] += sign
+        self.field_verified += sign * record.field_verified
+        self.gps_verified += sign * record.gps_verified
+        if record.processing_days is not None:
+            self.processing_days[record.processing_days] += sign
+            if not self.processing_days[record.processing_days]:
+                del self.processing_days[record.processing_days]
+
+    def update(self, claims):
+        """Add a batch of claims; with tracking, claims seen before replace their earlier version."""
+        for claim in claims:
+            props = self._props(claim)
+            record = ClaimRecord(props)
+            claim_id = props.get('claim_id')
+            if self.records is not None and claim_id is not None:
+                previous = self.records.get(claim_id)
+                if previous is not None:
+                    self._apply(previous, -1)
+                self.records[claim_id] = record
+            self._apply(record, 1)
+        return self
+
+    def remove(self, claim_ids):
+        """Drop tracked claims by id."""
+        if self.records is None:
+            raise ValueError("remove() needs ClaimAnalytics(track=True)")
+        for claim_id in claim_ids:
+            record = self.records.pop(claim_id, None)
+            if record is not None:
+                self._apply(record, -1)
+        return self
+
+    def processing_time(self):
+        """Days from submission to the last update of decided claims: mean, median, p90, min, max."""
+        claims = sum(self.processing_days.values())
+        if not claims:
+            return {'claims': 0, 'mean': None, 'median': None, 'p90': None, 'min': None, 'max': None}
+        days = sorted(self.processing_days)
+        cumulative, quantiles = 0, {}
+        targets = {'median': (claims + 1) // 2, 'p90': -(-claims * 9 // 10)}
+        for day in days:
+            cumulative += self.processing_days[day]
+            for name, rank in targets.items():
+                if name not in quantiles and cumulative >= rank:
+                    quantiles[name] = day
+        return {
+            'claims': claims,
+            'mean': round(sum(day * count for day, count in self.processing_days.items()) / claims, 1),
+            'median': quantiles['median'],
+            'p90': quantiles['p90'],
+            'min': days[0],
+            'max': days[-1]
+        }
+
+    def result(self):
+        """The analytics document the generator writes to fra_analytics.json."""
+        total = self.total
+        processing = self.processing_time()
+        return {
+            "summary": {
+                "total_claims": total.claims,
+                "claims_by_type": total.type_counts(),
+                "claims_by_status": dict(self.statuses.most_common()),
+                "claims_by_state": {state: group.claims for state, group in
+                                    sorted(self.states.items(), key=lambda item: -item[1].claims)},
+                "total_area_ha": round(total.area_ha, 2),
+                "average_claim_size_ha": round(total.area_ha / total.claims, 2) if total.claims else 0
+            },
+            "state_wise_analysis": {
+                state: {
+                    "total_claims": group.claims,
+                    "approved_claims": group.approved,
+                    "pending_claims": group.pending,
+                    "rejected_claims": group.rejected,
+                    "total_area_ha": round(group.area_ha, 2),
+                    "approval_rate": _rate(group.approved, group.claims)
+                }
+                for state, group in self.states.items()
+            },
+            "tribal_community_analysis": {
+                community: {
+                    "total_claims": group.claims,
+                    "claim_area_ha": round(group.area_ha, 2),
+                    "approved_claims": group.approved
+                }
+                for community, group in sorted(self.communities.items(), key=lambda item: str(item[0]))
+            },
+            "timeline_analysis": {
+                year: {"claims_submitted": group.claims, "claim_area_ha": round(group.area_ha, 2)}
+                for year, group in sorted(self.years.items())
+            },
+            "performance_metrics": {
+                "overall_approval_rate": _rate(total.approved, total.claims),
+                "average_processing_days": processing['mean'],
+                "processing_time_days": processing,
+                "documentation_completeness": round(self.documents[0] / self.documents[1], 2) if self.documents[1] else 0,
+                "field_verification_rate": _rate(self.field_verified, total.claims),
+                "gps_verification_rate": _rate(self.gps_verified, total.claims)
+            }
+        }
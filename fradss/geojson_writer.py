@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Streaming GeoJSON Writers
+Write a FeatureCollection one feature at a time with compact separators,
+together with its columnar snapshot (feature_snapshot.py) and, for partitioned
+datasets, the shard of every partition and the partition manifest
+(feature_partitions.py), all in one pass. Each feature is encoded once and
+dropped after it is written. The snapshot writers spill their column and
+geometry buffers to disk in small chunks and only the partition statistics
+stay in memory, so the writers' footprint does not grow with the dataset.
+
+    writer = PartitionedCollectionWriter('output/fra_claims.geojson', pad_properties=CLAIM_PROPERTIES)
+    for feature in features:
+        writer.add(feature)
+    writer.close(properties={'total_claims': writer.count})
+
+The collection's "properties" member is written after the features, when the
+counts are known. Files are written to a temporary name and moved into place
+on close().
+"""
+
+import os
+
+from feature_partitions import PartitionStats, partition_file, write_partition_manifest
+from feature_snapshot import SnapshotWriter, snapshot_path
+from json_provider import dumps_bytes, dumps_compact
+from parallel_generation import clamp_mtime
+
+
+class FeatureCollectionWriter:
+    """Stream a FeatureCollection to path and its snapshot.
+
+    pad_properties lists the property keys every snapshot fragment carries
+    (missing ones as null), the shape the DataFrame-backed APIs serve; unlike
+    write_collection_snapshot the keys have to be known up front.
+    """
+
+    def __init__(self, path, pad_properties=None, snapshot=True, stats=False):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.pad_properties = list(pad_properties) if pad_properties else None
+        self.count = 0
+        self.snapshot = SnapshotWriter(snapshot_path(path), source=path) if snapshot else None
+        self.stats = PartitionStats() if stats else None
+        self._file = open(self.tmp_path, 'wb')
+        self._file.write(b'{"type":"FeatureCollection","features":[')
+
+    def encode(self, feature):
+        """(GeoJSON text, snapshot fragment) of a feature, for writers that store it more than once."""
+        fragment = None
+        if self.pad_properties is not None:
+            props = feature.get('properties') or {}
+            fragment = dumps_compact({
+                'type': 'Feature',
+                'properties': {key: props.get(key) for key in self.pad_properties},
+                'geometry': feature.get('geometry')
+            })
+        return dumps_bytes(feature), fragment
+
+    def add(self, feature, encoded=None):
+        text, fragment = encoded or self.encode(feature)
+        if self.count:
+            self._file.write(b',')
+        self._file.write(text)
+        if self.snapshot is not None:
+            self.snapshot.add(feature, fragment)
+        if self.stats is not None:
+            self.stats.add(feature)
+        self.count += 1
+
+    def extend(self, features):
+        for feature in features:
+            self.add(feature)
+        return self
+
+    def close(self, properties=None):
+        """Write the collection's properties, move the file into place and finish the snapshot."""
+        self._file.write(b'],"properties":' + dumps_bytes(properties or {}) + b'}\n')
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+        # Before the snapshot and manifest stamp it
+        clamp_mtime(self.path)
+        if self.snapshot is not None:
+            self.snapshot.metadata = {'collection': {'type': 'FeatureCollection', 'properties': properties or {}}}
+            self.snapshot.close()
+        return self.path
+
+
+class PartitionedCollectionWriter:
+    """Stream a dataset to its monolithic file and one shard per partition key, then write the manifest.
+
+    Shards are named by partition_file() and padded to the same keys as the
+    main snapshot, so a partition serves the same features as the whole file.
+    """
+
+    def __init__(self, path, partition_key='state', pad_properties=None):
+        self.main = FeatureCollectionWriter(path, pad_properties)
+        self.partition_key = partition_key
+        self.shards = {}
+
+    @property
+    def count(self):
+        return self.main.count
+
+    def add(self, feature):
+        encoded = self.main.encode(feature)
+        self.main.add(feature, encoded)
+        key = (feature.get('properties') or {}).get(self.partition_key)
+        shard = self.shards.get(key)
+        if shard is None:
+            shard = self.shards[key] = FeatureCollectionWriter(
+                partition_file(self.main.path, key), self.main.pad_properties, stats=True
+            )
+        shard.add(feature, encoded)
+
+    def extend(self, features):
+        for feature in features:
+            self.add(feature)
+        return self
+
+    def close(self, properties=None, partition_properties=None):
+        """Finish every file; partition_properties(key, count) gives a shard's properties. Returns the manifest path."""
+        for key, shard in self.shards.items():
+            shard.close(partition_properties(key, shard.count) if partition_properties else None)
+        self.main.close(properties)
+        # Counts, bboxes and value ranges the WebGIS app prunes partitions with
+        return write_partition_manifest(
+            self.main.path, [(key, shard.path, shard.stats) for key, shard in self.shards.items()], self.partition_key
+        )
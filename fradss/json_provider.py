@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Numpy-aware JSON Encoding
+One JSON layer for the Flask apps, the snapshot fragments and the generators.
+numpy scalars and arrays, NaN/inf (as null), dates and datetimes (ISO 8601,
+pandas timestamps included) are encoded natively, with orjson when it is
+installed and the standard library otherwise.
+
+    app.json = NumpyJSONProvider(app)
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _default(obj):
+    """Values neither encoder handles itself: numpy, dates and Flask's extras (Decimal, UUID, dataclasses, HTML)."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date, time)):
+        # pandas.NaT is a datetime that is not equal to itself
+        return None if obj != obj else obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _key(key):
+    if isinstance(key, (str, int, float, bool)) or key is None:
+        return key
+    value = _default(key)
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
+
+
+def jsonable(obj):
+    """Plain-Python copy of obj with NaN/inf as None, for the standard-library encoder."""
+    if isinstance(obj, float):
+        return float(obj) if obj == obj and obj not in (float('inf'), float('-inf')) else None
+    if isinstance(obj, (str, int, bool)) or obj is None:
+        return obj
+    if isinstance(obj, dict):
+        return {_key(k): jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [jsonable(v) for v in obj]
+    return jsonable(_default(obj))
+
+
+def dumps_bytes(obj, sort_keys=False, indent=False):
+    """UTF-8 JSON for obj: compact, or indented by two spaces."""
+    if orjson is not None:
+        option = ORJSON_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            # numpy dict keys or integers beyond 64 bits; the stdlib path converts them
+            pass
+    kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+    try:
+        text = json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False, allow_nan=False, **kwargs)
+    except (TypeError, ValueError):
+        text = json.dumps(jsonable(obj), default=_default, sort_keys=sort_keys, ensure_ascii=False, **kwargs)
+    return text.encode('utf-8')
+
+
+def dumps_compact(obj):
+    """Compact, key-sorted JSON text used for the pre-serialized fragments."""
+    return dumps_bytes(obj, sort_keys=True).decode('utf-8')
+
+
+def dump(obj, fp, indent=True):
+    """Write obj to a text file, indented like json.dump(..., indent=2)."""
+    fp.write(dumps_bytes(obj, indent=indent).decode('utf-8'))
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider on top of dumps_bytes; responses are encoded straight to bytes."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                           indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Like jsonify(): one positional argument, several (as a list) or keyword arguments (as a dict)."""
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = (args[0] if len(args) == 1 else list(args)) if args else (kwargs or None)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Parallel, Reproducible Dataset Generation
+The generators split their work into partitions (states or villages) and hand
+them to generate_partitions(). Every partition gets its own seed stream spawned
+from one SeedSequence; the global `random` and `np.random` states are seeded
+from it while the partition is generated, so the generators' drawing code is
+unchanged. A partition's features depend only on the seed and the partition,
+never on the worker that ran it, and the results are merged in partition order:
+the output is identical for any number of workers.
+
+    features = generate_partitions(generator.generate_state_assets, states, seed=42, workers=4)
+
+iter_partitions() yields the results one partition at a time instead, for
+generators that stream them to disk (geojson_writer.py).
+
+Timestamps written into the data come from generation_time(), which honours
+SOURCE_DATE_EPOCH so that seeded runs are byte-identical; clamp_mtime() sets
+the written files' modification times to it too, so the size and mtime stamps
+in the snapshot and partition manifests repeat as well.
+"""
+
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+def generation_time():
+    """Reference time of a generator run: SOURCE_DATE_EPOCH (UTC) when set, otherwise now."""
+    epoch = os.getenv('SOURCE_DATE_EPOCH')
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc).replace(tzinfo=None)
+    return datetime.now()
+
+
+def clamp_mtime(path):
+    """Set a generated file's modification time to SOURCE_DATE_EPOCH, if it is set."""
+    epoch = os.getenv('SOURCE_DATE_EPOCH')
+    if epoch:
+        os.utime(path, (int(epoch), int(epoch)))
+
+
+def _child(seed_sequence, index):
+    """The index-th child of seed_sequence, the same on every call (unlike spawn())."""
+    return np.random.SeedSequence(seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + (index,))
+
+
+@contextmanager
+def seeded_random(seed_sequence):
+    """Seed the global random and np.random states from independent children of seed_sequence.
+
+    The previous states are restored on exit.
+    """
+    python_state, numpy_state = random.getstate(), np.random.get_state()
+    random.seed(int.from_bytes(_child(seed_sequence, 0).generate_state(8).tobytes(), 'little'))
+    np.random.seed(_child(seed_sequence, 1).generate_state(8))
+    try:
+        yield
+    finally:
+        random.setstate(python_state)
+        np.random.set_state(numpy_state)
+
+
+def _generate_partition(task, partition, seed_sequence):
+    with seeded_random(seed_sequence):
+        return task(partition)
+
+
+def iter_partitions(task, partitions, seed=None, workers=1):
+    """Yield task(partition) for every partition on its own spawned seed stream, in partition order.
+
+    With workers > 1 the partitions run in a process pool, so task must be
+    picklable (a module-level function or a bound method of a picklable object).
+    At most 2 * workers partitions are in flight, so a consumer that writes each
+    result as it arrives holds only a few partitions at a time.
+    seed=None draws fresh entropy: still independent streams, but not repeatable.
+    """
+    partitions = list(partitions)
+    seeds = np.random.SeedSequence(seed).spawn(len(partitions))
+    if workers is None or workers <= 1 or len(partitions) <= 1:
+        for partition, partition_seed in zip(partitions, seeds):
+            yield _generate_partition(task, partition, partition_seed)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(partitions))) as pool:
+        pending = deque()
+        for partition, partition_seed in zip(partitions, seeds):
+            pending.append(pool.submit(_generate_partition, task, partition, partition_seed))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_partitions(task, partitions, seed=None, workers=1):
+    """All results of iter_partitions() as a list, in partition order."""
+    return list(iter_partitions(task, partitions, seed=seed, workers=workers))
+
+
+def merge_partitions(results):
+    """Concatenate per-partition feature lists in partition order."""
+    return [feature for features in results for feature in features]
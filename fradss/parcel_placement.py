@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Non-Overlapping Parcel Placement
+ParcelPlacer packs parcels (IFR plots, agricultural plots, CR areas) into a
+boundary polygon (a CFR) so that they do not overlap one another beyond a
+configurable ratio. Placed parcels are indexed in a uniform spatial hash grid:
+a candidate is only compared with the parcels registered in the grid cells its
+bounding box covers, so a check costs the same with ten parcels placed as with
+hundreds.
+
+    placer = ParcelPlacer(cfr_ring, max_overlap=0.0)
+    ring = placer.place(shape, rng)      # shape: ring relative to the parcel centre; None if no room
+
+A candidate centre is drawn uniformly inside the boundary (polygon_sampling.py);
+the parcel fits when it lies inside the boundary and its overlap with every
+parcel placed so far, as a share of the smaller of the two areas, is at most
+max_overlap. Overlaps are exact: parcels are split into convex pieces
+(triangles for concave rings) and the pieces clipped against each other.
+When no candidate fits within `attempts` draws the shape is shrunk and tried
+again; when it still does not fit after the last shrink, place() returns None
+and the parcel is counted in `skipped`. A parcel outside the boundary or over
+max_overlap is never placed.
+"""
+
+import math
+from collections import defaultdict
+
+from polygon_sampling import PolygonSampler, triangulate
+
+# Relative slack for area comparisons (floating-point noise, touching edges)
+AREA_TOLERANCE = 1e-9
+
+
+def ring_area(points):
+    """Signed shoelace area of an open ring; positive when counter-clockwise."""
+    return sum(points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1] for i in range(len(points))) / 2
+
+
+def _open_ring(ring):
+    points = [(float(x), float(y)) for x, y in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return points
+
+
+def convex_pieces(ring):
+    """Counter-clockwise convex polygons covering a ring: the ring itself when convex, else its triangles."""
+    points = _open_ring(ring)
+    if ring_area(points) < 0:
+        points.reverse()
+    n = len(points)
+    turns = [(points[(i + 1) % n][0] - points[i][0]) * (points[(i + 2) % n][1] - points[(i + 1) % n][1])
+             - (points[(i + 1) % n][1] - points[i][1]) * (points[(i + 2) % n][0] - points[(i + 1) % n][0])
+             for i in range(n)]
+    if all(turn >= 0 for turn in turns):
+        return [points]
+    return [[tuple(vertex) for vertex in triangle] for triangle in triangulate(points).tolist()]
+
+
+def _segments_cross(p, q, a, b):
+    """Whether segments pq and ab cross at a single point interior to both (touching does not count)."""
+    d1 = (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0])
+    d2 = (b[0] - a[0]) * (q[1] - a[1]) - (b[1] - a[1]) * (q[0] - a[0])
+    d3 = (q[0] - p[0]) * (a[1] - p[1]) - (q[1] - p[1]) * (a[0] - p[0])
+    d4 = (q[0] - p[0]) * (b[1] - p[1]) - (q[1] - p[1]) * (b[0] - p[0])
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def _point_in_ring(x, y, points):
+    """Ray casting test of a point against an open ring."""
+    inside = False
+    for i in range(len(points)):
+        (ax, ay), (bx, by) = points[i - 1], points[i]
+        if (ay > y) != (by > y) and x < (bx - ax) * (y - ay) / (by - ay) + ax:
+            inside = not inside
+    return inside
+
+
+def clip_area(subject, clip):
+    """Area of the intersection of two counter-clockwise convex polygons (Sutherland-Hodgman)."""
+    output = subject
+    for i in range(len(clip)):
+        if not output:
+            return 0.0
+        (ax, ay), (bx, by) = clip[i - 1], clip[i]
+        points, output = output, []
+        for j in range(len(points)):
+            (px, py), (qx, qy) = points[j - 1], points[j]
+            # Side of the clip line ab: >= 0 is inside
+            p_side = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+            q_side = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax)
+            if (p_side >= 0) != (q_side >= 0):
+                # Edge pq crosses the clip line
+                t = p_side / (p_side - q_side)
+                output.append((px + t * (qx - px), py + t * (qy - py)))
+            if q_side >= 0:
+                output.append((qx, qy))
+    return abs(ring_area(output)) if len(output) >= 3 else 0.0
+
+
+def _bbox(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _bboxes_meet(a, b):
+    return not (a[2] < b[0] or b[2] < a[0] or a[3] < b[1] or b[3] < a[1])
+
+
+class Parcel:
+    """A placed (or candidate) parcel: ring, convex pieces with their bounding boxes, bounding box and area."""
+
+    __slots__ = ('ring', 'pieces', 'bbox', 'area')
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.pieces = [(piece, _bbox(piece)) for piece in convex_pieces(ring)]
+        self.bbox = _bbox(ring)
+        self.area = abs(ring_area(_open_ring(ring)))
+
+    def _transformed(self, transform, area):
+        parcel = Parcel.__new__(Parcel)
+        parcel.ring = [list(transform(x, y)) for x, y in self.ring]
+        parcel.pieces = []
+        for piece, (x0, y0, x1, y1) in self.pieces:
+            parcel.pieces.append(([transform(x, y) for x, y in piece], transform(x0, y0) + transform(x1, y1)))
+        parcel.bbox = transform(*self.bbox[:2]) + transform(*self.bbox[2:])
+        parcel.area = area
+        return parcel
+
+    def moved(self, dx, dy):
+        """The parcel translated by (dx, dy), reusing its convex pieces."""
+        return self._transformed(lambda x, y: (x + dx, y + dy), self.area)
+
+    def scaled(self, factor):
+        """The parcel scaled (factor > 0) about the origin, i.e. its centre for a shape."""
+        return self._transformed(lambda x, y: (x * factor, y * factor), self.area * factor * factor)
+
+    def intersects_bbox(self, other):
+        return _bboxes_meet(self.bbox, other.bbox)
+
+    def overlap_area(self, other):
+        return sum(clip_area(piece, other_piece)
+                   for piece, bbox in self.pieces
+                   for other_piece, other_bbox in other.pieces if _bboxes_meet(bbox, other_bbox))
+
+
+class ParcelPlacer:
+    """Place parcels inside a boundary ring without overlapping; see the module docstring.
+
+    cell_size is the grid spacing in coordinate units; by default twice the
+    larger bounding-box side of the first parcel. A parcel that finds no spot
+    in `attempts` candidates is scaled by `shrink` and tried again, up to
+    max_shrinks times (counted in `shrunk`), before it is skipped.
+    """
+
+    def __init__(self, boundary, max_overlap=0.0, cell_size=None, attempts=30, shrink=0.8, max_shrinks=3,
+                 sampler=None):
+        if not 0 <= max_overlap <= 1:
+            raise ValueError("max_overlap must be between 0 and 1")
+        self.boundary = Parcel(boundary)
+        self.sampler = sampler or PolygonSampler(boundary)
+        points = _open_ring(boundary)
+        self.boundary_points = points
+        self.boundary_edges = [
+            (points[i - 1], points[i], min(points[i - 1][0], points[i][0]), min(points[i - 1][1], points[i][1]),
+             max(points[i - 1][0], points[i][0]), max(points[i - 1][1], points[i][1]))
+            for i in range(len(points))
+        ]
+        self.max_overlap = max_overlap
+        self.cell_size = cell_size
+        self.attempts = attempts
+        self.shrink = shrink
+        self.max_shrinks = max_shrinks
+        self.grid = defaultdict(list)
+        self.parcels = []
+        self.shrunk = 0
+        self.skipped = 0
+
+    def _cells(self, bbox):
+        if self.cell_size is None:
+            self.cell_size = 2 * max(bbox[2] - bbox[0], bbox[3] - bbox[1]) or 1.0
+        size = self.cell_size
+        for ix in range(math.floor(bbox[0] / size), math.floor(bbox[2] / size) + 1):
+            for iy in range(math.floor(bbox[1] / size), math.floor(bbox[3] / size) + 1):
+                yield ix, iy
+
+    def neighbours(self, parcel):
+        """Placed parcels whose grid cells and bounding boxes meet the parcel's."""
+        seen = set()
+        for cell in self._cells(parcel.bbox):
+            for index in self.grid.get(cell, ()):
+                if index not in seen:
+                    seen.add(index)
+                    if parcel.intersects_bbox(self.parcels[index]):
+                        yield self.parcels[index]
+
+    def inside(self, parcel):
+        """Whether the parcel lies inside the boundary: no edges cross and one of its vertices is inside."""
+        x0, y0, x1, y1 = parcel.bbox
+        b = self.boundary.bbox
+        if x0 < b[0] or y0 < b[1] or x1 > b[2] or y1 > b[3]:
+            return False
+        ring = parcel.ring
+        for a, c, ex0, ey0, ex1, ey1 in self.boundary_edges:
+            if ex1 < x0 or ex0 > x1 or ey1 < y0 or ey0 > y1:
+                continue  # Edge away from the parcel
+            for i in range(1, len(ring)):
+                if _segments_cross(ring[i - 1], ring[i], a, c):
+                    return False
+        # Use the centroid of a convex piece: a vertex may lie on the boundary
+        piece = parcel.pieces[0][0]
+        return _point_in_ring(sum(x for x, _ in piece) / len(piece), sum(y for _, y in piece) / len(piece),
+                              self.boundary_points)
+
+    def overlap(self, parcel):
+        """Largest overlap with a placed parcel, as a share of the smaller area (0 when clear)."""
+        worst = 0.0
+        for other in self.neighbours(parcel):
+            smaller = min(parcel.area, other.area)
+            if smaller:
+                worst = max(worst, parcel.overlap_area(other) / smaller)
+        return worst
+
+    def fits(self, ring):
+        parcel = ring if isinstance(ring, Parcel) else Parcel(ring)
+        return self.inside(parcel) and self.overlap(parcel) <= self.max_overlap + AREA_TOLERANCE
+
+    def add(self, ring):
+        """Register a parcel (placed or pre-existing) in the grid."""
+        parcel = ring if isinstance(ring, Parcel) else Parcel(ring)
+        self.parcels.append(parcel)
+        for cell in self._cells(parcel.bbox):
+            self.grid[cell].append(len(self.parcels) - 1)
+        return parcel
+
+    def _centres(self, centre, attempts, rng):
+        if centre is not None:
+            yield centre
+            attempts -= 1
+        if attempts > 0:
+            yield from self.sampler.sample(attempts, rng).tolist()
+
+    def place(self, shape, rng=None, attempts=None, centre=None):
+        """Place a parcel of the given shape (closed ring relative to its centre); returns its ring.
+
+        rng is a numpy RandomState, or the global np.random state. centre, when
+        given, is tried first (e.g. drawn for a whole batch beforehand); the
+        other candidates are only drawn when it does not fit. Returns None,
+        placing nothing, when no candidate fits after the last shrink.
+        """
+        shape = shape if isinstance(shape, Parcel) else Parcel(shape)
+        for shrinks in range(self.max_shrinks + 1):
+            if shrinks:
+                shape = shape.scaled(self.shrink)
+            for cx, cy in self._centres(centre if not shrinks else None, attempts or self.attempts, rng):
+                parcel = shape.moved(cx, cy)
+                if self.fits(parcel):
+                    self.shrunk += bool(shrinks)
+                    self.add(parcel)
+                    return parcel.ring
+        self.skipped += 1
+        return None
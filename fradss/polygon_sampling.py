@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Uniform Point Sampling Inside Polygons
+A polygon is triangulated once (ear clipping, so concave rings work too) and
+the cumulative share of each triangle in the total area is cached; a point is
+then a triangle drawn from that CDF and a uniform point inside it. There are
+no rejections and no fallbacks: every point lies inside the polygon, and any
+number of points costs one array draw per coordinate.
+
+    sampler = PolygonSampler(ring)                    # [[lon, lat], ...], closed or not
+    points = sampler.sample(100, rng)                 # (100, 2) array of [lon, lat]
+
+    samplers = PolygonSetSampler(rings)               # many polygons, e.g. the CFRs of a batch
+    points = samplers.sample(owners, rng)             # one point inside rings[owner] per entry
+
+    points = sample_points(ring, 1000, seed=7)        # test data
+
+rng is a numpy RandomState (or the global np.random state when omitted), so
+the generators' seeded streams (parallel_generation.py) drive the sampling.
+"""
+
+import numpy as np
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _in_triangle(p, a, b, c):
+    """Whether p lies in (or on) the counter-clockwise triangle abc."""
+    return _cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0
+
+
+def triangulate(ring):
+    """Triangles covering a simple polygon ring, as an (n, 3, 2) array.
+
+    The ring may be closed or not and in either orientation; repeated and
+    collinear vertices are dropped. A ring that has no ear left (it
+    intersects itself) has its remainder fanned from a vertex.
+    """
+    points = []
+    for point in ring:
+        point = (float(point[0]), float(point[1]))
+        if not points or point != points[-1]:
+            points.append(point)
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    if len(points) < 3:
+        raise ValueError("a polygon needs at least 3 distinct vertices")
+    # Shoelace area: make the ring counter-clockwise
+    area = sum(points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1] for i in range(len(points)))
+    if area < 0:
+        points.reverse()
+
+    remaining = list(range(len(points)))
+    triangles = []
+    while len(remaining) > 3:
+        for k in range(len(remaining)):
+            a, b, c = (points[remaining[k - 1]], points[remaining[k]],
+                       points[remaining[(k + 1) % len(remaining)]])
+            turn = _cross(a, b, c)
+            if turn == 0:
+                # Collinear vertex: no area to cover
+                del remaining[k]
+                break
+            if turn < 0:
+                continue  # Reflex vertex
+            if any(_in_triangle(points[i], a, b, c) for i in remaining
+                   if points[i] not in (a, b, c)):
+                continue
+            triangles.append((a, b, c))
+            del remaining[k]
+            break
+        else:
+            # No ear: self-intersecting ring
+            first = points[remaining[0]]
+            triangles.extend((first, points[remaining[i]], points[remaining[i + 1]])
+                             for i in range(1, len(remaining) - 1))
+            remaining = []
+    if len(remaining) == 3:
+        triangles.append(tuple(points[i] for i in remaining))
+    return np.array(triangles, dtype=float).reshape(-1, 3, 2)
+
+
+def _triangle_areas(triangles):
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    return np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 2
+
+
+def _points_in_triangles(triangles, rng):
+    """One uniform point inside each triangle of an (n, 3, 2) array."""
+    r1, r2 = rng.random_sample((2, len(triangles)))
+    # Reflect the points of the unit square's upper half into the triangle
+    flip = r1 + r2 > 1
+    r1[flip], r2[flip] = 1 - r1[flip], 1 - r2[flip]
+    a = triangles[:, 0]
+    return a + r1[:, None] * (triangles[:, 1] - a) + r2[:, None] * (triangles[:, 2] - a)
+
+
+class PolygonSampler:
+    """Uniform points inside one polygon ring ([x, y] pairs, e.g. [lon, lat])."""
+
+    def __init__(self, ring):
+        self.triangles = triangulate(ring)
+        areas = _triangle_areas(self.triangles)
+        self.area = float(areas.sum())
+        self.cdf = np.cumsum(areas) / self.area if self.area else np.linspace(0, 1, len(areas) + 1)[1:]
+        self.cdf[-1] = 1.0
+
+    def sample(self, n, rng=None):
+        """n uniform points inside the polygon, as an (n, 2) array."""
+        rng = np.random if rng is None else rng
+        index = np.searchsorted(self.cdf, rng.random_sample(n), side='right')
+        return _points_in_triangles(self.triangles[index], rng)
+
+
+class PolygonSetSampler:
+    """Uniform points inside many polygons at once, each triangulated once.
+
+    The triangles of all rings are kept in one array with one CDF running from
+    i to i + 1 over ring i, so a batch of points for any mix of rings is a
+    single search and draw.
+    """
+
+    def __init__(self, rings):
+        self.samplers = [ring if isinstance(ring, PolygonSampler) else PolygonSampler(ring) for ring in rings]
+        self.triangles = np.concatenate([sampler.triangles for sampler in self.samplers])
+        self.cdf = np.concatenate([index + sampler.cdf for index, sampler in enumerate(self.samplers)])
+        self.areas = np.array([sampler.area for sampler in self.samplers])
+        # Last triangle of every ring, against i + u rounding up to i + 1
+        self.last = np.cumsum([len(sampler.triangles) for sampler in self.samplers]) - 1
+
+    def sample(self, owners, rng=None):
+        """One uniform point inside rings[owner] for every entry of owners, as an (n, 2) array."""
+        rng = np.random if rng is None else rng
+        owners = np.asarray(owners)
+        index = np.searchsorted(self.cdf, owners + rng.random_sample(len(owners)), side='right')
+        index = np.minimum(index, self.last[owners])
+        return _points_in_triangles(self.triangles[index], rng)
+
+
+def sample_points(ring, n, rng=None, seed=None):
+    """n uniform points inside ring as an (n, 2) array; seed gives a private, repeatable stream."""
+    if rng is None and seed is not None:
+        rng = np.random.RandomState(seed)
+    return PolygonSampler(ring).sample(n, rng)
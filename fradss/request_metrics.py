@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Request Metrics
+In-process request instrumentation for the Flask apps, exposed at /metrics in
+the Prometheus text format (no client library or external service needed).
+
+Per route (the URL rule, e.g. /api/claim/<claim_id>) it records request counts
+by status, latency, response size and the number of GeoJSON features returned;
+cache hit/miss counters are collected from the registered caches at scrape time.
+
+    metrics = RequestMetrics(app, 'fra_webgis')
+    metrics.count_features(len(features))              # inside a view
+    metrics.add_cache('snapshots', snapshot_cache_stats)
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))          # 256 B .. 64 MB
+FEATURE_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect and three additions."""
+
+    def __init__(self, name, help_text, labelnames, buckets):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class RequestMetrics:
+    """Flask hooks that time every request, plus the /metrics endpoint."""
+
+    def __init__(self, app=None, app_name='app'):
+        self.app_name = app_name
+        self._lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'Requests by route, method and status.',
+                                ('app', 'route', 'method', 'status'))
+        self.latency = Histogram('http_request_duration_seconds', 'Request latency by route.',
+                                 ('app', 'route', 'method'), LATENCY_BUCKETS)
+        self.sizes = Histogram('http_response_size_bytes', 'Response body size by route.',
+                               ('app', 'route'), SIZE_BUCKETS)
+        self.features = Histogram('http_response_features', 'GeoJSON features returned by route.',
+                                  ('app', 'route'), FEATURE_BUCKETS)
+        self.caches = {}
+        self.gauges = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+    def add_cache(self, name, stats):
+        """Register a cache; stats() returns a dict with hits, misses and optionally evictions."""
+        self.caches[name] = stats
+
+    def add_gauge(self, name, help_text, value):
+        """Register a gauge read at scrape time; value() returns a number."""
+        self.gauges[name] = (help_text, value)
+
+    @staticmethod
+    def count_features(count):
+        """Record the number of features the current request returns."""
+        g.metrics_features = count
+
+    def _start(self):
+        g.metrics_start = time.perf_counter()
+
+    def _finish(self, response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            # Streamed and file responses have no length to hand; they are timed but not sized
+            size = None if response.is_streamed else response.content_length
+            self.observe(route, request.method, response.status_code, time.perf_counter() - start,
+                         size, g.pop('metrics_features', None))
+        return response
+
+    def observe(self, route, method, status, seconds, size=None, features=None):
+        """Record one finished request (also used by the ASGI handlers that bypass Flask)."""
+        with self._lock:
+            self.requests.inc((self.app_name, route, method, str(status)))
+            self.latency.observe((self.app_name, route, method), seconds)
+            if size is not None:
+                self.sizes.observe((self.app_name, route), size)
+            if features is not None:
+                self.features.observe((self.app_name, route), features)
+
+    def render(self):
+        with self._lock:
+            lines = self.requests.render() + self.latency.render() + self.sizes.render() + self.features.render()
+        hits = Counter('cache_hits_total', 'Cache hits.', ('app', 'cache'))
+        misses = Counter('cache_misses_total', 'Cache misses.', ('app', 'cache'))
+        evictions = Counter('cache_evictions_total', 'Cache evictions.', ('app', 'cache'))
+        ratios = ['# HELP cache_hit_ratio Hits over lookups since start.', '# TYPE cache_hit_ratio gauge']
+        for name, stats in sorted(self.caches.items()):
+            values = stats() or {}
+            labels = (self.app_name, name)
+            hits.inc(labels, values.get('hits', 0))
+            misses.inc(labels, values.get('misses', 0))
+            if 'evictions' in values:
+                evictions.inc(labels, values['evictions'])
+            lookups = values.get('hits', 0) + values.get('misses', 0)
+            ratio = values.get('hits', 0) / lookups if lookups else 0.0
+            ratios.append(f'cache_hit_ratio{_labels(("app", "cache"), labels)} {_number(round(ratio, 6))}')
+        if self.caches:
+            lines += hits.render() + misses.render() + evictions.render() + ratios
+        for name, (help_text, value) in sorted(self.gauges.items()):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge',
+                      f'{name}{_labels(("app",), (self.app_name,))} {_number(value())}']
+        return '\n'.join(lines) + '\n'
+
+    def export(self):
+        return Response(self.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+On-demand Request Profiling
+Opt-in profiler for single requests of the Flask apps. A request is profiled
+only when profiling is enabled in the config, a secret is configured and the
+request carries it in the X-Profile header. A query argument would end up in
+the server's access log, so the secret is never read from the URL:
+
+    curl -H 'X-Profile: <secret>' 'http://127.0.0.1:5001/api/fra-claims?state=Odisha'
+    curl -H 'X-Profile: <secret>' 'http://127.0.0.1:5001/dss/FRA_000010?format=json&_profile_mode=trace'
+
+Two modes:
+    sample  a background thread samples the request thread's stack every
+            `interval` seconds (low overhead; weights are sample counts)
+    trace   a deterministic sys.setprofile tracer (exact, slower; weights are
+            microseconds of self time)
+
+Both produce folded stacks ("root;caller;callee weight" lines) that
+flamegraph.pl, speedscope and inferno read directly. The N slowest profiles of
+the last `window` seconds are kept in memory; the profile id is returned in the
+X-Profile-Id header and the profiles are served, behind the same secret, at
+/api/profiles and /api/profiles/<id>.
+"""
+
+import hmac
+import heapq
+import itertools
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import Response, abort, g, jsonify, request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODE_HEADER = 'X-Profile-Mode'
+# No longer accepted; still left out of the stored path if a client sends it
+PROFILE_ARG = '_profile'
+PROFILE_MODE_ARG = '_profile_mode'
+MODES = ('sample', 'trace')
+
+
+def frame_name(code):
+    """Flame-graph frame label: function (dir/file.py:line); never contains ';'."""
+    path = code.co_filename.replace('\\', '/').split('/')
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            if names:
+                key = ';'.join(reversed(names))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+class CallTracer:
+    """Deterministic tracer: self time in microseconds per call stack of the current thread."""
+
+    def __init__(self):
+        self.stacks = {}
+        self._frames = []     # [name, start, child_time]
+        self._clock = time.perf_counter
+
+    def start(self):
+        sys.setprofile(self._event)
+
+    def _event(self, frame, event, arg):
+        now = self._clock()
+        if event == 'call' or event == 'c_call':
+            name = frame_name(frame.f_code) if event == 'call' else f"{getattr(arg, '__qualname__', arg)} (builtin)"
+            self._frames.append([name, now, 0.0])
+        elif self._frames and event in ('return', 'c_return', 'c_exception'):
+            name, start, child = self._frames.pop()
+            elapsed = now - start
+            key = ';'.join(f[0] for f in self._frames) + (';' if self._frames else '') + name
+            self.stacks[key] = self.stacks.get(key, 0) + int(round((elapsed - child) * 1e6))
+            if self._frames:
+                self._frames[-1][2] += elapsed
+
+    def stop(self):
+        sys.setprofile(None)
+        return {stack: weight for stack, weight in self.stacks.items() if weight > 0}
+
+
+class RequestProfiler:
+    """Flask hooks that profile requests carrying the secret, and a store of the slowest profiles."""
+
+    def __init__(self, app=None, enabled=False, secret=None, keep=20, window=3600, interval=0.001):
+        self.enabled = bool(enabled and secret)
+        self.secret = secret or ''
+        self.keep = keep
+        self.window = window
+        self.interval = interval
+        self._ids = itertools.count(1)
+        self._slowest = []    # min-heap of (duration, id, profile)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/api/profiles', 'list_profiles', self.list_profiles)
+        app.add_url_rule('/api/profiles/<int:profile_id>', 'get_profile', self.get_profile)
+
+    def authorized(self, token):
+        # Compared as bytes: compare_digest rejects str with non-ASCII characters
+        return self.enabled and bool(token) and hmac.compare_digest(str(token).encode('utf-8'),
+                                                                    self.secret.encode('utf-8'))
+
+    def requested(self, headers, args):
+        """Mode to profile a request with, or None (works on Flask and ASGI request data)."""
+        if not self.authorized(headers.get(PROFILE_HEADER)):
+            return None
+        mode = headers.get(PROFILE_MODE_HEADER) or args.get(PROFILE_MODE_ARG) or 'sample'
+        return mode if mode in MODES else 'sample'
+
+    def _start(self):
+        if not self.enabled or request.endpoint in ('list_profiles', 'get_profile'):
+            return
+        mode = self.requested(request.headers, request.args)
+        if mode is None:
+            return
+        profiler = CallTracer() if mode == 'trace' else StackSampler(threading.get_ident(), self.interval)
+        g.profile = (mode, profiler, time.perf_counter(), datetime.now().isoformat())
+        profiler.start()
+
+    def _finish(self, response):
+        state = g.pop('profile', None)
+        if state is None:
+            return response
+        mode, profiler, start, started_at = state
+        stacks = profiler.stop()
+        duration = time.perf_counter() - start
+        query = '&'.join(f'{k}={v}' for k, v in request.args.items(multi=True) if k != PROFILE_ARG)
+        profile = {
+            'id': next(self._ids),
+            'method': request.method,
+            'path': request.path + ('?' + query if query else ''),
+            'route': request.url_rule.rule if request.url_rule is not None else None,
+            'status': response.status_code,
+            'mode': mode,
+            'unit': 'microseconds' if mode == 'trace' else 'samples',
+            'duration_ms': round(duration * 1000, 3),
+            'started_at': started_at,
+            'stacks': stacks
+        }
+        self.store(profile)
+        response.headers['X-Profile-Id'] = str(profile['id'])
+        response.headers['X-Profile-Duration-Ms'] = str(profile['duration_ms'])
+        return response
+
+    def _expire(self, now):
+        kept = [entry for entry in self._slowest if entry[2]['stored_at'] >= now - self.window]
+        if len(kept) != len(self._slowest):
+            heapq.heapify(kept)
+            self._slowest = kept
+
+    def store(self, profile):
+        """Keep the profile if it is among the N slowest of the window."""
+        now = time.time()
+        profile['stored_at'] = now
+        with self._lock:
+            self._expire(now)
+            entry = (profile['duration_ms'], profile['id'], profile)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def profiles(self):
+        """Stored profiles, slowest first."""
+        with self._lock:
+            self._expire(time.time())
+            return [entry[2] for entry in sorted(self._slowest, reverse=True)]
+
+    @staticmethod
+    def folded(profile):
+        """Folded-stack text for flamegraph.pl / speedscope."""
+        return ''.join(f'{stack} {weight}\n' for stack, weight in sorted(profile['stacks'].items()))
+
+    def _check_secret(self):
+        if not self.authorized(request.headers.get(PROFILE_HEADER)):
+            abort(404)
+
+    def list_profiles(self):
+        self._check_secret()
+        return jsonify([{k: v for k, v in profile.items() if k != 'stacks'} for profile in self.profiles()])
+
+    def get_profile(self, profile_id):
+        """One stored profile: folded stacks (default) or JSON with ?format=json."""
+        self._check_secret()
+        for profile in self.profiles():
+            if profile['id'] == profile_id:
+                if request.args.get('format') == 'json':
+                    return jsonify(profile)
+                return Response(self.folded(profile), mimetype='text/plain')
+        abort(404)
+
@@ -4,20 +4,47 @@ FRA WebGIS Integration Generator
 Creates comprehensive Forest Rights Act (IFR/CFR/CR) data and management system
 """
 
+import argparse
 import os
 import sys
-import json
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
+from functools import partial
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import json_provider
+from fra_analytics import ClaimAnalytics
+from geojson_writer import PartitionedCollectionWriter
+from parallel_generation import generation_time, iter_partitions, merge_partitions
+
+# Properties after the applicant block, in the order _generate_claim_data adds them
+CLAIM_TAIL_PROPERTIES = (
+    'forest_type', 'land_use', 'biodiversity_rich', 'water_source', 'wildlife_corridor',
+    'documents_submitted', 'field_verification_done', 'satellite_verification',
+    'gps_coordinates_verified', 'boundary_demarcated',
+    'livelihood_activities', 'annual_income_rs', 'dependence_level',
+    'frc_constituted', 'frc_meetings_held', 'objections_received', 'appeal_filed', 'court_case',
+    'centroid_lat', 'centroid_lon', 'perimeter_km', 'elevation_m', 'slope_degrees', 'aspect',
+    'data_quality_score', 'completeness_score', 'accuracy_score', 'verification_level'
+)
+
+# Every property a claim can have; the snapshot fragments are padded to these
+CLAIM_PROPERTIES = (
+    'claim_id', 'fra_type', 'fra_type_name', 'state', 'district', 'block', 'village', 'panchayat',
+    'claim_area_ha', 'claim_area_acres', 'status', 'status_name', 'submission_date', 'last_updated',
+    'applicant_type', 'applicant_name', 'tribal_community', 'family_members', 'household_id',
+    'community_name', 'community_members', 'community_id'
+) + CLAIM_TAIL_PROPERTIES
+
+# Largest partition generated (and held) at once; bigger states are split into chunks
+CLAIM_CHUNK_SIZE = 10000
+
 class FRAWebGISGenerator:
     def __init__(self, output_dir):
         self.output_dir = output_dir
+        self.generated_at = generation_time()
         os.makedirs(output_dir, exist_ok=True)
         
         # FRA claim types
@@ -63,55 +90,236 @@ class FRAWebGISGenerator:
             'Kerala': {'lat': 10.8505, 'lon': 76.2711, 'scale': 0.5, 'tribal_density': 0.2}
         }
     
-    def generate_fra_claims(self):
-        """Generate comprehensive FRA claims data."""
-        print("Generating FRA claims data...")
+    def claim_partitions(self, claim_multiplier=1, chunk_size=CLAIM_CHUNK_SIZE):
+        """(state, first claim id, number of claims) for every state, in output order.
         
-        features = []
+        States with more than chunk_size claims are split into consecutive chunks.
+        """
+        partitions = []
         claim_id = 1
-        
         for state_name, state_info in self.fra_states.items():
-            print(f"Processing {state_name}...")
-            
             # Calculate number of claims based on tribal density and state size
-            num_claims = int(state_info['tribal_density'] * state_info['scale'] * 50)
+            num_claims = int(state_info['tribal_density'] * state_info['scale'] * 50 * claim_multiplier)
+            for first in range(0, num_claims, chunk_size):
+                count = min(chunk_size, num_claims - first)
+                partitions.append((state_name, claim_id, count))
+                claim_id += count
+        return partitions
+    
+    def generate_fra_claims(self, bulk=False, claim_multiplier=1, rng=None, seed=None, workers=None):
+        """Generate comprehensive FRA claims data.
+        
+        With bulk=True every attribute of a state's claims is drawn as one array
+        (from rng, a numpy RandomState, or the global np.random state) and the
+        polygons are built in batch; claim_multiplier scales the claims per state.
+        With a seed or workers each state is a partition on its own seed stream
+        (parallel_generation.py), run in `workers` processes; the claims are the
+        same for any number of workers.
+        """
+        return merge_partitions(self.iter_fra_claims(bulk=bulk, claim_multiplier=claim_multiplier,
+                                                     rng=rng, seed=seed, workers=workers))
+    
+    def iter_fra_claims(self, bulk=False, claim_multiplier=1, rng=None, seed=None, workers=None):
+        """Yield the claims one partition (state chunk) at a time; options as in generate_fra_claims."""
+        print("Generating FRA claims data...")
+        partitions = self.claim_partitions(claim_multiplier)
+        
+        if seed is not None or workers:
+            task = partial(self.generate_state_claims, bulk=bulk)
+            yield from iter_partitions(task, partitions, seed=seed, workers=workers)
+            return
+        
+        for partition in partitions:
+            yield self.generate_state_claims(partition, bulk=bulk, rng=rng)
+    
+    def generate_state_claims(self, partition, bulk=False, rng=None):
+        """Generate the claims of one (state, first claim id, count) partition."""
+        state_name, claim_id, num_claims = partition
+        state_info = self.fra_states[state_name]
+        print(f"Processing {state_name}...")
+        
+        if bulk:
+            return self._generate_state_claims_bulk(
+                state_name, state_info, num_claims, claim_id, np.random if rng is None else rng
+            )
+        
+        features = []
+        for i in range(num_claims):
+            # Generate claim location
+            base_lat = state_info['lat'] + np.random.uniform(-state_info['scale'], state_info['scale'])
+            base_lon = state_info['lon'] + np.random.uniform(-state_info['scale'], state_info['scale'])
+            
+            # Ensure coordinates are within reasonable bounds
+            base_lat = max(6.4, min(37.1, base_lat))
+            base_lon = max(68.1, min(97.4, base_lon))
+            
+            # Generate claim polygon
+            size = np.random.uniform(0.01, 0.1) * state_info['scale']
+            coords = self._create_claim_polygon(base_lat, base_lon, size)
             
-            for i in range(num_claims):
-                # Generate claim location
-                base_lat = state_info['lat'] + np.random.uniform(-state_info['scale'], state_info['scale'])
-                base_lon = state_info['lon'] + np.random.uniform(-state_info['scale'], state_info['scale'])
-                
-                # Ensure coordinates are within reasonable bounds
-                base_lat = max(6.4, min(37.1, base_lat))
-                base_lon = max(68.1, min(97.4, base_lon))
-                
-                # Generate claim polygon
-                size = np.random.uniform(0.01, 0.1) * state_info['scale']
-                coords = self._create_claim_polygon(base_lat, base_lon, size)
-                
-                # Select FRA type based on probability
-                fra_type = np.random.choice(
-                    list(self.fra_types.keys()),
-                    p=[0.6, 0.3, 0.1]  # IFR most common, then CFR, then CR
-                )
-                
-                # Generate claim data
-                claim_data = self._generate_claim_data(claim_id, state_name, fra_type)
-                
-                feature = {
-                    "type": "Feature",
-                    "properties": claim_data,
-                    "geometry": {
-                        "type": "Polygon",
-                        "coordinates": [coords]
-                    }
+            # Select FRA type based on probability
+            fra_type = np.random.choice(
+                list(self.fra_types.keys()),
+                p=[0.6, 0.3, 0.1]  # IFR most common, then CFR, then CR
+            )
+            
+            # Generate claim data
+            claim_data = self._generate_claim_data(claim_id, state_name, fra_type)
+            
+            feature = {
+                "type": "Feature",
+                "properties": claim_data,
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [coords]
+                }
+            }
+            
+            features.append(feature)
+            claim_id += 1
+    
+        return features
+    
+    def _generate_state_claims_bulk(self, state_name, state_info, num_claims, first_claim_id, rng):
+        """Generate one state's claims with one array draw per attribute.
+        
+        Same claim ids, schema, key order and value distributions as the
+        per-claim loop; the values differ from it because the draws are ordered
+        by attribute instead of by claim.
+        """
+        n = num_claims
+        if n <= 0:
+            return []
+        scale = state_info['scale']
+        lat = np.clip(state_info['lat'] + rng.uniform(-scale, scale, n), 6.4, 37.1)
+        lon = np.clip(state_info['lon'] + rng.uniform(-scale, scale, n), 68.1, 97.4)
+        rings = self._create_claim_polygons(lat, lon, rng.uniform(0.01, 0.1, n) * scale, rng)
+        fra_types = rng.choice(list(self.fra_types.keys()), size=n, p=[0.6, 0.3, 0.1])
+        claim_ids = range(first_claim_id, first_claim_id + n)
+        columns = self._generate_claim_columns(n, fra_types, rng)
+        
+        features = []
+        for i, claim_id in enumerate(claim_ids):
+            fra_type = columns['fra_type'][i]
+            status = columns['status'][i]
+            claim_data = {
+                "claim_id": f"FRA_{claim_id:06d}",
+                "fra_type": fra_type,
+                "fra_type_name": self.fra_types[fra_type],
+                "state": state_name,
+                "district": f"District_{columns['district'][i]}",
+                "block": f"Block_{columns['block'][i]}",
+                "village": f"Village_{columns['village'][i]}",
+                "panchayat": f"Panchayat_{columns['panchayat'][i]}",
+                "claim_area_ha": columns['claim_area_ha'][i],
+                "claim_area_acres": columns['claim_area_acres'][i],
+                "status": status,
+                "status_name": self.claim_statuses[status],
+                "submission_date": columns['submission_date'][i],
+                "last_updated": columns['last_updated'][i]
+            }
+            if fra_type == 'IFR':
+                claim_data.update({
+                    "applicant_type": "Individual",
+                    "applicant_name": f"Applicant_{claim_id}",
+                    "tribal_community": columns['tribal_community'][i],
+                    "family_members": columns['members'][i],
+                    "household_id": f"HH_{claim_id:06d}"
+                })
+            else:  # CFR or CR
+                claim_data.update({
+                    "applicant_type": "Community",
+                    "community_name": f"Community_{claim_id}",
+                    "tribal_community": columns['tribal_community'][i],
+                    "community_members": columns['members'][i],
+                    "community_id": f"COMM_{claim_id:06d}"
+                })
+            for name in CLAIM_TAIL_PROPERTIES:
+                claim_data[name] = columns[name][i]
+            
+            features.append({
+                "type": "Feature",
+                "properties": claim_data,
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [rings[i]]
                 }
-                
-                features.append(feature)
-                claim_id += 1
+            })
         
         return features
     
+    def _generate_claim_columns(self, n, fra_types, rng):
+        """Draw every claim attribute of _generate_claim_data for n claims as plain-Python lists."""
+        status = rng.choice(list(self.claim_statuses.keys()), size=n, p=[0.1, 0.2, 0.15, 0.4, 0.1, 0.03, 0.02])
+        activities = np.array([
+            'NTFP Collection', 'Agriculture', 'Grazing', 'Hunting', 'Fishing',
+            'Medicinal Plant Collection', 'Honey Collection', 'Bamboo Work'
+        ])
+        # 1-3 distinct activities per claim: the first k of a random permutation
+        activity_counts = rng.randint(1, 4, n)
+        activity_order = np.argsort(rng.random_sample((n, len(activities))), axis=1)
+        
+        columns = {
+            'fra_type': fra_types,
+            'district': rng.randint(1, 20, n),
+            'block': rng.randint(1, 50, n),
+            'village': rng.randint(1, 1000, n),
+            'panchayat': rng.randint(1, 100, n),
+            'claim_area_ha': np.round(rng.uniform(0.5, 50, n), 2),
+            'claim_area_acres': np.round(rng.uniform(1.2, 123.5, n), 2),
+            'status': status,
+            'submission_date': self._random_dates(2020, 2024, n, rng),
+            'last_updated': self._random_dates(2023, 2024, n, rng),
+            'tribal_community': rng.choice(self.tribal_communities, size=n),
+            'members': np.where(fra_types == 'IFR', rng.randint(1, 8, n), rng.randint(10, 200, n)),
+            'forest_type': rng.choice([
+                'Tropical Evergreen', 'Tropical Semi-Evergreen', 'Tropical Moist Deciduous',
+                'Tropical Dry Deciduous', 'Tropical Thorn', 'Subtropical Pine', 'Mangrove'
+            ], size=n),
+            'land_use': rng.choice([
+                'Forest Land', 'Revenue Land', 'Common Property Resource',
+                'Traditional Forest Area', 'Sacred Grove'
+            ], size=n),
+            'biodiversity_rich': rng.random_sample(n) < 0.7,
+            'water_source': rng.random_sample(n) < 0.6,
+            'wildlife_corridor': rng.random_sample(n) < 0.3,
+            'documents_submitted': rng.randint(3, 8, n),
+            'field_verification_done': np.isin(status, ['field_verification', 'approved', 'rejected']),
+            'satellite_verification': rng.random_sample(n) < 0.8,
+            'gps_coordinates_verified': rng.random_sample(n) < 0.9,
+            'boundary_demarcated': np.isin(status, ['field_verification', 'approved']),
+            'livelihood_activities': [activities[order[:k]].tolist()
+                                      for order, k in zip(activity_order, activity_counts)],
+            'annual_income_rs': rng.randint(10000, 100000, n),
+            'dependence_level': rng.choice(['High', 'Medium', 'Low'], size=n, p=[0.5, 0.3, 0.2]),
+            'frc_constituted': rng.random_sample(n) < 0.8,
+            'frc_meetings_held': rng.randint(0, 10, n),
+            'objections_received': rng.randint(0, 5, n),
+            'appeal_filed': status == 'appealed',
+            'court_case': status == 'disputed',
+            'centroid_lat': np.round(rng.uniform(6.4, 37.1, n), 6),
+            'centroid_lon': np.round(rng.uniform(68.1, 97.4, n), 6),
+            'perimeter_km': np.round(rng.uniform(1, 20, n), 2),
+            'elevation_m': rng.randint(50, 2000, n),
+            'slope_degrees': np.round(rng.uniform(0, 45, n), 1),
+            'aspect': rng.choice(['North', 'South', 'East', 'West', 'Northeast', 'Northwest', 'Southeast', 'Southwest'],
+                                 size=n),
+            'data_quality_score': np.round(rng.uniform(0.6, 1.0, n), 2),
+            'completeness_score': np.round(rng.uniform(0.7, 1.0, n), 2),
+            'accuracy_score': np.round(rng.uniform(0.8, 1.0, n), 2),
+            'verification_level': rng.choice(['High', 'Medium', 'Low'], size=n, p=[0.6, 0.3, 0.1])
+        }
+        return {name: values.tolist() if isinstance(values, np.ndarray) else values
+                for name, values in columns.items()}
+    
+    def _create_claim_polygons(self, lat, lon, size, rng):
+        """Claim polygons for arrays of centres and sizes, as closed coordinate lists."""
+        angles = np.linspace(0, 2*np.pi, 12)
+        radius = size[:, None] * rng.uniform(0.3, 1.0, (len(size), len(angles)))
+        ring = np.stack([lon[:, None] + radius * np.cos(angles), lat[:, None] + radius * np.sin(angles)], axis=-1)
+        ring = np.concatenate([ring, ring[:, :1]], axis=1)  # Close polygons
+        return ring.tolist()
+    
     def _create_claim_polygon(self, lat, lon, size):
         """Create a polygon for FRA claim area."""
         # Create irregular polygon for more realistic claim boundaries
@@ -245,179 +453,79 @@ class FRAWebGISGenerator:
         random_days = np.random.randint(0, days_between)
         return (start_date + timedelta(days=random_days)).strftime('%Y-%m-%d')
     
+    def _random_dates(self, start_year, end_year, n, rng):
+        """n random dates between start and end year, as _random_date formats them."""
+        days_between = (datetime(end_year, 12, 31) - datetime(start_year, 1, 1)).days
+        dates = np.datetime64(f'{start_year}-01-01') + rng.randint(0, days_between, n)
+        return dates.astype(str).tolist()
+    
     def generate_fra_analytics(self, claims_data):
-        """Generate analytics and summary data for FRA claims."""
+        """Generate analytics and summary data for FRA claims (features, property dicts or a DataFrame of them)."""
         print("Generating FRA analytics...")
-        
-        # Convert to DataFrame for analysis
-        df = pd.DataFrame([claim['properties'] for claim in claims_data])
-        
-        analytics = {
-            "summary": {
-                "total_claims": len(df),
-                "claims_by_type": df['fra_type'].value_counts().to_dict(),
-                "claims_by_status": df['status'].value_counts().to_dict(),
-                "claims_by_state": df['state'].value_counts().to_dict(),
-                "total_area_ha": df['claim_area_ha'].sum(),
-                "average_claim_size_ha": round(df['claim_area_ha'].mean(), 2)
-            },
-            "state_wise_analysis": {},
-            "tribal_community_analysis": {},
-            "timeline_analysis": {},
-            "performance_metrics": {}
-        }
-        
-        # State-wise analysis
-        for state in df['state'].unique():
-            state_data = df[df['state'] == state]
-            analytics["state_wise_analysis"][state] = {
-                "total_claims": len(state_data),
-                "approved_claims": len(state_data[state_data['status'] == 'approved']),
-                "pending_claims": len(state_data[state_data['status'].isin(['submitted', 'under_review', 'field_verification'])]),
-                "rejected_claims": len(state_data[state_data['status'] == 'rejected']),
-                "total_area_ha": state_data['claim_area_ha'].sum(),
-                "approval_rate": round(len(state_data[state_data['status'] == 'approved']) / len(state_data) * 100, 2)
-            }
-        
-        # Tribal community analysis
-        tribal_analysis = df.groupby('tribal_community').agg({
-            'claim_id': 'count',
-            'claim_area_ha': 'sum',
-            'status': lambda x: (x == 'approved').sum()
-        }).rename(columns={'claim_id': 'total_claims', 'status': 'approved_claims'})
-        
-        analytics["tribal_community_analysis"] = tribal_analysis.to_dict('index')
-        
-        # Timeline analysis
-        df['submission_year'] = pd.to_datetime(df['submission_date']).dt.year
-        timeline = df.groupby('submission_year').agg({
-            'claim_id': 'count',
-            'claim_area_ha': 'sum'
-        }).rename(columns={'claim_id': 'claims_submitted'})
-        
-        analytics["timeline_analysis"] = timeline.to_dict('index')
-        
-        # Performance metrics
-        analytics["performance_metrics"] = {
-            "overall_approval_rate": round(len(df[df['status'] == 'approved']) / len(df) * 100, 2),
-            "average_processing_days": self._calculate_processing_days(df),
-            "documentation_completeness": round(df['documents_submitted'].mean(), 2),
-            "field_verification_rate": round(len(df[df['field_verification_done']]) / len(df) * 100, 2),
-            "gps_verification_rate": round(len(df[df['gps_coordinates_verified']]) / len(df) * 100, 2)
-        }
-        
-        return analytics
-    
-    def _calculate_processing_days(self, df):
-        """Calculate average processing days for claims."""
-        # This is a simplified calculation
-        return np.random.randint(30, 365)
-    
-    def _make_json_serializable(self, obj):
-        """Convert numpy types and other non-serializable objects to JSON-serializable types."""
-        import json
-        import numpy as np
-        import math
-        
-        def convert_item(item):
-            if isinstance(item, np.integer):
-                return int(item)
-            elif isinstance(item, np.floating):
-                if math.isnan(item):
-                    return None
-                return float(item)
-            elif isinstance(item, np.ndarray):
-                return item.tolist()
-            elif isinstance(item, dict):
-                return {k: convert_item(v) for k, v in item.items()}
-            elif isinstance(item, list):
-                return [convert_item(i) for i in item]
-            elif isinstance(item, float) and math.isnan(item):
-                return None
-            else:
-                return item
-        
-        return convert_item(obj)
+        if hasattr(claims_data, 'to_dict'):
+            claims_data = claims_data.to_dict('records')
+        # One grouped pass; see fra_analytics.py
+        return ClaimAnalytics(claims_data).result()
     
-    def generate_geojson(self):
-        """Generate comprehensive FRA GeoJSON data."""
+    def generate_geojson(self, bulk=False, claim_multiplier=1, seed=None, workers=None):
+        """Generate comprehensive FRA GeoJSON data (see generate_fra_claims for the options).
+        
+        The claims are streamed, one partition at a time, to fra_claims.geojson,
+        the state files, their snapshots and the partition manifest, and the
+        analytics are updated partition by partition. Returns the analytics.
+        """
         print("=== FRA WebGIS Integration Generator ===")
         print("Generating comprehensive FRA data for WebGIS integration...\n")
         
-        # Generate claims data
-        claims_features = self.generate_fra_claims()
-        
-        # Generate analytics
-        analytics = self.generate_fra_analytics(claims_features)
-        
-        # Ensure all data is JSON serializable
-        analytics = self._make_json_serializable(analytics)
+        main_file = os.path.join(self.output_dir, 'fra_claims.geojson')
+        writer = PartitionedCollectionWriter(main_file, pad_properties=CLAIM_PROPERTIES)
+        claim_analytics = ClaimAnalytics()
+        for claims in self.iter_fra_claims(bulk=bulk, claim_multiplier=claim_multiplier,
+                                           seed=seed, workers=workers):
+            writer.extend(claims)
+            # Analytics are updated batch by batch alongside the files
+            claim_analytics.update(claims)
         
-        # Create main GeoJSON
-        geojson = {
-            "type": "FeatureCollection",
-            "features": claims_features,
-            "properties": {
-                "generated_at": datetime.now().isoformat(),
+        print("Generating state-wise GeoJSON files...")
+        manifest_file = writer.close(
+            properties={
+                "generated_at": self.generated_at.isoformat(),
                 "description": "Comprehensive FRA (Forest Rights Act) claims data for WebGIS integration",
-                "total_claims": len(claims_features),
+                "total_claims": writer.count,
                 "fra_types": list(self.fra_types.keys()),
-                "states_covered": list(self.fra_states.keys()),
-                "analytics": analytics
-            }
-        }
+                "states_covered": list(self.fra_states.keys())
+            },
+            partition_properties=self._state_properties
+        )
         
-        # Save main GeoJSON
-        main_file = os.path.join(self.output_dir, 'fra_claims.geojson')
-        with open(main_file, 'w') as f:
-            json.dump(geojson, f, indent=2)
+        # Generate analytics
+        analytics = claim_analytics.result()
         
         # Save analytics separately
         analytics_file = os.path.join(self.output_dir, 'fra_analytics.json')
         with open(analytics_file, 'w') as f:
-            json.dump(analytics, f, indent=2)
-        
-        # Generate state-wise GeoJSON files
-        self._generate_state_wise_geojson(claims_features)
+            json_provider.dump(analytics, f)
         
         # Generate summary report
         self._generate_summary_report(analytics)
         
         print(f"FRA data saved to: {main_file}")
         print(f"Analytics saved to: {analytics_file}")
-        print(f"Total claims generated: {len(claims_features)}")
+        print(f"Snapshot saved to: {writer.main.snapshot.path}")
+        print(f"Partition manifest saved to: {manifest_file}")
+        print(f"Total claims generated: {writer.count}")
         print(f"States covered: {len(self.fra_states)}")
         print(f"FRA types: {', '.join(self.fra_types.keys())}")
         
-        return geojson
+        return analytics
     
-    def _generate_state_wise_geojson(self, claims_features):
-        """Generate separate GeoJSON files for each state."""
-        print("Generating state-wise GeoJSON files...")
-        
-        # Group claims by state
-        state_claims = {}
-        for claim in claims_features:
-            state = claim['properties']['state']
-            if state not in state_claims:
-                state_claims[state] = []
-            state_claims[state].append(claim)
-        
-        # Create state-wise files
-        for state, claims in state_claims.items():
-            state_geojson = {
-                "type": "FeatureCollection",
-                "features": claims,
-                "properties": {
-                    "state": state,
-                    "total_claims": len(claims),
-                    "generated_at": datetime.now().isoformat()
-                }
-            }
-            
-            state_file = os.path.join(self.output_dir, f'fra_claims_{state.replace(" ", "_").lower()}.geojson')
-            with open(state_file, 'w') as f:
-                json.dump(state_geojson, f, indent=2)
+    def _state_properties(self, state, count):
+        """Collection properties of a state file."""
+        return {
+            "state": state,
+            "total_claims": count,
+            "generated_at": self.generated_at.isoformat()
+        }
     
     def _generate_summary_report(self, analytics):
         """Generate a summary report."""
@@ -425,7 +533,7 @@ class FRAWebGISGenerator:
         
         with open(report_file, 'w') as f:
             f.write("# FRA WebGIS Integration Summary Report\n\n")
-            f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            f.write(f"Generated on: {self.generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             
             f.write("## Overview\n")
             f.write(f"- Total Claims: {analytics['summary']['total_claims']}\n")
@@ -448,8 +556,18 @@ class FRAWebGISGenerator:
 
 def main():
     """Main execution function."""
-    generator = FRAWebGISGenerator('output')
-    geojson_data = generator.generate_geojson()
+    parser = argparse.ArgumentParser(description="Generate the FRA WebGIS claims data")
+    parser.add_argument('--output-dir', default='output')
+    parser.add_argument('--bulk', action='store_true', help='Draw each state\'s claims as whole arrays')
+    parser.add_argument('--claim-multiplier', type=float, default=1,
+                        help='Scale the claims per state, e.g. 4000 for about a million claims (use with --bulk)')
+    parser.add_argument('--seed', type=int, help='Seed every state\'s stream for a reproducible dataset')
+    parser.add_argument('--workers', type=int, help='Generate the states in this many processes')
+    args = parser.parse_args()
+    
+    generator = FRAWebGISGenerator(args.output_dir)
+    generator.generate_geojson(bulk=args.bulk, claim_multiplier=args.claim_multiplier,
+                               seed=args.seed, workers=args.workers)
     
     print("\n=== FRA WebGIS Integration Complete ===")
     print("Files generated:")
@@ -5,13 +5,42 @@ Generates realistic GeoJSON data for Forest Rights Act (FRA) visualization
 Following proper spatial hierarchy: CFR contains IFR and CR features
 """
 
-import json
+import argparse
+import os
+import sys
 import random
 import math
 from datetime import datetime, timedelta
 
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_snapshot import snapshot_path
+from geojson_writer import FeatureCollectionWriter
+from parcel_placement import ParcelPlacer
+from polygon_sampling import PolygonSampler, PolygonSetSampler
+from parallel_generation import generation_time, iter_partitions, merge_partitions
+
+# Largest batch of villages generated (and held) at once in bulk mode
+VILLAGE_CHUNK_SIZE = 400
+
+# Features generate_village_features puts inside each CFR, in output order
+VILLAGE_LAYOUT = (('IFR', 12), ('CR', 3), ('AGR', 8), ('WTR', 4))
+
 class VanachitraFRAGenerator:
-    def __init__(self):
+    def __init__(self, max_overlap=0.0):
+        # Submission dates count back from this; SOURCE_DATE_EPOCH pins it
+        self.generated_at = generation_time()
+        # IFR, CR and agricultural parcels of a CFR overlap each other by at
+        # most this share of the smaller one (parcel_placement.py); None
+        # places them independently
+        self.max_overlap = max_overlap
+        # (ring, sampler) and (ring, placer) of the CFR features are being placed in
+        self._sampler = None
+        self._placer = None
+        
         # Indian states with forest areas and their characteristics
         self.forest_states = {
             'Telangana': {
@@ -55,17 +84,18 @@ class VanachitraFRAGenerator:
             'Odisha': ['sahi', 'palli', 'para', 'gaon'],
             'Tripura': ['para', 'khorang', 'bari', 'tilla']
         }
-
-    def generate_realistic_village_name(self, state):
-        """Generate realistic village names based on state patterns"""
-        base_names = {
+        
+        # Village base names by state (the patterns are appended)
+        self.village_base_names = {
             'Telangana': ['Ramagundam', 'Venkatesh', 'Lakshmi', 'Srinivas', 'Ananda'],
             'Madhya Pradesh': ['Rampur', 'Shivpur', 'Krishnanagar', 'Rajpur', 'Devgarh'],
             'Odisha': ['Jagannath', 'Rama', 'Krishna', 'Balaram', 'Hanuman'],
             'Tripura': ['Agartala', 'Udaipur', 'Dharmanagar', 'Ambassa', 'Belonia']
         }
-        
-        base = random.choice(base_names[state])
+
+    def generate_realistic_village_name(self, state):
+        """Generate realistic village names based on state patterns"""
+        base = random.choice(self.village_base_names[state])
         suffix = random.choice(self.village_patterns[state])
         return f"{base}{suffix}"
 
@@ -127,25 +157,54 @@ class VanachitraFRAGenerator:
         
         return inside
 
+    def polygon_sampler(self, polygon_coords):
+        """PolygonSampler of a polygon's outer ring, kept while the same ring is asked for"""
+        key = tuple(map(tuple, polygon_coords[0]))
+        if self._sampler is None or self._sampler[0] != key:
+            self._sampler = (key, PolygonSampler(polygon_coords[0]))
+        return self._sampler[1]
+
+    def parcel_placer(self, polygon_coords):
+        """ParcelPlacer of a polygon's outer ring, kept while the same ring is asked for"""
+        key = tuple(map(tuple, polygon_coords[0]))
+        if self._placer is None or self._placer[0] != key:
+            self._placer = (key, ParcelPlacer(polygon_coords[0], self.max_overlap,
+                                              sampler=self.polygon_sampler(polygon_coords)))
+        return self._placer[1]
+
+    def place_parcel(self, polygon_coords, points, centre, placer=None, rng=None):
+        """Move a parcel ring drawn around centre to where it does not overlap the CFR's other parcels.
+        
+        Returns the ring unchanged when placement is off (max_overlap=None), and
+        None when the parcel finds no room: the caller leaves that feature out.
+        """
+        if self.max_overlap is None:
+            return points
+        shape = [[lon - centre[0], lat - centre[1]] for lon, lat in points]
+        placer = placer or self.parcel_placer(polygon_coords)
+        return placer.place(shape, rng, centre=centre)
+
     def generate_point_inside_polygon(self, polygon_coords):
-        """Generate a random point inside the given polygon"""
-        # Get bounding box
-        lons = [p[0] for p in polygon_coords[0]]
-        lats = [p[1] for p in polygon_coords[0]]
-        
-        min_lon, max_lon = min(lons), max(lons)
-        min_lat, max_lat = min(lats), max(lats)
-        
-        # Try to generate point inside polygon (max 50 attempts)
-        for _ in range(50):
-            lon = random.uniform(min_lon, max_lon)
-            lat = random.uniform(min_lat, max_lat)
-            
-            if self.point_in_polygon([lon, lat], polygon_coords[0]):
-                return [lat, lon]
+        """Generate a uniform random point inside the given polygon (see polygon_sampling.py)"""
+        lon, lat = self.polygon_sampler(polygon_coords).sample(1)[0].tolist()
+        return [lat, lon]
+
+    @staticmethod
+    def irregular_rings(center_lat, center_lon, radius, num_points, max_points, spread, rng):
+        """Irregular closed rings as generate_cfr_polygon draws them, for arrays of centres and radii.
         
-        # Fallback: return center of bounding box
-        return [(min_lat + max_lat) / 2, (min_lon + max_lon) / 2]
+        Ring i has num_points[i] vertices ([lon, lat]) at radius[i] times a
+        factor drawn from `spread`; it is padded to max_points + 1 positions by
+        repeating its first vertex, so ring[:num_points[i] + 1] is the closed
+        ring and the padding adds only zero-length edges.
+        """
+        n = len(radius)
+        index = np.arange(max_points)
+        angles = 2 * np.pi * index / num_points[:, None]
+        r = radius[:, None] * rng.uniform(spread[0], spread[1], (n, max_points))
+        ring = np.stack([center_lon[:, None] + r * np.sin(angles), center_lat[:, None] + r * np.cos(angles)], axis=-1)
+        ring = np.where((index < num_points[:, None])[:, :, None], ring, ring[:, :1])
+        return np.concatenate([ring, ring[:, :1]], axis=1)
 
     def generate_ifr_polygons(self, cfr_polygon, village_name, district, state, tribal_community, num_ifrs=12):
         """Generate IFR (Individual Forest Rights) polygons inside CFR"""
@@ -190,6 +249,9 @@ class VanachitraFRAGenerator:
             
             # Close polygon
             points.append(points[0])
+            points = self.place_parcel(cfr_polygon, points, [center_lon, center_lat])
+            if points is None:
+                continue
             
             # Generate realistic household details
             household_head = random.choice(['Ram Singh', 'Shyam Lal', 'Ganga Devi', 'Sita Bai', 
@@ -211,7 +273,7 @@ class VanachitraFRAGenerator:
                     'household_head': household_head,
                     'family_members': random.randint(3, 8),
                     'livelihood': random.choice(['Agriculture', 'NTFP Collection', 'Animal Husbandry', 'Mixed']),
-                    'submission_date': (datetime.now() - timedelta(days=random.randint(30, 730))).strftime('%Y-%m-%d'),
+                    'submission_date': (self.generated_at - timedelta(days=random.randint(30, 730))).strftime('%Y-%m-%d'),
                     'survey_number': f'SY_{random.randint(100, 999)}',
                     'frc_recommendation': random.choice(['Recommended', 'Pending', 'Additional Info Required']),
                     'gps_verified': random.choice([True, False]),
@@ -255,7 +317,7 @@ class VanachitraFRAGenerator:
                         'tribal_community': tribal_community,
                         'beneficiary_households': random.randint(20, 80),
                         'usage_pattern': random.choice(['Seasonal', 'Year-round', 'Occasional']),
-                        'submission_date': (datetime.now() - timedelta(days=random.randint(30, 730))).strftime('%Y-%m-%d'),
+                        'submission_date': (self.generated_at - timedelta(days=random.randint(30, 730))).strftime('%Y-%m-%d'),
                         'traditional_use': random.choice([True, False]),
                         'community_management': True
                     },
@@ -282,6 +344,9 @@ class VanachitraFRAGenerator:
                     points.append([lon, lat])
                 
                 points.append(points[0])
+                points = self.place_parcel(cfr_polygon, points, [center_lon, center_lat])
+                if points is None:
+                    continue
                 
                 cr_feature = {
                     'type': 'Feature',
@@ -299,7 +364,7 @@ class VanachitraFRAGenerator:
                         'tribal_community': tribal_community,
                         'beneficiary_households': random.randint(20, 80),
                         'usage_pattern': random.choice(['Seasonal', 'Year-round', 'Occasional']),
-                        'submission_date': (datetime.now() - timedelta(days=random.randint(30, 730))).strftime('%Y-%m-%d'),
+                        'submission_date': (self.generated_at - timedelta(days=random.randint(30, 730))).strftime('%Y-%m-%d'),
                         'traditional_use': random.choice([True, False]),
                         'community_management': True,
                         'management_committee': random.choice([True, False])
@@ -337,6 +402,9 @@ class VanachitraFRAGenerator:
                 [center_lon - width/2, center_lat + height/2],
                 [center_lon - width/2, center_lat - height/2]
             ]
+            points = self.place_parcel(cfr_polygon, points, [center_lon, center_lat])
+            if points is None:
+                continue
             
             agriculture_feature = {
                 'type': 'Feature',
@@ -445,138 +513,524 @@ class VanachitraFRAGenerator:
 
     def generate_village_fra_data(self, state_name, num_villages=3):
         """Generate complete FRA data for villages in a state"""
-        state_info = self.forest_states[state_name]
         all_features = []
         
         for village_idx in range(num_villages):
-            district = random.choice(state_info['districts'])
-            village_name = self.generate_realistic_village_name(state_name)
-            tribal_community = random.choice(self.tribal_communities[state_name])
-            
-            # Generate CFR polygon
-            cfr_data = self.generate_cfr_polygon(state_info, district)
+            all_features.extend(self.generate_village_features((state_name, village_idx)))
+        
+        return all_features
+
+    def generate_village_features(self, partition):
+        """Generate the CFR of one (state, village index) partition and the features inside it"""
+        state_name, village_idx = partition
+        state_info = self.forest_states[state_name]
+        all_features = []
+        
+        district = random.choice(state_info['districts'])
+        village_name = self.generate_realistic_village_name(state_name)
+        tribal_community = random.choice(self.tribal_communities[state_name])
+        
+        # Generate CFR polygon
+        cfr_data = self.generate_cfr_polygon(state_info, district)
+        
+        # Create CFR feature
+        cfr_feature = {
+            'type': 'Feature',
+            'properties': {
+                'claim_id': f'CFR_{state_name[:2].upper()}_{district[:3].upper()}_{village_idx+1:03d}',
+                'claim_type': 'CFR',
+                'fra_type': 'Community Forest Resource Rights',
+                'village': village_name,
+                'district': district,
+                'state': state_name,
+                'area_claimed': round(cfr_data['area_hectares'], 2),
+                'area_unit': 'hectares',
+                'status': random.choice(['Approved', 'Pending', 'Under Review']),
+                'tribal_community': tribal_community,
+                'gram_sabha': f'{village_name} Gram Sabha',
+                'total_households': random.randint(50, 200),
+                'forest_committee_formed': random.choice([True, False]),
+                'management_plan': random.choice(['Prepared', 'Under Preparation', 'Not Started']),
+                'submission_date': (self.generated_at - timedelta(days=random.randint(60, 900))).strftime('%Y-%m-%d'),
+                'forest_type': random.choice(['Tropical Deciduous', 'Dry Deciduous', 'Moist Deciduous', 'Scrub']),
+                'biodiversity_rich': random.choice([True, False]),
+                'ntfp_available': random.choice([True, False]),
+                'wildlife_present': random.choice([True, False])
+            },
+            'geometry': {
+                'type': 'Polygon',
+                'coordinates': cfr_data['coordinates']
+            }
+        }
+        
+        all_features.append(cfr_feature)
+        
+        # Generate CR features inside CFR (placed before the smaller IFR plots, listed after them)
+        cr_features = self.generate_cr_features(
+            cfr_data['coordinates'], village_name, district, state_name, tribal_community
+        )
+        
+        # Generate IFR features inside CFR
+        ifr_features = self.generate_ifr_polygons(
+            cfr_data['coordinates'], village_name, district, state_name, tribal_community
+        )
+        all_features.extend(ifr_features)
+        all_features.extend(cr_features)
+        
+        # Generate agriculture features
+        agriculture_features = self.generate_agriculture_features(
+            cfr_data['coordinates'], village_name, district, state_name
+        )
+        all_features.extend(agriculture_features)
+        
+        # Generate water features
+        water_features = self.generate_water_features(
+            cfr_data['coordinates'], village_name, district, state_name
+        )
+        all_features.extend(water_features)
+        
+        return all_features
+
+    def village_partitions(self, villages_per_state=2, chunk_size=VILLAGE_CHUNK_SIZE):
+        """(state, first village index, number of villages) batches for bulk mode, in output order"""
+        return [(state_name, first, min(chunk_size, villages_per_state - first))
+                for state_name in self.forest_states
+                for first in range(0, villages_per_state, chunk_size)]
+
+    def _submission_dates(self, low, high, n, rng):
+        """n dates `low` to `high` days before generation, formatted as the per-feature code does"""
+        days = rng.randint(low, high + 1, n)
+        return (np.datetime64(self.generated_at.date()) - days).astype(str).tolist()
+
+    def generate_village_batch(self, partition, rng=None):
+        """Generate a (state, first village index, count) batch of villages with array operations.
+        
+        Same features, ids, key order and value distributions as
+        generate_village_features, village by village; the values differ from
+        it because the draws are ordered by attribute instead of by feature.
+        rng is a numpy RandomState, or the global np.random state.
+        """
+        state_name, first_village, num_villages = partition
+        rng = np.random if rng is None else rng
+        v = num_villages
+        if v <= 0:
+            return []
+        state_info = self.forest_states[state_name]
+        
+        def bool_column(n):
+            return (rng.random_sample(n) < 0.5).tolist()
+        
+        # Villages and their CFR polygons
+        districts = rng.choice(state_info['districts'], v).tolist()
+        village_names = np.char.add(rng.choice(self.village_base_names[state_name], v),
+                                    rng.choice(self.village_patterns[state_name], v)).tolist()
+        communities = rng.choice(self.tribal_communities[state_name], v).tolist()
+        cfr_lat = state_info['center'][0] + rng.uniform(-1.5, 1.5, v)
+        cfr_lon = state_info['center'][1] + rng.uniform(-1.5, 1.5, v)
+        cfr_area = rng.uniform(500, 2000, v)
+        cfr_points = rng.randint(8, 13, v)
+        cfr_rings = self.irregular_rings(cfr_lat, cfr_lon, np.sqrt(cfr_area / 100 / np.pi) / 111.0,
+                                         cfr_points, 12, (0.7, 1.4), rng)
+        cfr = {
+            'rings': cfr_rings.tolist(),
+            'points': cfr_points.tolist(),
+            'area': np.round(cfr_area, 2).tolist(),
+            'status': rng.choice(['Approved', 'Pending', 'Under Review'], v).tolist(),
+            'households': rng.randint(50, 201, v).tolist(),
+            'committee': bool_column(v),
+            'plan': rng.choice(['Prepared', 'Under Preparation', 'Not Started'], v).tolist(),
+            'submitted': self._submission_dates(60, 900, v, rng),
+            'forest_type': rng.choice(['Tropical Deciduous', 'Dry Deciduous', 'Moist Deciduous', 'Scrub'], v).tolist(),
+            'biodiversity': bool_column(v),
+            'ntfp': bool_column(v),
+            'wildlife': bool_column(v)
+        }
+        
+        # Every point inside the CFRs in one go, village by village in layout order
+        per_village = sum(count for _, count in VILLAGE_LAYOUT)
+        cfr_samplers = PolygonSetSampler(ring[:points + 1] for ring, points in zip(cfr['rings'], cfr['points']))
+        lon, lat = cfr_samplers.sample(np.repeat(np.arange(v), per_village), rng).T
+        centres, offset = {}, 0
+        for kind, count in VILLAGE_LAYOUT:
+            centres[kind] = (lat.reshape(v, per_village)[:, offset:offset + count].ravel(),
+                             lon.reshape(v, per_village)[:, offset:offset + count].ravel())
+            offset += count
+        
+        # IFR plots: rotated rectangles or squares
+        ifr_lat, ifr_lon = centres['IFR']
+        n = len(ifr_lat)
+        ifr_area = rng.uniform(1.0, 5.0, n)
+        radius = np.sqrt(ifr_area / 100) / 111.0
+        rectangular = rng.random_sample(n) < 0.5
+        width = np.where(rectangular, radius * rng.uniform(0.8, 1.5, n), radius)
+        height = np.where(rectangular, ifr_area / 100 / (width * 111.0) / 111.0, radius)
+        rotation = rng.uniform(-np.pi/8, np.pi/8, n)
+        corner_x = np.array([-0.5, 0.5, 0.5, -0.5, -0.5]) * width[:, None]
+        corner_y = np.array([-0.5, -0.5, 0.5, 0.5, -0.5]) * height[:, None]
+        cos, sin = np.cos(rotation)[:, None], np.sin(rotation)[:, None]
+        ifr_rings = np.stack([ifr_lon[:, None] + corner_x * cos - corner_y * sin,
+                              ifr_lat[:, None] + corner_x * sin + corner_y * cos], axis=-1).tolist()
+        ifr = {
+            'area': np.round(ifr_area, 2).tolist(),
+            'status': rng.choice(['Approved', 'Pending', 'Under Review'], n).tolist(),
+            'head': rng.choice(['Ram Singh', 'Shyam Lal', 'Ganga Devi', 'Sita Bai',
+                                'Ravi Kumar', 'Lakshmi Devi', 'Suresh Rao', 'Kamala Bai'], n).tolist(),
+            'members': rng.randint(3, 9, n).tolist(),
+            'livelihood': rng.choice(['Agriculture', 'NTFP Collection', 'Animal Husbandry', 'Mixed'], n).tolist(),
+            'submitted': self._submission_dates(30, 730, n, rng),
+            'survey': rng.randint(100, 1000, n).tolist(),
+            'frc': rng.choice(['Recommended', 'Pending', 'Additional Info Required'], n).tolist(),
+            'gps': bool_column(n),
+            'documents': bool_column(n)
+        }
+        
+        # CR features: points for ponds and wells, irregular polygons otherwise
+        cr_lat, cr_lon = centres['CR']
+        n = len(cr_lat)
+        cr_area = rng.uniform(5.0, 50.0, n)
+        cr_points = rng.randint(6, 11, n)
+        cr = {
+            'type': rng.choice(['Grazing Ground', 'Community Pond', 'NTFP Collection Area', 'Sacred Grove',
+                                'Community Well'], n).tolist(),
+            'rings': self.irregular_rings(cr_lat, cr_lon, np.sqrt(cr_area / 100) / 111.0,
+                                          cr_points, 10, (0.7, 1.3), rng).tolist(),
+            'points': cr_points.tolist(),
+            'area': np.round(cr_area, 2).tolist(),
+            'status': rng.choice(['Approved', 'Pending'], n).tolist(),
+            'households': rng.randint(20, 81, n).tolist(),
+            'usage': rng.choice(['Seasonal', 'Year-round', 'Occasional'], n).tolist(),
+            'submitted': self._submission_dates(30, 730, n, rng),
+            'traditional': bool_column(n),
+            'committee': bool_column(n)
+        }
+        
+        # Agricultural plots: axis-aligned rectangles
+        agr_lat, agr_lon = centres['AGR']
+        n = len(agr_lat)
+        agr_area = rng.uniform(0.5, 3.0, n)
+        width = rng.uniform(0.002, 0.008, n)
+        height = agr_area / 100 / (width * 111.0) / 111.0
+        corner_x = np.array([-0.5, 0.5, 0.5, -0.5, -0.5]) * width[:, None]
+        corner_y = np.array([-0.5, -0.5, 0.5, 0.5, -0.5]) * height[:, None]
+        agr = {
+            'rings': np.stack([agr_lon[:, None] + corner_x, agr_lat[:, None] + corner_y], axis=-1).tolist(),
+            'area': np.round(agr_area, 2).tolist(),
+            'crop': rng.choice(['Rice', 'Wheat', 'Maize', 'Millet', 'Pulses', 'Vegetables', 'Mixed Crops'], n).tolist(),
+            'irrigation': rng.choice(['Rainfed', 'Canal', 'Borewell', 'Tank'], n).tolist(),
+            'season': rng.choice(['Kharif', 'Rabi', 'Summer'], n).tolist(),
+            'land_type': rng.choice(['Forest Land', 'Revenue Land', 'Patta Land'], n).tolist(),
+            'soil': rng.choice(['Red Soil', 'Black Soil', 'Alluvial', 'Laterite'], n).tolist(),
+            'slope': rng.choice(['Flat', 'Gentle', 'Moderate'], n).tolist(),
+            'productivity': rng.choice(['High', 'Medium', 'Low'], n).tolist()
+        }
+        
+        # Water bodies: points for springs, irregular polygons otherwise
+        wtr_lat, wtr_lon = centres['WTR']
+        n = len(wtr_lat)
+        wtr_area = rng.uniform(0.2, 5.0, n)
+        wtr_points = rng.randint(6, 13, n)
+        wtr = {
+            'type': rng.choice(['Stream', 'Seasonal Pond', 'Tank', 'Natural Spring', 'Check Dam'], n).tolist(),
+            'rings': self.irregular_rings(wtr_lat, wtr_lon, np.sqrt(wtr_area / 100) / 111.0,
+                                          wtr_points, 12, (0.6, 1.4), rng).tolist(),
+            'points': wtr_points.tolist(),
+            'area': np.round(wtr_area, 2).tolist(),
+            'seasonal': bool_column(n),
+            'usage': rng.choice(['Drinking', 'Irrigation', 'Livestock', 'Multiple'], n).tolist(),
+            'quality': rng.choice(['Good', 'Moderate', 'Poor'], n).tolist(),
+            'access': rng.choice(['Easy', 'Moderate', 'Difficult'], n).tolist(),
+            'depth': rng.choice(['Shallow', 'Medium', 'Deep'], n).tolist(),
+            'fish': bool_column(n)
+        }
+        
+        centre_lists = {kind: (lat.tolist(), lon.tolist()) for kind, (lat, lon) in centres.items()}
+        counts = dict(VILLAGE_LAYOUT)
+        all_features = []
+        for village in range(v):
+            district = districts[village]
+            village_name = village_names[village]
+            tribal_community = communities[village]
+            prefix = f'{state_name[:2].upper()}_{district[:3].upper()}'
+            # Parcels are placed largest kind first, as generate_village_features does: CR areas, IFR
+            # plots, agricultural plots. One that finds no room is left out.
+            placer = None
+            if self.max_overlap is not None:
+                placer = ParcelPlacer(cfr['rings'][village][:cfr['points'][village] + 1], self.max_overlap,
+                                      sampler=cfr_samplers.samplers[village])
+            cr_rings = {}
+            for k in range(village * counts['CR'], (village + 1) * counts['CR']):
+                if cr['type'][k] not in ['Community Pond', 'Community Well']:
+                    cr_rings[k] = self.place_parcel(None, cr['rings'][k][:cr['points'][k] + 1],
+                                                    [centre_lists['CR'][1][k], centre_lists['CR'][0][k]], placer, rng)
             
-            # Create CFR feature
-            cfr_feature = {
+            all_features.append({
                 'type': 'Feature',
                 'properties': {
-                    'claim_id': f'CFR_{state_name[:2].upper()}_{district[:3].upper()}_{village_idx+1:03d}',
+                    'claim_id': f'CFR_{prefix}_{first_village + village + 1:03d}',
                     'claim_type': 'CFR',
                     'fra_type': 'Community Forest Resource Rights',
                     'village': village_name,
                     'district': district,
                     'state': state_name,
-                    'area_claimed': round(cfr_data['area_hectares'], 2),
+                    'area_claimed': cfr['area'][village],
                     'area_unit': 'hectares',
-                    'status': random.choice(['Approved', 'Pending', 'Under Review']),
+                    'status': cfr['status'][village],
                     'tribal_community': tribal_community,
                     'gram_sabha': f'{village_name} Gram Sabha',
-                    'total_households': random.randint(50, 200),
-                    'forest_committee_formed': random.choice([True, False]),
-                    'management_plan': random.choice(['Prepared', 'Under Preparation', 'Not Started']),
-                    'submission_date': (datetime.now() - timedelta(days=random.randint(60, 900))).strftime('%Y-%m-%d'),
-                    'forest_type': random.choice(['Tropical Deciduous', 'Dry Deciduous', 'Moist Deciduous', 'Scrub']),
-                    'biodiversity_rich': random.choice([True, False]),
-                    'ntfp_available': random.choice([True, False]),
-                    'wildlife_present': random.choice([True, False])
+                    'total_households': cfr['households'][village],
+                    'forest_committee_formed': cfr['committee'][village],
+                    'management_plan': cfr['plan'][village],
+                    'submission_date': cfr['submitted'][village],
+                    'forest_type': cfr['forest_type'][village],
+                    'biodiversity_rich': cfr['biodiversity'][village],
+                    'ntfp_available': cfr['ntfp'][village],
+                    'wildlife_present': cfr['wildlife'][village]
                 },
                 'geometry': {
                     'type': 'Polygon',
-                    'coordinates': cfr_data['coordinates']
+                    'coordinates': [cfr['rings'][village][:cfr['points'][village] + 1]]
                 }
-            }
-            
-            all_features.append(cfr_feature)
+            })
             
-            # Generate IFR features inside CFR
-            ifr_features = self.generate_ifr_polygons(
-                cfr_data['coordinates'], village_name, district, state_name, tribal_community
-            )
-            all_features.extend(ifr_features)
+            for i in range(counts['IFR']):
+                k = village * counts['IFR'] + i
+                ring = self.place_parcel(None, ifr_rings[k], [centre_lists['IFR'][1][k], centre_lists['IFR'][0][k]],
+                                         placer, rng)
+                if ring is None:
+                    continue
+                all_features.append({
+                    'type': 'Feature',
+                    'properties': {
+                        'claim_id': f'IFR_{prefix}_{i+1:03d}',
+                        'claim_type': 'IFR',
+                        'fra_type': 'Individual Forest Rights',
+                        'village': village_name,
+                        'district': district,
+                        'state': state_name,
+                        'area_claimed': ifr['area'][k],
+                        'area_unit': 'hectares',
+                        'status': ifr['status'][k],
+                        'tribal_community': tribal_community,
+                        'household_head': ifr['head'][k],
+                        'family_members': ifr['members'][k],
+                        'livelihood': ifr['livelihood'][k],
+                        'submission_date': ifr['submitted'][k],
+                        'survey_number': f"SY_{ifr['survey'][k]}",
+                        'frc_recommendation': ifr['frc'][k],
+                        'gps_verified': ifr['gps'][k],
+                        'documents_complete': ifr['documents'][k]
+                    },
+                    'geometry': {
+                        'type': 'Polygon',
+                        'coordinates': [ring]
+                    }
+                })
             
-            # Generate CR features inside CFR
-            cr_features = self.generate_cr_features(
-                cfr_data['coordinates'], village_name, district, state_name, tribal_community
-            )
-            all_features.extend(cr_features)
+            for i in range(counts['CR']):
+                k = village * counts['CR'] + i
+                cr_type = cr['type'][k]
+                if cr_rings.get(k, True) is None:
+                    continue  # No room left in the CFR
+                properties = {
+                    'claim_id': f'CR_{prefix}_{i+1:03d}',
+                    'claim_type': 'CR',
+                    'fra_type': 'Community Rights',
+                    'resource_type': cr_type,
+                    'village': village_name,
+                    'district': district,
+                    'state': state_name
+                }
+                if cr_type in ['Community Pond', 'Community Well']:
+                    # Point feature for wells/small ponds
+                    geometry = {'type': 'Point', 'coordinates': [centre_lists['CR'][1][k], centre_lists['CR'][0][k]]}
+                else:
+                    geometry = {'type': 'Polygon', 'coordinates': [cr_rings[k]]}
+                    properties.update({'area_claimed': cr['area'][k], 'area_unit': 'hectares'})
+                properties.update({
+                    'status': cr['status'][k],
+                    'tribal_community': tribal_community,
+                    'beneficiary_households': cr['households'][k],
+                    'usage_pattern': cr['usage'][k],
+                    'submission_date': cr['submitted'][k],
+                    'traditional_use': cr['traditional'][k],
+                    'community_management': True
+                })
+                if geometry['type'] == 'Polygon':
+                    properties['management_committee'] = cr['committee'][k]
+                all_features.append({'type': 'Feature', 'properties': properties, 'geometry': geometry})
             
-            # Generate agriculture features
-            agriculture_features = self.generate_agriculture_features(
-                cfr_data['coordinates'], village_name, district, state_name
-            )
-            all_features.extend(agriculture_features)
+            for i in range(counts['AGR']):
+                k = village * counts['AGR'] + i
+                ring = self.place_parcel(None, agr['rings'][k], [centre_lists['AGR'][1][k], centre_lists['AGR'][0][k]],
+                                         placer, rng)
+                if ring is None:
+                    continue
+                all_features.append({
+                    'type': 'Feature',
+                    'properties': {
+                        'feature_id': f'AGR_{prefix}_{i+1:03d}',
+                        'feature_type': 'Agriculture',
+                        'crop_type': agr['crop'][k],
+                        'village': village_name,
+                        'district': district,
+                        'state': state_name,
+                        'area_hectares': agr['area'][k],
+                        'irrigation_type': agr['irrigation'][k],
+                        'season': agr['season'][k],
+                        'land_type': agr['land_type'][k],
+                        'soil_type': agr['soil'][k],
+                        'slope': agr['slope'][k],
+                        'productivity': agr['productivity'][k]
+                    },
+                    'geometry': {
+                        'type': 'Polygon',
+                        'coordinates': [ring]
+                    }
+                })
             
-            # Generate water features
-            water_features = self.generate_water_features(
-                cfr_data['coordinates'], village_name, district, state_name
-            )
-            all_features.extend(water_features)
+            for i in range(counts['WTR']):
+                k = village * counts['WTR'] + i
+                water_type = wtr['type'][k]
+                properties = {
+                    'feature_id': f'WTR_{prefix}_{i+1:03d}',
+                    'feature_type': 'Water Body',
+                    'water_type': water_type,
+                    'village': village_name,
+                    'district': district,
+                    'state': state_name
+                }
+                if water_type in ['Natural Spring']:
+                    # Point feature
+                    geometry = {'type': 'Point', 'coordinates': [centre_lists['WTR'][1][k], centre_lists['WTR'][0][k]]}
+                    properties.update({
+                        'seasonal': wtr['seasonal'][k],
+                        'usage': wtr['usage'][k],
+                        'water_quality': wtr['quality'][k],
+                        'accessibility': wtr['access'][k]
+                    })
+                else:
+                    geometry = {'type': 'Polygon', 'coordinates': [wtr['rings'][k][:wtr['points'][k] + 1]]}
+                    properties.update({
+                        'area_hectares': wtr['area'][k],
+                        'seasonal': wtr['seasonal'][k],
+                        'usage': wtr['usage'][k],
+                        'water_quality': wtr['quality'][k],
+                        'depth_category': wtr['depth'][k],
+                        'fish_available': wtr['fish'][k]
+                    })
+                all_features.append({'type': 'Feature', 'properties': properties, 'geometry': geometry})
         
         return all_features
 
-    def generate_complete_fra_dataset(self):
-        """Generate complete FRA dataset for multiple states"""
-        all_features = []
+    def iter_village_features(self, bulk=False, villages_per_state=2, rng=None, seed=None, workers=None):
+        """Yield the features in batches: one per state, or one per village with a seed or workers.
+        
+        With bulk=True villages are generated in batches of up to
+        VILLAGE_CHUNK_SIZE by generate_village_batch (from rng, a numpy
+        RandomState, or the global np.random state), one batch per partition.
+        With a seed or workers every village (or batch) is a partition on its
+        own seed stream (parallel_generation.py); the result is the same for
+        any number of worker processes.
+        """
+        if bulk:
+            batches = self.village_partitions(villages_per_state)
+            print(f"Generating FRA data for {villages_per_state * len(self.forest_states)} villages "
+                  f"in {len(batches)} batches...")
+            if seed is not None or workers:
+                yield from iter_partitions(self.generate_village_batch, batches, seed=seed, workers=workers)
+                return
+            for batch in batches:
+                yield self.generate_village_batch(batch, rng=rng)
+            return
+        
+        if seed is not None or workers:
+            villages = [(state_name, village_idx) for state_name in self.forest_states
+                        for village_idx in range(villages_per_state)]
+            print(f"Generating FRA data for {len(villages)} villages...")
+            yield from iter_partitions(self.generate_village_features, villages, seed=seed, workers=workers)
+            return
         
         # Generate data for all forest states
         for state_name in self.forest_states.keys():
             print(f"Generating FRA data for {state_name}...")
-            state_features = self.generate_village_fra_data(state_name, num_villages=2)
-            all_features.extend(state_features)
+            yield self.generate_village_fra_data(state_name, num_villages=villages_per_state)
+    
+    def dataset_properties(self, total_features):
+        """Collection properties of the FRA dataset."""
+        return {
+            'title': 'Vanachitra.AI - Forest Rights Act Spatial Data',
+            'description': 'Realistic FRA claims data for WebGIS visualization',
+            'created_date': self.generated_at.isoformat(),
+            'total_features': total_features,
+            'states_covered': list(self.forest_states.keys()),
+            'spatial_reference': 'EPSG:4326 (WGS84)',
+            'data_quality': 'Synthetic but spatially realistic',
+            'hierarchy': 'CFR polygons contain IFR and CR features',
+            'coordinate_system': 'Decimal degrees (longitude, latitude)'
+        }
+
+    def generate_complete_fra_dataset(self, bulk=False, villages_per_state=2, rng=None, seed=None, workers=None):
+        """Generate complete FRA dataset for multiple states (options as in iter_village_features)"""
+        all_features = merge_partitions(self.iter_village_features(
+            bulk=bulk, villages_per_state=villages_per_state, rng=rng, seed=seed, workers=workers
+        ))
         
         # Create final GeoJSON
         fra_geojson = {
             'type': 'FeatureCollection',
-            'properties': {
-                'title': 'Vanachitra.AI - Forest Rights Act Spatial Data',
-                'description': 'Realistic FRA claims data for WebGIS visualization',
-                'created_date': datetime.now().isoformat(),
-                'total_features': len(all_features),
-                'states_covered': list(self.forest_states.keys()),
-                'spatial_reference': 'EPSG:4326 (WGS84)',
-                'data_quality': 'Synthetic but spatially realistic',
-                'hierarchy': 'CFR polygons contain IFR and CR features',
-                'coordinate_system': 'Decimal degrees (longitude, latitude)'
-            },
+            'properties': self.dataset_properties(len(all_features)),
             'features': all_features
         }
         
         return fra_geojson
 
+    def write_fra_dataset(self, output_file, bulk=False, villages_per_state=2, seed=None, workers=None):
+        """Stream the FRA dataset to output_file and its snapshot; returns the feature count per type"""
+        writer = FeatureCollectionWriter(output_file)
+        feature_counts = {}
+        for features in self.iter_village_features(bulk=bulk, villages_per_state=villages_per_state,
+                                                   seed=seed, workers=workers):
+            for feature in features:
+                writer.add(feature)
+                ftype = feature['properties'].get('claim_type') or feature['properties']['feature_type']
+                feature_counts[ftype] = feature_counts.get(ftype, 0) + 1
+        writer.close(self.dataset_properties(writer.count))
+        return feature_counts
+
 def main():
     """Generate and save FRA spatial data"""
-    generator = VanachitraFRAGenerator()
+    parser = argparse.ArgumentParser(description="Generate the Vanachitra FRA spatial data")
+    parser.add_argument('--bulk', action='store_true', help='Generate the villages in batches with array operations')
+    parser.add_argument('--villages-per-state', type=int, default=2,
+                        help='Villages (CFRs) per state, e.g. 5000 for about half a million features (use with --bulk)')
+    parser.add_argument('--seed', type=int, help='Seed every village\'s stream for a reproducible dataset')
+    parser.add_argument('--workers', type=int, help='Generate the villages in this many processes')
+    parser.add_argument('--max-overlap', type=float, default=0.0,
+                        help='Largest overlap allowed between parcels of a CFR, as a share of the smaller parcel')
+    parser.add_argument('--free-placement', action='store_true',
+                        help='Place parcels independently of each other (they may overlap)')
+    args = parser.parse_args()
+    
+    generator = VanachitraFRAGenerator(max_overlap=None if args.free_placement else args.max_overlap)
     
     print("🌳 Vanachitra.AI - Generating FRA Spatial Data...")
     print("=" * 50)
     
-    # Generate complete dataset
-    fra_data = generator.generate_complete_fra_dataset()
-    
-    # Save to file
+    # Generate and save the complete dataset
     output_file = 'output/vanachitra_fra_data.geojson'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(fra_data, f, indent=2, ensure_ascii=False)
+    feature_counts = generator.write_fra_dataset(output_file, bulk=args.bulk, villages_per_state=args.villages_per_state,
+                                                 seed=args.seed, workers=args.workers)
     
     print(f"\n✅ FRA data generated successfully!")
     print(f"📁 Output file: {output_file}")
-    print(f"📊 Total features: {len(fra_data['features'])}")
-    
-    # Print summary by feature type
-    feature_counts = {}
-    for feature in fra_data['features']:
-        if 'claim_type' in feature['properties']:
-            ftype = feature['properties']['claim_type']
-        else:
-            ftype = feature['properties']['feature_type']
-        
-        feature_counts[ftype] = feature_counts.get(ftype, 0) + 1
+    print(f"📁 Snapshot: {snapshot_path(output_file)}")
+    print(f"📊 Total features: {sum(feature_counts.values())}")
     
     print("\n📈 Feature type distribution:")
     for ftype, count in feature_counts.items():
         print(f"   {ftype}: {count} features")
     
-    print(f"\n🗺️ States covered: {', '.join(fra_data['properties']['states_covered'])}")
+    print(f"\n🗺️ States covered: {', '.join(generator.forest_states.keys())}")
     print("🎯 Spatial hierarchy: CFR polygons contain IFR and CR features")
     print("✅ All coordinates are within valid Indian land boundaries")
 
@@ -4,6 +4,7 @@ Enhanced AI Land Use Classification for India
 Extended MVP with comprehensive coverage and accurate classification
 """
 
+import argparse
 import os
 import sys
 import numpy as np
@@ -15,6 +16,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
 import json
+from itertools import repeat
 from rasterio.features import shapes
 from rasterio.transform import from_bounds
 import warnings
@@ -23,6 +25,35 @@ warnings.filterwarnings('ignore')
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from feature_snapshot import FeatureSnapshot, snapshot_path
+from geojson_writer import FeatureCollectionWriter
+from parallel_generation import generation_time, iter_partitions, merge_partitions
+
+# Properties of the land-use and FRA sample features; the snapshot fragments are
+# padded to all of them like the DataFrame rows app_enhanced.py serves
+SAMPLE_PROPERTIES = (
+    'class', 'class_id', 'state', 'area_km2', 'confidence', 'population', 'forest_type', 'crop_type',
+    'tribal_area', 'fra_type', 'claim_status', 'claim_area_ha', 'tribal_community', 'village', 'block',
+    'district'
+)
+
+# Largest (state, class) batch of the bulk mode
+SAMPLE_CHUNK_SIZE = 10000
+
+# FRA categories and the chance that a tribal state has an area of each
+FRA_CATEGORIES = {
+    'individual_forest_rights': 0.4,
+    'community_forest_rights': 0.3,
+    'community_forest_resource_rights': 0.2,
+    'habitat_rights': 0.1
+}
+
+
+def _closed_rings(lon, lat):
+    """Closed [lon, lat] rings from (n, m) vertex arrays, as coordinate lists."""
+    ring = np.stack([lon, lat], axis=-1)
+    return np.concatenate([ring, ring[:, :1]], axis=1).tolist()
+
 class IndiaLandUseClassifier:
     def __init__(self, output_dir):
         self.output_dir = output_dir
@@ -50,17 +81,8 @@ class IndiaLandUseClassifier:
             'west': 68.1
         }
         
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-    
-    def generate_india_sample_data(self):
-        """Generate comprehensive sample data for India with realistic distribution."""
-        print("Generating India-wide sample data...")
-        
-        features = []
-        
         # State-wise data distribution (approximate)
-        states_data = {
+        self.states_data = {
             'Andhra Pradesh': {'lat': 15.9129, 'lon': 79.7400, 'scale': 0.8},
             'Arunachal Pradesh': {'lat': 28.2180, 'lon': 94.7278, 'scale': 0.6},
             'Assam': {'lat': 26.2006, 'lon': 92.9376, 'scale': 0.7},
@@ -92,7 +114,7 @@ class IndiaLandUseClassifier:
         }
         
         # Class distribution based on India's land use patterns
-        class_distribution = {
+        self.class_distribution = {
             'water': 0.08,
             'forest_dense': 0.15,
             'forest_open': 0.10,
@@ -105,76 +127,213 @@ class IndiaLandUseClassifier:
             'mangrove': 0.01
         }
         
-        for state_name, state_info in states_data.items():
-            print(f"Generating data for {state_name}...")
+        # States with significant tribal populations (FRA claim areas)
+        self.tribal_states = ['Odisha', 'Chhattisgarh', 'Jharkhand', 'Madhya Pradesh', 'Maharashtra', 
+                              'Andhra Pradesh', 'Telangana', 'Gujarat', 'Rajasthan', 'West Bengal']
+        
+        # Timestamp of this run; SOURCE_DATE_EPOCH pins it
+        self.generated_at = generation_time()
+        
+        # Create output directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def generate_india_sample_data(self, seed=None, workers=None, bulk=False, feature_multiplier=1):
+        """Generate comprehensive sample data for India with realistic distribution (options as in iter_sample_features)."""
+        return self._sample_collection(merge_partitions(self.iter_sample_features(
+            seed=seed, workers=workers, bulk=bulk, feature_multiplier=feature_multiplier)))
+    
+    def write_india_sample_data(self, output_path, seed=None, workers=None, bulk=False, feature_multiplier=1):
+        """Stream the sample data to output_path and its snapshot; returns the collection without its features."""
+        writer = FeatureCollectionWriter(output_path, pad_properties=SAMPLE_PROPERTIES)
+        for features in self.iter_sample_features(seed=seed, workers=workers, bulk=bulk,
+                                                  feature_multiplier=feature_multiplier):
+            writer.extend(features)
+        properties = self._sample_properties(writer.count)
+        writer.close(properties)
+        return {"type": "FeatureCollection", "properties": properties}
+    
+    def iter_sample_features(self, seed=None, workers=None, bulk=False, feature_multiplier=1):
+        """Yield the sample features one partition at a time.
+        
+        With a seed or workers every state's land use and every tribal state's
+        FRA areas are partitions on their own seed streams
+        (parallel_generation.py); the result is the same for any number of
+        worker processes. With bulk=True the partitions are (state, class)
+        batches generated with array operations (generate_partition_batch)
+        and feature_multiplier scales the features per state and class.
+        """
+        print("Generating India-wide sample data...")
+        
+        if bulk:
+            partitions, task = self.sample_partitions(feature_multiplier), self.generate_partition_batch
+        else:
+            partitions = [('land_use', state_name) for state_name in self.states_data]
+            partitions += [('fra', state) for state in self.tribal_states]
+            task = self.generate_partition_features
+        if seed is not None or workers:
+            yield from iter_partitions(task, partitions, seed=seed, workers=workers)
+            return
+        for partition in partitions:
+            yield task(partition)
+    
+    def class_feature_count(self, state_name, class_name, feature_multiplier=1):
+        """Number of features of a class in a state: class share times state size."""
+        scale = self.states_data[state_name]['scale']
+        return max(1, int(self.class_distribution[class_name] * scale * 20 * feature_multiplier))
+    
+    def sample_partitions(self, feature_multiplier=1, chunk_size=SAMPLE_CHUNK_SIZE):
+        """Partitions of the bulk mode, in output order.
+        
+        ('land_use', state, class, count) for every state and class, split into
+        consecutive batches of at most chunk_size, then ('fra', state,
+        feature_multiplier) for every tribal state.
+        """
+        partitions = []
+        for state_name in self.states_data:
+            for class_name in self.class_mapping:
+                count = self.class_feature_count(state_name, class_name, feature_multiplier)
+                for first in range(0, count, chunk_size):
+                    partitions.append(('land_use', state_name, class_name, min(chunk_size, count - first)))
+        partitions += [('fra', state, feature_multiplier) for state in self.tribal_states]
+        return partitions
+    
+    def generate_partition_batch(self, partition, rng=None):
+        """Features of one bulk partition (see sample_partitions), with one array draw per attribute.
+        
+        Same schema, key order and value distributions as
+        generate_partition_features (rng is a numpy RandomState, or the global
+        np.random state); the values differ from it because the draws are
+        ordered by attribute instead of by feature.
+        """
+        rng = np.random if rng is None else rng
+        if partition[0] == 'fra':
+            return self._generate_fra_batch(partition[1], partition[2], rng)
+        
+        _, state_name, class_name, n = partition
+        state_info = self.states_data[state_name]
+        scale = state_info['scale']
+        bounds = self.india_bounds
+        base_lat = np.clip(state_info['lat'] + rng.uniform(-scale, scale, n), bounds['south'], bounds['north'])
+        base_lon = np.clip(state_info['lon'] + rng.uniform(-scale, scale, n), bounds['west'], bounds['east'])
+        size = rng.uniform(0.01, 0.1, n) * scale
+        
+        # Different shapes for different classes
+        if class_name in ['water', 'wetland']:
+            rings = self._create_irregular_polygons(base_lat, base_lon, size, rng)
+        elif class_name in ['urban']:
+            rings = self._create_rectangular_polygons(base_lat, base_lon, size)
+        else:
+            rings = self._create_organic_polygons(base_lat, base_lon, size, rng)
+        
+        columns = {
+            "class": repeat(class_name),
+            "class_id": repeat(self.class_mapping[class_name]),
+            "state": repeat(state_name),
+            "area_km2": np.round(rng.uniform(1, 100, n), 2).tolist(),
+            "confidence": np.round(rng.uniform(0.75, 0.95, n), 2).tolist(),
+            "population": rng.randint(0, 10000, n).tolist() if class_name == 'urban' else repeat(0),
+            "forest_type": self._get_forest_types(class_name, n, rng),
+            "crop_type": self._get_crop_types(class_name, n, rng),
+            "tribal_area": rng.choice([True, False], size=n, p=[0.3, 0.7]).tolist()
+        }
+        return self._batch_features(columns, rings)
+    
+    def _batch_features(self, columns, rings):
+        """Polygon features from property columns (lists or itertools.repeat) and their rings."""
+        keys = list(columns)
+        return [
+            {
+                "type": "Feature",
+                "properties": dict(zip(keys, values)),
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [ring]
+                }
+            }
+            for ring, values in zip(rings, zip(*columns.values()))
+        ]
+    
+    def generate_partition_features(self, partition):
+        """Features of one ('land_use', state) or ('fra', state) partition."""
+        kind, state_name = partition
+        if kind == 'fra':
+            return self._generate_fra_data(state_name)
+        
+        print(f"Generating data for {state_name}...")
+        state_info = self.states_data[state_name]
+        features = []
+        
+        for class_name, class_id in self.class_mapping.items():
+            # Calculate number of features based on distribution and state size
+            num_features = self.class_feature_count(state_name, class_name)
             
-            for class_name, class_id in self.class_mapping.items():
-                # Calculate number of features based on distribution and state size
-                num_features = max(1, int(class_distribution[class_name] * state_info['scale'] * 20))
+            for i in range(num_features):
+                # Create realistic polygon around state center
+                base_lat = state_info['lat'] + np.random.uniform(-state_info['scale'], state_info['scale'])
+                base_lon = state_info['lon'] + np.random.uniform(-state_info['scale'], state_info['scale'])
+                
+                # Ensure coordinates are within India bounds
+                base_lat = max(self.india_bounds['south'], min(self.india_bounds['north'], base_lat))
+                base_lon = max(self.india_bounds['west'], min(self.india_bounds['east'], base_lon))
                 
-                for i in range(num_features):
-                    # Create realistic polygon around state center
-                    base_lat = state_info['lat'] + np.random.uniform(-state_info['scale'], state_info['scale'])
-                    base_lon = state_info['lon'] + np.random.uniform(-state_info['scale'], state_info['scale'])
-                    
-                    # Ensure coordinates are within India bounds
-                    base_lat = max(self.india_bounds['south'], min(self.india_bounds['north'], base_lat))
-                    base_lon = max(self.india_bounds['west'], min(self.india_bounds['east'], base_lon))
-                    
-                    # Create polygon with realistic size
-                    size = np.random.uniform(0.01, 0.1) * state_info['scale']
-                    
-                    # Different shapes for different classes
-                    if class_name in ['water', 'wetland']:
-                        # Water bodies are more irregular
-                        coords = self._create_irregular_polygon(base_lat, base_lon, size)
-                    elif class_name in ['urban']:
-                        # Urban areas are more rectangular
-                        coords = self._create_rectangular_polygon(base_lat, base_lon, size)
-                    else:
-                        # Natural areas are more organic
-                        coords = self._create_organic_polygon(base_lat, base_lon, size)
-                    
-                    feature = {
-                        "type": "Feature",
-                        "properties": {
-                            "class": class_name,
-                            "class_id": class_id,
-                            "state": state_name,
-                            "area_km2": round(np.random.uniform(1, 100), 2),
-                            "confidence": round(np.random.uniform(0.75, 0.95), 2),
-                            "population": np.random.randint(0, 10000) if class_name == 'urban' else 0,
-                            "forest_type": self._get_forest_type(class_name),
-                            "crop_type": self._get_crop_type(class_name),
-                            "tribal_area": bool(np.random.choice([True, False], p=[0.3, 0.7]))
-                        },
-                        "geometry": {
-                            "type": "Polygon",
-                            "coordinates": [coords]
-                        }
+                # Create polygon with realistic size
+                size = np.random.uniform(0.01, 0.1) * state_info['scale']
+                
+                # Different shapes for different classes
+                if class_name in ['water', 'wetland']:
+                    # Water bodies are more irregular
+                    coords = self._create_irregular_polygon(base_lat, base_lon, size)
+                elif class_name in ['urban']:
+                    # Urban areas are more rectangular
+                    coords = self._create_rectangular_polygon(base_lat, base_lon, size)
+                else:
+                    # Natural areas are more organic
+                    coords = self._create_organic_polygon(base_lat, base_lon, size)
+                
+                feature = {
+                    "type": "Feature",
+                    "properties": {
+                        "class": class_name,
+                        "class_id": class_id,
+                        "state": state_name,
+                        "area_km2": round(np.random.uniform(1, 100), 2),
+                        "confidence": round(np.random.uniform(0.75, 0.95), 2),
+                        "population": np.random.randint(0, 10000) if class_name == 'urban' else 0,
+                        "forest_type": self._get_forest_type(class_name),
+                        "crop_type": self._get_crop_type(class_name),
+                        "tribal_area": bool(np.random.choice([True, False], p=[0.3, 0.7]))
+                    },
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [coords]
                     }
-                    
-                    features.append(feature)
-        
-        # Add FRA (Forest Rights Act) specific data
-        fra_features = self._generate_fra_data()
-        features.extend(fra_features)
+                }
+                
+                features.append(feature)
         
+        return features
+    
+    def _sample_collection(self, features):
+        """Wrap the generated features in the sample FeatureCollection."""
         geojson = {
             "type": "FeatureCollection",
             "features": features,
-            "properties": {
-                "generated_at": pd.Timestamp.now().isoformat(),
-                "description": "Enhanced India land use classification with FRA data",
-                "total_features": len(features),
-                "classes": list(self.class_mapping.keys()),
-                "states": list(states_data.keys()),
-                "coverage": "India"
-            }
+            "properties": self._sample_properties(len(features))
         }
         
         return geojson
     
+    def _sample_properties(self, total_features):
+        """Collection properties of the sample data."""
+        return {
+            "generated_at": self.generated_at.isoformat(),
+            "description": "Enhanced India land use classification with FRA data",
+            "total_features": total_features,
+            "classes": list(self.class_mapping.keys()),
+            "states": list(self.states_data.keys()),
+            "coverage": "India"
+        }
+    
     def _create_irregular_polygon(self, lat, lon, size):
         """Create irregular polygon for water bodies."""
         angles = np.linspace(0, 2*np.pi, 8)
@@ -210,6 +369,41 @@ class IndiaLandUseClassifier:
         coords.append(coords[0])  # Close polygon
         return coords
     
+    def _create_irregular_polygons(self, lat, lon, size, rng):
+        """_create_irregular_polygon for arrays of centres and sizes."""
+        angles = np.linspace(0, 2*np.pi, 8)
+        radius = size[:, None] * rng.uniform(0.5, 1.5, (len(size), len(angles)))
+        return _closed_rings(lon[:, None] + radius * np.cos(angles), lat[:, None] + radius * np.sin(angles))
+    
+    def _create_rectangular_polygons(self, lat, lon, size):
+        """_create_rectangular_polygon for arrays of centres and sizes."""
+        half_size = size[:, None] / 2
+        return _closed_rings(lon[:, None] + half_size * np.array([-1, 1, 1, -1]),
+                             lat[:, None] + half_size * np.array([-1, -1, 1, 1]))
+    
+    def _create_organic_polygons(self, lat, lon, size, rng):
+        """_create_organic_polygon for arrays of centres and sizes."""
+        angles = np.linspace(0, 2*np.pi, 12)
+        radius = size[:, None] * rng.uniform(0.3, 1.0, (len(size), len(angles)))
+        return _closed_rings(lon[:, None] + radius * np.cos(angles), lat[:, None] + radius * np.sin(angles))
+    
+    def _get_forest_types(self, class_name, n, rng):
+        """_get_forest_type for n features of a class: a list, or a repeated constant."""
+        if class_name == 'forest_dense':
+            return rng.choice(['Tropical Evergreen', 'Tropical Semi-Evergreen', 'Tropical Moist Deciduous'],
+                              size=n).tolist()
+        elif class_name == 'forest_open':
+            return rng.choice(['Tropical Dry Deciduous', 'Tropical Thorn', 'Subtropical Pine'], size=n).tolist()
+        return repeat('Mangrove' if class_name == 'mangrove' else None)
+    
+    def _get_crop_types(self, class_name, n, rng):
+        """_get_crop_type for n features of a class: a list, or a repeated constant."""
+        if class_name == 'agriculture_irrigated':
+            return rng.choice(['Rice', 'Wheat', 'Sugarcane', 'Cotton', 'Vegetables'], size=n).tolist()
+        elif class_name == 'agriculture_rainfed':
+            return rng.choice(['Millets', 'Pulses', 'Oilseeds', 'Maize'], size=n).tolist()
+        return repeat(None)
+    
     def _get_forest_type(self, class_name):
         """Get forest type based on class."""
         if class_name == 'forest_dense':
@@ -230,58 +424,80 @@ class IndiaLandUseClassifier:
         else:
             return None
     
-    def _generate_fra_data(self):
-        """Generate Forest Rights Act specific data."""
+    def _generate_fra_data(self, state):
+        """Generate Forest Rights Act specific data for one tribal state."""
         fra_features = []
         
-        # FRA categories
-        fra_categories = {
-            'individual_forest_rights': 0.4,
-            'community_forest_rights': 0.3,
-            'community_forest_resource_rights': 0.2,
-            'habitat_rights': 0.1
-        }
-        
-        # States with significant tribal populations
-        tribal_states = ['Odisha', 'Chhattisgarh', 'Jharkhand', 'Madhya Pradesh', 'Maharashtra', 
-                        'Andhra Pradesh', 'Telangana', 'Gujarat', 'Rajasthan', 'West Bengal']
-        
-        for state in tribal_states:
-            for fra_type, probability in fra_categories.items():
-                if np.random.random() < probability:
-                    # Generate FRA claim area
-                    base_lat = np.random.uniform(15, 25)  # Central India
-                    base_lon = np.random.uniform(75, 85)
-                    
-                    size = np.random.uniform(0.05, 0.2)
-                    coords = self._create_organic_polygon(base_lat, base_lon, size)
-                    
-                    feature = {
-                        "type": "Feature",
-                        "properties": {
-                            "class": "fra_area",
-                            "class_id": 11,
-                            "state": state,
-                            "fra_type": fra_type,
-                            "claim_status": np.random.choice(['pending', 'approved', 'rejected'], p=[0.4, 0.5, 0.1]),
-                            "claim_area_ha": round(np.random.uniform(1, 100), 2),
-                            "tribal_community": np.random.choice(['Gond', 'Santal', 'Munda', 'Oraon', 'Ho', 'Kurukh']),
-                            "village": f"Village_{np.random.randint(1, 1000)}",
-                            "block": f"Block_{np.random.randint(1, 50)}",
-                            "district": f"District_{np.random.randint(1, 20)}"
-                        },
-                        "geometry": {
-                            "type": "Polygon",
-                            "coordinates": [coords]
-                        }
+        for fra_type, probability in FRA_CATEGORIES.items():
+            if np.random.random() < probability:
+                # Generate FRA claim area
+                base_lat = np.random.uniform(15, 25)  # Central India
+                base_lon = np.random.uniform(75, 85)
+                
+                size = np.random.uniform(0.05, 0.2)
+                coords = self._create_organic_polygon(base_lat, base_lon, size)
+                
+                feature = {
+                    "type": "Feature",
+                    "properties": {
+                        "class": "fra_area",
+                        "class_id": 11,
+                        "state": state,
+                        "fra_type": fra_type,
+                        "claim_status": np.random.choice(['pending', 'approved', 'rejected'], p=[0.4, 0.5, 0.1]),
+                        "claim_area_ha": round(np.random.uniform(1, 100), 2),
+                        "tribal_community": np.random.choice(['Gond', 'Santal', 'Munda', 'Oraon', 'Ho', 'Kurukh']),
+                        "village": f"Village_{np.random.randint(1, 1000)}",
+                        "block": f"Block_{np.random.randint(1, 50)}",
+                        "district": f"District_{np.random.randint(1, 20)}"
+                    },
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [coords]
                     }
-                    
-                    fra_features.append(feature)
+                }
+                
+                fra_features.append(feature)
         
         return fra_features
+    
+    def _generate_fra_batch(self, state, feature_multiplier, rng):
+        """_generate_fra_data for one tribal state, repeated feature_multiplier times, as arrays."""
+        # One draw per (repetition, category), in the loop's order
+        probabilities = np.array(list(FRA_CATEGORIES.values()))
+        hits = rng.random_sample((feature_multiplier, len(probabilities))) < probabilities
+        fra_types = np.array(list(FRA_CATEGORIES))[np.nonzero(hits)[1]]
+        n = len(fra_types)
+        
+        # FRA claim areas in Central India
+        base_lat = rng.uniform(15, 25, n)
+        base_lon = rng.uniform(75, 85, n)
+        rings = self._create_organic_polygons(base_lat, base_lon, rng.uniform(0.05, 0.2, n), rng)
+        
+        columns = {
+            "class": repeat("fra_area"),
+            "class_id": repeat(11),
+            "state": repeat(state),
+            "fra_type": fra_types.tolist(),
+            "claim_status": rng.choice(['pending', 'approved', 'rejected'], size=n, p=[0.4, 0.5, 0.1]).tolist(),
+            "claim_area_ha": np.round(rng.uniform(1, 100, n), 2).tolist(),
+            "tribal_community": rng.choice(['Gond', 'Santal', 'Munda', 'Oraon', 'Ho', 'Kurukh'], size=n).tolist(),
+            "village": [f"Village_{number}" for number in rng.randint(1, 1000, n).tolist()],
+            "block": [f"Block_{number}" for number in rng.randint(1, 50, n).tolist()],
+            "district": [f"District_{number}" for number in rng.randint(1, 20, n).tolist()]
+        }
+        return self._batch_features(columns, rings)
 
 def main():
     """Generate enhanced India land use data."""
+    parser = argparse.ArgumentParser(description="Generate the India land use sample data")
+    parser.add_argument('--seed', type=int, help='Seed every partition\'s stream for a reproducible dataset')
+    parser.add_argument('--workers', type=int, help='Generate the partitions in this many processes')
+    parser.add_argument('--bulk', action='store_true', help='Generate each state\'s classes as whole arrays')
+    parser.add_argument('--feature-multiplier', type=int, default=1,
+                        help='Scale the features per state and class, e.g. 3000 for about a million (use with --bulk)')
+    args = parser.parse_args()
+    
     print("=== Enhanced India Land Use Classification ===")
     print("Generating comprehensive sample data for India...\n")
     
@@ -291,21 +507,19 @@ def main():
     # Initialize classifier
     classifier = IndiaLandUseClassifier('output')
     
-    # Generate sample data
-    geojson_data = classifier.generate_india_sample_data()
-    
-    # Save to file
+    # Generate the sample data and stream it to file
     output_path = 'output/india_assets.geojson'
-    with open(output_path, 'w') as f:
-        json.dump(geojson_data, f, indent=2)
+    collection = classifier.write_india_sample_data(output_path, seed=args.seed, workers=args.workers, bulk=args.bulk,
+                                                    feature_multiplier=args.feature_multiplier)
     
     print(f"Enhanced data saved to: {output_path}")
-    print(f"Total features: {len(geojson_data['features'])}")
-    print(f"Classes: {', '.join(geojson_data['properties']['classes'])}")
-    print(f"States covered: {len(geojson_data['properties']['states'])}")
+    print(f"Snapshot saved to: {snapshot_path(output_path)}")
+    print(f"Total features: {collection['properties']['total_features']}")
+    print(f"Classes: {', '.join(collection['properties']['classes'])}")
+    print(f"States covered: {len(collection['properties']['states'])}")
     
-    # Generate summary statistics
-    df = pd.DataFrame([f['properties'] for f in geojson_data['features']])
+    # Generate summary statistics from the written snapshot's columns
+    df = FeatureSnapshot(snapshot_path(output_path)).to_frame(geometry=False)
     
     print("\n=== Summary Statistics ===")
     print("Class distribution:")
@@ -44,10 +44,13 @@ def ensure_table(conn) -> None:
                 crop_yield REAL,
                 forest_cover_percentage REAL,
                 poverty_index REAL,
-                infra_index REAL
+                infra_index REAL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
             );
             """
         )
+        # Tables created before updated_at existed; the WebGIS app polls it for changed rows
+        cur.execute("ALTER TABLE polygon_attributes ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()")
         conn.commit()
 
 
@@ -190,7 +193,8 @@ def main() -> None:
                         crop_yield = EXCLUDED.crop_yield,
                         forest_cover_percentage = EXCLUDED.forest_cover_percentage,
                         poverty_index = EXCLUDED.poverty_index,
-                        infra_index = EXCLUDED.infra_index;
+                        infra_index = EXCLUDED.infra_index,
+                        updated_at = now();
                     """,
                     records
                 )
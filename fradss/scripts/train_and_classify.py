@@ -7,6 +7,7 @@ This script trains a Random Forest classifier on satellite imagery
 and classifies land use into Water, Forest, and Agriculture.
 """
 
+import argparse
 import os
 import sys
 import numpy as np
@@ -18,14 +19,56 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
 import json
-from rasterio.features import shapes
-from rasterio.transform import from_bounds
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from rasterio.features import geometry_mask, rasterize, shapes, sieve
+from rasterio.transform import Affine, from_bounds, rowcol
+from rasterio.windows import Window
+import shapely
+from shapely.geometry import mapping, shape
 import warnings
 warnings.filterwarnings('ignore')
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from geojson_writer import FeatureCollectionWriter
+
+# Side of the square windows the block-wise classification uses for untiled images
+CLASSIFY_BLOCK_SIZE = 512
+
+# GDAL block cache (MB) of the block-wise classification; the default (5% of RAM) would hold most of a scene
+CLASSIFY_CACHE_MB = 64
+
+# Side of the tiles the tiled vectorization polygonizes at a time
+VECTORIZE_TILE_SIZE = 1024
+
+# State of a parallel classification worker process: GDAL environment, memory-mapped model, open image
+_worker = {}
+
+
+def predict_window(model, src, window):
+    """Class ids (uint8) of one window of the open image."""
+    block = src.read(window=window)
+    pixels = block.reshape(block.shape[0], -1).T
+    return model.predict(pixels).astype(np.uint8).reshape(block.shape[1:])
+
+
+def _init_classify_worker(model_path, image_path):
+    """Load the model memory-mapped and open the image once per worker process."""
+    _worker['env'] = rasterio.Env(GDAL_CACHEMAX=CLASSIFY_CACHE_MB)
+    _worker['env'].__enter__()
+    model = joblib.load(model_path, mmap_mode='r')
+    # One core per process: the pool is the parallelism
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    _worker['model'] = model
+    _worker['src'] = rasterio.open(image_path)
+
+
+def _classify_window_task(window):
+    return window, predict_window(_worker['model'], _worker['src'], window)
+
 class LandUseClassifier:
     def __init__(self, satellite_image_path, training_data_dir, output_dir):
         self.satellite_image_path = satellite_image_path
@@ -41,13 +84,9 @@ class LandUseClassifier:
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
     
-    def load_training_data(self):
-        """Load training polygons from shapefiles and extract pixel values."""
-        print("Loading training data...")
-        
-        training_data = []
-        training_labels = []
-        
+    def load_training_polygons(self):
+        """(geometry, class id) of every training polygon, from the class shapefiles."""
+        polygons = []
         for class_name, class_id in self.class_mapping.items():
             shapefile_path = os.path.join(self.training_data_dir, f"{class_name}_training.shp")
             
@@ -59,50 +98,43 @@ class LandUseClassifier:
             gdf = gpd.read_file(shapefile_path)
             print(f"Loaded {len(gdf)} {class_name} training polygons")
             
-            # Load satellite image
-            with rasterio.open(self.satellite_image_path) as src:
-                # Extract pixel values for each polygon
-                for idx, geom in enumerate(gdf.geometry):
-                    try:
-                        # Create a mask for the polygon
-                        mask = rasterio.features.geometry_mask(
-                            [geom], 
-                            out_shape=src.shape, 
-                            transform=src.transform, 
-                            invert=True
-                        )
-                        
-                        # Extract pixel values where mask is True
-                        for band_idx in range(src.count):
-                            band_data = src.read(band_idx + 1)
-                            pixel_values = band_data[mask]
-                            
-                            if len(pixel_values) > 0:
-                                # For each pixel, create a feature vector with all bands
-                                if band_idx == 0:
-                                    feature_vector = pixel_values.reshape(-1, 1)
-                                else:
-                                    feature_vector = np.column_stack([
-                                        feature_vector, 
-                                        pixel_values.reshape(-1, 1)
-                                    ])
-                        
-                        # Add labels for all pixels in this polygon
-                        labels = np.full(len(pixel_values), class_id)
-                        
-                        training_data.append(feature_vector)
-                        training_labels.extend(labels)
-                        
-                    except Exception as e:
-                        print(f"Error processing polygon {idx} in {class_name}: {e}")
-                        continue
+            for idx, geom in enumerate(gdf.geometry):
+                if geom is None or geom.is_empty:
+                    print(f"Error processing polygon {idx} in {class_name}: empty geometry")
+                    continue
+                polygons.append((geom, class_id))
+        return polygons
+    
+    def load_training_data(self, max_samples_per_class=None, windowed=False, random_state=42):
+        """Load training polygons from shapefiles and extract pixel values.
         
-        if not training_data:
+        All polygons are rasterized into one label raster covering their
+        bounding window, each band is read once over that window, and the
+        labelled pixels are gathered in one indexing step. With windowed=True
+        every polygon is read and masked over its own bounding window instead,
+        which reads less when a few polygons are spread over a large scene.
+        A pixel covered by polygons of several classes takes the class listed
+        last in class_mapping.
+        
+        max_samples_per_class caps the samples of every class with a random
+        subset (seeded by random_state).
+        """
+        print("Loading training data...")
+        
+        polygons = self.load_training_polygons()
+        if not polygons:
             raise ValueError("No training data found. Please check your shapefiles.")
         
-        # Combine all training data
-        X = np.vstack(training_data)
-        y = np.array(training_labels)
+        with rasterio.open(self.satellite_image_path) as src:
+            if windowed:
+                X, y = self._polygon_pixels(src, polygons)
+            else:
+                X, y = self._label_raster_pixels(src, polygons)
+        
+        if not len(y):
+            raise ValueError("No training data found. Please check your shapefiles.")
+        if max_samples_per_class is not None:
+            X, y = self._cap_samples(X, y, max_samples_per_class, random_state)
         
         print(f"Total training samples: {len(X)}")
         print(f"Feature dimensions: {X.shape[1]}")
@@ -110,6 +142,74 @@ class LandUseClassifier:
         
         return X, y
     
+    @staticmethod
+    def _bounds_window(src, bounds):
+        """Window of the raster covering bounds (minx, miny, maxx, maxy), clipped to it; None when outside."""
+        rows, cols = rowcol(src.transform, [bounds[0], bounds[2]], [bounds[3], bounds[1]])
+        row_start, row_stop = max(0, min(rows)), min(src.height, max(rows) + 1)
+        col_start, col_stop = max(0, min(cols)), min(src.width, max(cols) + 1)
+        if row_stop <= row_start or col_stop <= col_start:
+            return None
+        return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+    
+    @staticmethod
+    def _window_pixels(src, window, rows, cols):
+        """Band values of the pixels (rows, cols) of a window, as a pixels x bands array; one read per band."""
+        X = np.empty((len(rows), src.count), dtype=src.dtypes[0])
+        for band_idx in range(src.count):
+            X[:, band_idx] = src.read(band_idx + 1, window=window)[rows, cols]
+        return X
+    
+    def _label_raster_pixels(self, src, polygons):
+        """Pixels of all polygons from one label raster over their joint bounding window."""
+        bounds = np.array([geom.bounds for geom, _ in polygons])
+        window = self._bounds_window(src, (*bounds[:, :2].min(axis=0), *bounds[:, 2:].max(axis=0)))
+        if window is None:
+            return np.empty((0, src.count), dtype=src.dtypes[0]), np.empty(0, dtype=int)
+        labels = rasterize(
+            polygons,
+            out_shape=(window.height, window.width),
+            transform=src.window_transform(window),
+            fill=0,
+            dtype='uint8'
+        )
+        rows, cols = np.nonzero(labels)
+        return self._window_pixels(src, window, rows, cols), labels[rows, cols].astype(int)
+    
+    def _polygon_pixels(self, src, polygons):
+        """Pixels of every polygon, read and masked over the polygon's own bounding window."""
+        training_data = []
+        training_labels = []
+        for geom, class_id in polygons:
+            window = self._bounds_window(src, geom.bounds)
+            if window is None:
+                continue
+            mask = geometry_mask(
+                [geom],
+                out_shape=(window.height, window.width),
+                transform=src.window_transform(window),
+                invert=True
+            )
+            rows, cols = np.nonzero(mask)
+            training_data.append(self._window_pixels(src, window, rows, cols))
+            training_labels.append(np.full(len(rows), class_id))
+        if not training_data:
+            return np.empty((0, src.count), dtype=src.dtypes[0]), np.empty(0, dtype=int)
+        return np.vstack(training_data), np.concatenate(training_labels)
+    
+    @staticmethod
+    def _cap_samples(X, y, max_samples_per_class, random_state):
+        """At most max_samples_per_class random samples of every class, in their original order."""
+        rng = np.random.RandomState(random_state)
+        keep = []
+        for class_id in np.unique(y):
+            index = np.flatnonzero(y == class_id)
+            if len(index) > max_samples_per_class:
+                index = rng.choice(index, max_samples_per_class, replace=False)
+            keep.append(index)
+        keep = np.sort(np.concatenate(keep))
+        return X[keep], y[keep]
+    
     def train_model(self, X, y):
         """Train Random Forest classifier."""
         print("Training Random Forest classifier...")
@@ -163,18 +263,17 @@ class LandUseClassifier:
             
             # Classify in batches to manage memory
             batch_size = 10000
-            predictions = []
+            predictions = np.empty(len(image_2d), dtype=np.uint8)
             
             for i in range(0, len(image_2d), batch_size):
                 batch = image_2d[i:i+batch_size]
-                batch_pred = self.model.predict(batch)
-                predictions.extend(batch_pred)
+                predictions[i:i+batch_size] = self.model.predict(batch)
                 
                 if (i // batch_size) % 10 == 0:
                     print(f"Processed {i}/{len(image_2d)} pixels")
             
             # Reshape predictions back to image shape
-            classified_image = np.array(predictions).reshape(original_shape)
+            classified_image = predictions.reshape(original_shape)
             
             # Save classified raster
             output_path = os.path.join(self.output_dir, 'classified_map.tif')
@@ -194,10 +293,143 @@ class LandUseClassifier:
             
             return classified_image, src.crs, src.transform
     
-    def raster_to_geojson(self, classified_image, crs, transform):
-        """Convert classified raster to GeoJSON polygons."""
+    @staticmethod
+    def classification_windows(src, block_size=CLASSIFY_BLOCK_SIZE):
+        """Windows to classify: the raster's internal blocks when it is tiled, else block_size squares."""
+        block_height, block_width = src.block_shapes[0]
+        if block_width < src.width:
+            return [window for _, window in src.block_windows(1)]
+        return [
+            Window(col, row, min(block_size, src.width - col), min(block_size, src.height - row))
+            for row in range(0, src.height, block_size)
+            for col in range(0, src.width, block_size)
+        ]
+    
+    def classified_profile(self, src, block_size=CLASSIFY_BLOCK_SIZE):
+        """Profile of the classified map: one tiled uint8 band on the image's grid.
+        
+        The tiles match the image's blocks when it is tiled, so every
+        classified window is written as whole tiles.
+        """
+        block_height, block_width = src.block_shapes[0]
+        if not (block_width < src.width and block_height % 16 == 0 and block_width % 16 == 0):
+            block_height = block_width = block_size
+        return {
+            'driver': 'GTiff',
+            'height': src.height,
+            'width': src.width,
+            'count': 1,
+            'dtype': 'uint8',
+            'crs': src.crs,
+            'transform': src.transform,
+            'tiled': True,
+            'blockxsize': block_width,
+            'blockysize': block_height,
+            'compress': 'deflate'
+        }
+    
+    def classify_window(self, src, window):
+        """Class ids (uint8) of one window of the open image."""
+        return predict_window(self.model, src, window)
+    
+    def classify_image_blocks(self, output_path=None, block_size=CLASSIFY_BLOCK_SIZE):
+        """Classify the satellite image block by block, streaming into a tiled uint8 GeoTIFF.
+        
+        Each of the image's internal blocks (block_size squares for an untiled
+        image) is read, predicted and written on its own, and GDAL's block
+        cache is limited to CLASSIFY_CACHE_MB, so peak memory is about one
+        block of every band, whatever the size of the scene. Returns the path
+        of the classified map.
+        """
+        print("Classifying satellite image block by block...")
+        output_path = output_path or os.path.join(self.output_dir, 'classified_map.tif')
+        
+        with rasterio.Env(GDAL_CACHEMAX=CLASSIFY_CACHE_MB), rasterio.open(self.satellite_image_path) as src:
+            windows = self.classification_windows(src, block_size)
+            print(f"Classifying {src.width * src.height} pixels in {len(windows)} blocks...")
+            
+            with rasterio.open(output_path, 'w', **self.classified_profile(src, block_size)) as dst:
+                for i, window in enumerate(windows):
+                    dst.write(self.classify_window(src, window), 1, window=window)
+                    
+                    if i % 100 == 0:
+                        print(f"Processed {i}/{len(windows)} blocks")
+        
+        print(f"Classified image saved to: {output_path}")
+        return output_path
+    
+    def classify_image_parallel(self, workers=None, output_path=None, model_path=None,
+                                block_size=CLASSIFY_BLOCK_SIZE):
+        """Classify the image's blocks in a pool of worker processes (workers defaults to the CPU count).
+        
+        Every worker loads the model memory-mapped from model_path (the file
+        train_model saved) and opens the image itself, so only windows travel to
+        the workers and class blocks back. Each worker reads and predicts its
+        windows while this process writes finished blocks into the tiled
+        uint8 GeoTIFF (as in classify_image_blocks); at most 2 * workers blocks
+        are in flight. Without model_path the model is dumped (joblib,
+        uncompressed) to a temporary file in output_dir, removed once the pool
+        has exited. Returns the path of the classified map.
+        """
+        if self.model is None:
+            raise ValueError("No model. Train one with train_model() or load land_classifier.pkl first.")
+        workers = workers or os.cpu_count() or 1
+        output_path = output_path or os.path.join(self.output_dir, 'classified_map.tif')
+        temporary_model = model_path is None
+        if temporary_model:
+            # Never overwrite land_classifier.pkl: that is train_model's (or the user's) saved model
+            fd, model_path = tempfile.mkstemp(prefix='land_classifier_', suffix='.pkl', dir=self.output_dir)
+            os.close(fd)
+        try:
+            if temporary_model:
+                joblib.dump(self.model, model_path)
+            print(f"Classifying satellite image in {workers} processes...")
+        
+            with rasterio.Env(GDAL_CACHEMAX=CLASSIFY_CACHE_MB):
+                with rasterio.open(self.satellite_image_path) as src:
+                    windows = self.classification_windows(src, block_size)
+                    profile = self.classified_profile(src, block_size)
+                print(f"Classifying {profile['width'] * profile['height']} pixels in {len(windows)} blocks...")
+            
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_classify_worker,
+                                         initargs=(model_path, self.satellite_image_path)) as pool, \
+                        rasterio.open(output_path, 'w', **profile) as dst:
+                    remaining = iter(windows)
+                    pending = set()
+                    written = 0
+                    while True:
+                        # Top up to 2 * workers blocks in flight
+                        for window in remaining:
+                            pending.add(pool.submit(_classify_window_task, window))
+                            if len(pending) >= 2 * workers:
+                                break
+                        if not pending:
+                            break
+                        # Write whatever is finished while the workers carry on
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            window, classes = future.result()
+                            dst.write(classes, 1, window=window)
+                            if written % 100 == 0:
+                                print(f"Processed {written}/{len(windows)} blocks")
+                            written += 1
+        finally:
+            if temporary_model:
+                os.remove(model_path)
+        
+        print(f"Classified image saved to: {output_path}")
+        return output_path
+    
+    def raster_to_geojson(self, classified_image, crs, transform, min_mapping_unit=0):
+        """Convert classified raster to GeoJSON polygons.
+        
+        min_mapping_unit (pixels) sieves smaller regions into their neighbours first.
+        """
         print("Converting raster to GeoJSON...")
         
+        if min_mapping_unit:
+            classified_image = sieve(classified_image, size=min_mapping_unit)
+        
         # Create a mask for each class
         features = []
         
@@ -236,9 +468,162 @@ class LandUseClassifier:
         print(f"Total features: {len(gdf)}")
         
         return geojson_path
+    
+    @staticmethod
+    def vectorize_windows(src, tile_size=VECTORIZE_TILE_SIZE):
+        """tile_size squares covering the raster, row by row."""
+        return [
+            Window(col, row, min(tile_size, src.width - col), min(tile_size, src.height - row))
+            for row in range(0, src.height, tile_size)
+            for col in range(0, src.width, tile_size)
+        ]
+    
+    @staticmethod
+    def _read_tile(src, window, min_mapping_unit=0):
+        """Classes of one tile, sieved with a margin of min_mapping_unit pixels around it.
+        
+        A region reaching into the tile that leaves the margin has more than
+        min_mapping_unit pixels inside it, so it is kept as it would be by
+        sieving the whole map; only which neighbour absorbs a small region
+        next to a seam can differ.
+        """
+        if not min_mapping_unit:
+            return src.read(1, window=window)
+        col_start, row_start = max(0, window.col_off - min_mapping_unit), max(0, window.row_off - min_mapping_unit)
+        col_stop = min(src.width, window.col_off + window.width + min_mapping_unit)
+        row_stop = min(src.height, window.row_off + window.height + min_mapping_unit)
+        classes = sieve(src.read(1, window=Window(col_start, row_start, col_stop - col_start, row_stop - row_start)),
+                        size=min_mapping_unit)
+        return classes[window.row_off - row_start:window.row_off - row_start + window.height,
+                       window.col_off - col_start:window.col_off - col_start + window.width]
+    
+    @staticmethod
+    def merge_seam_pieces(pieces):
+        """Polygons from the pieces of regions cut by tile seams: every group of touching pieces is unioned.
+        
+        Pieces are grouped through an STRtree query, so only pieces that meet
+        another piece go through the (costly) union.
+        """
+        pieces = np.array(pieces, dtype=object)
+        left, right = shapely.STRtree(pieces).query(pieces, predicate='intersects')
+        # Union-find over the touching pairs
+        parent = np.arange(len(pieces))
+        def root(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        for i, j in zip(left.tolist(), right.tolist()):
+            if i < j:
+                parent[root(j)] = root(i)
+        groups = {}
+        for i in range(len(pieces)):
+            groups.setdefault(root(i), []).append(i)
+        merged = []
+        for group in groups.values():
+            if len(group) == 1:
+                merged.append(pieces[group[0]])
+            else:
+                union = shapely.union_all(pieces[group])
+                merged.extend(getattr(union, 'geoms', [union]))
+        return merged
+    
+    def _write_class_polygons(self, writer, polygons, class_ids, transform, simplify_tolerance):
+        """Write polygons in pixel coordinates as class features, moved onto the map and simplified as one array."""
+        if not polygons:
+            return
+        class_names = {class_id: class_name for class_name, class_id in self.class_mapping.items()}
+        polygons = shapely.transform(np.array(polygons, dtype=object),
+                                     lambda xy: np.column_stack(transform * (xy[:, 0], xy[:, 1])))
+        if simplify_tolerance:
+            polygons = shapely.simplify(polygons, simplify_tolerance)
+        for polygon, class_id in zip(polygons, class_ids):
+            writer.add({
+                'type': 'Feature',
+                'properties': {'class': class_names[class_id], 'class_id': class_id},
+                'geometry': mapping(polygon)
+            })
+    
+    def raster_to_geojson_tiled(self, classified_path, geojson_path=None, tile_size=VECTORIZE_TILE_SIZE,
+                                min_mapping_unit=0, simplify_tolerance=0.0001):
+        """Convert a classified raster file to GeoJSON polygons tile by tile, streaming them to disk.
+        
+        Each tile is polygonized once for all classes, in pixel coordinates of
+        the whole map, so the pieces of a region cut by tile seams meet
+        exactly. Polygons clear of the seams are moved onto the map,
+        simplified and written at once; the pieces touching a seam are kept
+        and merged per class at the end (merge_seam_pieces). Memory is one tile plus
+        the seam pieces. min_mapping_unit (pixels) sieves smaller regions into
+        their neighbours before vectorizing (see _read_tile). The GeoJSON gets
+        a snapshot (geojson_writer.py); returns its path.
+        """
+        print("Converting raster to GeoJSON tile by tile...")
+        geojson_path = geojson_path or os.path.join(self.output_dir, 'assets.geojson')
+        class_ids = list(self.class_mapping.values())
+        seam_pieces = {class_id: [] for class_id in class_ids}
+        writer = FeatureCollectionWriter(geojson_path)
+        
+        with rasterio.Env(GDAL_CACHEMAX=CLASSIFY_CACHE_MB), rasterio.open(classified_path) as src:
+            transform, crs = src.transform, src.crs
+            windows = self.vectorize_windows(src, tile_size)
+            for i, window in enumerate(windows):
+                classes = self._read_tile(src, window, min_mapping_unit)
+                mask = np.isin(classes, class_ids)
+                if not mask.any():
+                    continue
+                
+                # Tile edges (left, top, right, bottom) that are seams with another tile
+                edges = (window.col_off, window.row_off, window.col_off + window.width, window.row_off + window.height)
+                seams = (window.col_off > 0, window.row_off > 0, edges[2] < src.width, edges[3] < src.height)
+                
+                clear, clear_ids = [], []
+                for geometry, value in shapes(classes, mask=mask,
+                                              transform=Affine.translation(window.col_off, window.row_off)):
+                    polygon = shape(geometry)
+                    if any(seam and bound == edge for seam, bound, edge in zip(seams, polygon.bounds, edges)):
+                        seam_pieces[int(value)].append(polygon)
+                    else:
+                        clear.append(polygon)
+                        clear_ids.append(int(value))
+                self._write_class_polygons(writer, clear, clear_ids, transform, simplify_tolerance)
+                
+                if i % 100 == 0:
+                    print(f"Processed {i}/{len(windows)} tiles")
+        
+        # Merge the regions cut by seams
+        for class_id, pieces in seam_pieces.items():
+            if pieces:
+                merged = self.merge_seam_pieces(pieces)
+                self._write_class_polygons(writer, merged, [class_id] * len(merged), transform, simplify_tolerance)
+        
+        writer.close({
+            'total_features': writer.count,
+            'classes': list(self.class_mapping.keys()),
+            'crs': crs.to_string() if crs else None
+        })
+        
+        print(f"GeoJSON saved to: {geojson_path}")
+        print(f"Total features: {writer.count}")
+        
+        return geojson_path
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Train the land use classifier and classify the satellite image")
+    parser.add_argument('--max-samples-per-class', type=int,
+                        help='Train on at most this many random pixels of every class')
+    parser.add_argument('--windowed-training', action='store_true',
+                        help='Read every training polygon over its own window instead of one label raster')
+    parser.add_argument('--blockwise', action='store_true',
+                        help='Classify the image block by block into a tiled GeoTIFF (bounded memory)')
+    parser.add_argument('--workers', type=int,
+                        help='Classify the blocks in this many processes (implies --blockwise)')
+    parser.add_argument('--tiled-vectorize', action='store_true',
+                        help='Vectorize the classified map tile by tile, streaming the polygons to disk')
+    parser.add_argument('--min-mapping-unit', type=int, default=0,
+                        help='Merge classified regions smaller than this many pixels into their neighbours')
+    args = parser.parse_args()
+    
     print("=== AI Land Use Classification MVP ===")
     print("Phase 2: AI Model Training & Classification\n")
     
@@ -264,16 +649,33 @@ def main():
         classifier = LandUseClassifier(satellite_image_path, training_data_dir, output_dir)
         
         # Load training data
-        X, y = classifier.load_training_data()
+        X, y = classifier.load_training_data(max_samples_per_class=args.max_samples_per_class,
+                                             windowed=args.windowed_training)
         
         # Train model
         accuracy = classifier.train_model(X, y)
         
         # Classify image
-        classified_image, crs, transform = classifier.classify_image()
+        classified_image = None
+        if args.workers:
+            classified_path = classifier.classify_image_parallel(
+                workers=args.workers, model_path=os.path.join(output_dir, 'land_classifier.pkl'))
+        elif args.blockwise:
+            classified_path = classifier.classify_image_blocks()
+        else:
+            classified_image, crs, transform = classifier.classify_image()
+            classified_path = os.path.join(output_dir, 'classified_map.tif')
         
         # Convert to GeoJSON
-        geojson_path = classifier.raster_to_geojson(classified_image, crs, transform)
+        if args.tiled_vectorize:
+            geojson_path = classifier.raster_to_geojson_tiled(classified_path,
+                                                              min_mapping_unit=args.min_mapping_unit)
+        else:
+            if classified_image is None:
+                with rasterio.open(classified_path) as classified:
+                    classified_image, crs, transform = classified.read(1), classified.crs, classified.transform
+            geojson_path = classifier.raster_to_geojson(classified_image, crs, transform,
+                                                        min_mapping_unit=args.min_mapping_unit)
         
         print("\n=== Classification Complete ===")
         print(f"Model accuracy: {accuracy:.3f}")
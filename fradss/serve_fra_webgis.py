@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+FRA WebGIS Production Launcher
+Pre-fork server for app_fra_webgis.py: the master process loads the FRA
+manager and the serialized claim fragments once, then forks worker processes
+that share those pages copy-on-write. The DSS indexes (NumPy arrays) are
+built by each worker on its first scheme or priority request.
+
+With --snapshot the claim store is written once to a memory-mapped snapshot
+(see feature_snapshot.py) and the workers serve from the mapped file, so the
+claim data stays shared no matter how long the workers run.
+
+Usage:
+    python serve_fra_webgis.py --workers 4 --port 5001
+    python serve_fra_webgis.py --workers 4 --snapshot output/fra_claims.snapshot
+
+Signals to the master:
+    SIGTERM/SIGINT  graceful shutdown (workers finish in-flight requests)
+    SIGUSR1         print per-worker memory (RSS/PSS/shared/private)
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+DEFAULT_WORKERS = int(os.getenv('FRA_WORKERS', str(os.cpu_count() or 2)))
+SHUTDOWN_TIMEOUT = 30
+
+
+def process_memory(pid):
+    """Memory of a process in kB: rss, pss, shared and private (Linux /proc; rss-only elsewhere)."""
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    memory[parts[0][:-1]] = int(parts[1])
+        return {
+            'rss': memory.get('Rss', 0),
+            'pss': memory.get('Pss', 0),
+            'shared': memory.get('Shared_Clean', 0) + memory.get('Shared_Dirty', 0),
+            'private': memory.get('Private_Clean', 0) + memory.get('Private_Dirty', 0)
+        }
+    except OSError:
+        pass
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return {'rss': int(line.split()[1])}
+    except OSError:
+        pass
+    if pid == os.getpid():
+        import resource
+        return {'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return {}
+
+
+def format_memory(memory):
+    return '  '.join(f"{key}={value / 1024:.1f}MB" for key, value in memory.items()) or 'unavailable'
+
+
+class PreforkServer:
+    """Master process: preloads the app, owns the listening socket and supervises the workers."""
+
+    def __init__(self, host, port, workers, threaded=True, backlog=128, snapshot_dir=None):
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.threaded = threaded
+        self.backlog = backlog
+        self.snapshot_dir = snapshot_dir
+        self.workers = {}
+        self.socket = None
+        self.app = None
+        self.stopping = False
+
+    def preload(self):
+        """Load the datasets once, before any worker exists."""
+        import app_fra_webgis
+
+        start = time.time()
+        if self.snapshot_dir:
+            # Refcounted Python objects drift into private pages as workers run;
+            # the mapped snapshot is read-only and stays in the shared page cache.
+            # load_data maps it, writing it first when missing or stale
+            app_fra_webgis.fra_manager.snapshot_dir = self.snapshot_dir
+        # Workers are forked ready: the load runs here, never in a warm-up thread
+        app_fra_webgis.warm_up()
+        self.app = app_fra_webgis.app
+        # Move everything loaded so far into the permanent generation so the
+        # cyclic GC in the workers never writes to (and un-shares) those pages
+        gc.collect()
+        gc.freeze()
+        print(f"[master {os.getpid()}] preloaded datasets in {time.time() - start:.2f}s, "
+              f"{format_memory(process_memory(os.getpid()))}")
+
+    def bind(self):
+        self.socket = socket.create_server((self.host, self.port), backlog=self.backlog, reuse_port=False)
+        self.socket.set_inheritable(True)
+
+    def spawn_worker(self, index):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = index
+            return pid
+        # Worker process
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        try:
+            server = make_server(self.host, self.port, self.app, threaded=self.threaded, fd=self.socket.fileno())
+            # Let in-flight requests finish on shutdown
+            server.daemon_threads = False
+            server.block_on_close = True
+
+            def shutdown(signum, frame):
+                threading.Thread(target=server.shutdown, daemon=True).start()
+
+            signal.signal(signal.SIGTERM, shutdown)
+            print(f"[worker {index} pid {os.getpid()}] serving on http://{self.host}:{self.port}")
+            server.serve_forever()
+            server.server_close()
+        except Exception as e:
+            print(f"[worker {index} pid {os.getpid()}] crashed: {e}")
+            os._exit(1)
+        os._exit(0)
+
+    def report_memory(self, *_):
+        print(f"[master {os.getpid()}] {format_memory(process_memory(os.getpid()))}")
+        total = {}
+        for pid, index in sorted(self.workers.items(), key=lambda item: item[1]):
+            memory = process_memory(pid)
+            for key, value in memory.items():
+                total[key] = total.get(key, 0) + value
+            print(f"[worker {index} pid {pid}] {format_memory(memory)}")
+        if total:
+            print(f"[workers total] {format_memory(total)}")
+        sys.stdout.flush()
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def reap(self):
+        """Collect exited workers; returns the indexes that need respawning."""
+        dead = []
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            index = self.workers.pop(pid, None)
+            if index is not None:
+                dead.append(index)
+                if not self.stopping:
+                    print(f"[worker {index} pid {pid}] exited with status {status}, respawning")
+        return dead
+
+    def shutdown_workers(self):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + SHUTDOWN_TIMEOUT
+        while self.workers and time.time() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            print(f"[worker {self.workers[pid]} pid {pid}] did not stop in {SHUTDOWN_TIMEOUT}s, killing")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.clear()
+
+    def run(self, report_interval=0):
+        self.preload()
+        self.bind()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR1, self.report_memory)
+
+        for index in range(self.num_workers):
+            self.spawn_worker(index)
+
+        print(f"[master {os.getpid()}] {self.num_workers} workers on http://{self.host}:{self.port}")
+        next_report = time.time() + (report_interval or 2)
+        reported_startup = False
+        while not self.stopping:
+            for index in self.reap():
+                if not self.stopping:
+                    self.spawn_worker(index)
+            if time.time() >= next_report:
+                # Always report once shortly after startup, then every report_interval
+                if report_interval or not reported_startup:
+                    self.report_memory()
+                reported_startup = True
+                next_report = time.time() + (report_interval or float('inf'))
+            time.sleep(0.2)
+
+        print(f"[master {os.getpid()}] shutting down {len(self.workers)} workers")
+        self.shutdown_workers()
+        self.socket.close()
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-fork launcher for the FRA WebGIS application')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Number of worker processes (default: FRA_WORKERS or CPU count)')
+    parser.add_argument('--snapshot', default=os.getenv('FRA_SNAPSHOT_DIR'),
+                        help='Serve claims from a memory-mapped snapshot directory (written if missing or stale)')
+    parser.add_argument('--no-threads', action='store_true', help='Serve one request at a time per worker')
+    parser.add_argument('--report-interval', type=float, default=0,
+                        help='Seconds between per-worker memory reports (0: only at startup and on SIGUSR1)')
+    args = parser.parse_args()
+
+    print("=== FRA WebGIS Production Launcher ===")
+    server = PreforkServer(args.host, args.port, max(1, args.workers), threaded=not args.no_threads,
+                           snapshot_dir=args.snapshot)
+    return server.run(report_interval=args.report_interval)
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,196 @@
+"""Incremental refreshes of the DSS eligibility matrix against a freshly built one."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app_fra_webgis import FRAWebGISManager, PriorityRanker, SchemeEligibilityMatrix
+from feature_snapshot import write_collection_snapshot
+
+CLAIMS = [
+    {'claim_id': 'C1', 'state': 'Telangana', 'district': 'Adilabad', 'fra_type': 'Individual Forest Rights',
+     'claim_type': 'IFR', 'total_households': 1},
+    {'claim_id': 'C2', 'state': 'Odisha', 'district': 'Koraput', 'fra_type': 'Community Forest Resource Rights',
+     'claim_type': 'CFR', 'total_households': 40},
+    {'claim_id': 'C3', 'state': 'Madhya Pradesh', 'district': 'Mandla', 'fra_type': 'Community Rights',
+     'claim_type': 'CR', 'total_households': 25},
+    {'claim_id': 'C4', 'state': 'Tripura', 'district': 'Dhalai', 'fra_type': 'Individual Forest Rights',
+     'claim_type': 'IFR', 'total_households': 1},
+]
+VANACHITRA = [
+    {'feature_id': 'V1', 'state': 'Odisha', 'district': 'Koraput', 'feature_type': 'Water Body'},
+    # Repeats a claim id: resolves to the claim, as /dss does
+    {'feature_id': 'C2', 'state': 'Tripura', 'district': 'Dhalai', 'feature_type': 'Agriculture'},
+]
+SCHEMES = [
+    {'name': 'PM-KISAN', 'sectors': ['Agriculture'], 'geography': ['All-India']},
+    {'name': 'MGNREGA', 'sectors': ['Agriculture', 'Water', 'Forest'], 'geography': ['All-India']},
+    {'name': 'Rythu Bandhu', 'sectors': ['Agriculture'], 'geography': ['Telangana']},
+    {'name': 'OFSDP', 'sectors': ['Forest', 'Tribal Welfare'], 'geography': ['Odisha']},
+]
+ATTRIBUTES = {
+    'C1': {'water_level': 150, 'groundwater_index': 0.8, 'soil_quality': 'Good', 'crop_yield': 5.0,
+           'forest_cover_percentage': 10.0, 'poverty_index': 0.2, 'infra_index': 0.5},
+    'C2': {'water_level': 150, 'groundwater_index': 0.8, 'soil_quality': 'Good', 'crop_yield': 20.0,
+           'forest_cover_percentage': 60.0, 'poverty_index': 0.2, 'infra_index': 0.5},
+    'C4': {'water_level': 150, 'groundwater_index': 0.8, 'soil_quality': 'Good', 'crop_yield': 20.0,
+           'forest_cover_percentage': 10.0, 'poverty_index': 0.2, 'infra_index': 0.5},
+}
+
+
+def collection(properties):
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': props, 'geometry': {'type': 'Point', 'coordinates': [80.0, 20.0]}}
+        for props in properties
+    ]}
+
+
+def write_json(path, data, bump=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    if bump:
+        # Coarse filesystem clocks: make sure the rewrite is seen as a change
+        stamp = os.path.getmtime(path) + bump
+        os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture(params=['frame', 'snapshot'])
+def dataset(request, tmp_path, monkeypatch):
+    """Claims, Vanachitra, scheme and attribute files, with the claims served from a DataFrame or a snapshot."""
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    files = {name: str(tmp_path / f'{name}.json') for name in ('claims', 'vanachitra', 'schemes', 'attrs')}
+    write_json(files['claims'], collection(CLAIMS))
+    if request.param == 'snapshot':
+        write_collection_snapshot(collection(CLAIMS), files['claims'], pad_properties=True)
+    write_json(files['vanachitra'], collection(VANACHITRA))
+    write_json(files['schemes'], SCHEMES)
+    write_json(files['attrs'], {'items': ATTRIBUTES})
+    return files
+
+
+def build_matrix(files, attrs_file=None):
+    manager = FRAWebGISManager(files['claims'], None)
+    matrix = SchemeEligibilityMatrix(manager, files['vanachitra'], schemes_file=files['schemes'],
+                                     attrs_file=attrs_file or files['attrs'], poll_seconds=None)
+    matrix.refresh()
+    return matrix
+
+
+def record_computed_rows(matrix, monkeypatch):
+    rows = []
+    compute_row = matrix._compute_row
+
+    def recording(row, attrs):
+        rows.append(row)
+        compute_row(row, attrs)
+
+    monkeypatch.setattr(matrix, '_compute_row', recording)
+    return rows
+
+
+def eligibility(matrix):
+    """Eligible polygon ids per scheme, leaving out empty columns."""
+    result = {}
+    for name, column in matrix.scheme_columns.items():
+        rows = np.flatnonzero(matrix.eligible[:, column]).tolist()
+        if rows:
+            result[name] = sorted(matrix.polygon_id(row) for row in rows)
+    return result
+
+
+def changed_rows(matrix, before):
+    """Rows whose recommendation or eligibility flags differ from a (recommended, eligible) copy."""
+    rows = set()
+    for now, then in zip((matrix.recommended, matrix.eligible), before):
+        # Columns added since the copy started out all False
+        then = np.pad(then, ((0, 0), (0, now.shape[1] - then.shape[1])))
+        rows |= set(np.flatnonzero((now != then).any(axis=1)).tolist())
+    return rows
+
+
+def test_duplicate_ids_resolve_to_the_claim(dataset):
+    matrix = build_matrix(dataset)
+    assert matrix.row_of('C2') == 1
+    assert int(matrix.active.sum()) == len(CLAIMS) + 1
+    assert matrix.schemes_for_polygon('V1') is not None
+
+
+def test_catalogue_change_patches_only_its_columns(dataset, monkeypatch):
+    matrix = build_matrix(dataset)
+    computed = record_computed_rows(matrix, monkeypatch)
+    before = {name: matrix.eligible[:, column].copy() for name, column in matrix.scheme_columns.items()}
+    recommended = matrix.recommended[:, matrix.scheme_columns['PM-KISAN']].copy()
+    assert recommended.any()
+
+    # Rythu Bandhu moves to Odisha, PM-KISAN leaves the catalogue and Haritha Haram joins it
+    schemes = [dict(s, geography=['Odisha']) if s['name'] == 'Rythu Bandhu' else s
+               for s in SCHEMES if s['name'] != 'PM-KISAN']
+    schemes.append({'name': 'Haritha Haram', 'sectors': ['Forest', 'Water'], 'geography': ['Telangana']})
+    write_json(dataset['schemes'], schemes, bump=10)
+    matrix.refresh()
+
+    assert computed == []
+    changed = {name for name, column in matrix.scheme_columns.items()
+               if not np.array_equal(matrix.eligible[:, column], before.get(name, False))}
+    assert changed <= {'Rythu Bandhu', 'PM-KISAN', 'Haritha Haram'}
+    assert 'Rythu Bandhu' in changed
+    # Rules-engine recommendations stay eligible without a catalogue entry
+    assert np.array_equal(matrix.eligible[:, matrix.scheme_columns['PM-KISAN']], recommended)
+    assert eligibility(matrix) == eligibility(build_matrix(dataset))
+
+
+def test_attribute_change_recomputes_only_its_row(dataset, monkeypatch, tmp_path):
+    matrix = build_matrix(dataset)
+    computed = record_computed_rows(matrix, monkeypatch)
+    before = matrix.recommended.copy(), matrix.eligible.copy()
+
+    attrs = json.loads(json.dumps(ATTRIBUTES))
+    attrs['C1']['forest_cover_percentage'] = 60.0
+    write_json(dataset['attrs'], {'items': attrs}, bump=10)
+    matrix.refresh()
+
+    row = matrix.row_of('C1')
+    assert computed == [row]
+    assert changed_rows(matrix, before) == {row}
+
+    # A write made in this process goes straight to the one row
+    before = matrix.recommended.copy(), matrix.eligible.copy()
+    update = dict(attrs['C4'], water_level=40, groundwater_index=0.3)
+    assert matrix.update_attributes('C4', update)
+    row = matrix.row_of('C4')
+    assert computed[1:] == [row]
+    assert changed_rows(matrix, before) == {row}
+
+    # Unchanged attributes recompute nothing
+    assert matrix.update_attributes('C4', update)
+    assert computed[2:] == []
+    assert not matrix.update_attributes('missing', update)
+
+    attrs['C4'] = update
+    final_attrs = str(tmp_path / 'final_attrs.json')
+    write_json(final_attrs, {'items': attrs})
+    fresh = build_matrix(dataset, attrs_file=final_attrs)
+    assert eligibility(matrix) == eligibility(fresh)
+    assert np.array_equal(matrix.attributes, fresh.attributes, equal_nan=True)
+
+
+def test_ranker_patches_recomputed_rows(dataset, monkeypatch):
+    matrix = build_matrix(dataset)
+    ranker = PriorityRanker(matrix)
+    ranker.refresh()
+    rebuilds = []
+    rebuild = ranker._rebuild
+    monkeypatch.setattr(ranker, '_rebuild', lambda: rebuilds.append(1) or rebuild())
+
+    assert matrix.update_attributes('C3', dict(ATTRIBUTES['C1'], poverty_index=0.95, infra_index=0.1))
+    rankings = ranker.top_k(schemes=['MGNREGA'], k=len(CLAIMS) + 1)
+
+    assert rebuilds == []
+    fresh = PriorityRanker(matrix)
+    fresh.refresh()
+    assert np.array_equal(ranker.components, fresh.components)
+    assert np.array_equal(ranker.scores, fresh.scores)
+    assert rankings == fresh.top_k(schemes=['MGNREGA'], k=len(CLAIMS) + 1)
+    assert rankings['MGNREGA']['top'][0]['polygon_id'] == 'C3'
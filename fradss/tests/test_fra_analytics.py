@@ -0,0 +1,110 @@
+"""Incremental ClaimAnalytics updates against analytics computed from scratch."""
+
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from fra_analytics import ClaimAnalytics
+
+STATES = ('Madhya Pradesh', 'Odisha', 'Telangana', 'Tripura')
+STATUSES = ('approved', 'rejected', 'submitted', 'under_review', 'field_verification')
+FRA_TYPES = ('Individual Forest Rights', 'Community Rights', 'Community Forest Resource Rights')
+COMMUNITIES = ('Gond', 'Santal', 'Koya', None)
+
+
+def make_claim(rng, claim_id):
+    submitted = date(2018, 1, 1) + timedelta(days=rng.randrange(2000))
+    # Some claims are last updated before they were submitted and must not count
+    updated = submitted + timedelta(days=rng.randrange(-30, 400))
+    return {
+        'claim_id': claim_id,
+        'state': rng.choice(STATES),
+        'fra_type': rng.choice(FRA_TYPES),
+        'status': rng.choice(STATUSES),
+        'tribal_community': rng.choice(COMMUNITIES),
+        'claim_area_ha': round(rng.uniform(0.1, 50), 2),
+        'submission_date': submitted.isoformat(),
+        'last_updated': updated.isoformat(),
+        'documents_submitted': rng.choice((None, 1, 2, 3, 4)),
+        'field_verification_done': rng.random() < 0.5,
+        'gps_coordinates_verified': rng.random() < 0.5,
+    }
+
+
+def expected_processing_time(claims):
+    """Processing-time summary computed directly from the sorted list of days."""
+    days = []
+    for claim in claims:
+        submitted = date.fromisoformat(claim['submission_date'])
+        updated = date.fromisoformat(claim['last_updated'])
+        if claim['status'] in ('approved', 'rejected') and updated >= submitted:
+            days.append((updated - submitted).days)
+    days.sort()
+    if not days:
+        return {'claims': 0, 'mean': None, 'median': None, 'p90': None, 'min': None, 'max': None}
+    n = len(days)
+    return {
+        'claims': n,
+        'mean': round(sum(days) / n, 1),
+        'median': days[(n + 1) // 2 - 1],
+        'p90': days[math.ceil(n * 9 / 10) - 1],
+        'min': days[0],
+        'max': days[-1]
+    }
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_upsert_and_remove_match_a_fresh_instance(seed):
+    rng = random.Random(seed)
+    claims = {f'C{i}': make_claim(rng, f'C{i}') for i in range(400)}
+    analytics = ClaimAnalytics(track=True)
+    ids = list(claims)
+    for start in range(0, len(ids), 100):
+        analytics.update([claims[claim_id] for claim_id in ids[start:start + 100]])
+
+    # Upsert: changed versions of existing claims plus new ones, as features
+    changed = {claim_id: make_claim(rng, claim_id) for claim_id in rng.sample(ids, 120)}
+    changed.update({f'N{i}': make_claim(rng, f'N{i}') for i in range(50)})
+    analytics.update({'type': 'Feature', 'properties': claim, 'geometry': None} for claim in changed.values())
+    claims.update(changed)
+
+    # A whole state's claims plus a random sample go away; unknown ids are ignored
+    removed = {claim_id for claim_id, claim in claims.items() if claim['state'] == 'Tripura'}
+    removed |= set(rng.sample(sorted(set(claims) - removed), 60))
+    analytics.remove(sorted(removed) + ['missing'])
+    for claim_id in removed:
+        del claims[claim_id]
+
+    fresh = ClaimAnalytics(claims.values())
+    assert analytics.result() == fresh.result()
+    assert 'Tripura' not in analytics.result()['state_wise_analysis']
+    assert analytics.processing_time() == fresh.processing_time() == expected_processing_time(claims.values())
+
+
+def test_processing_time_quantiles_follow_updates():
+    rng = random.Random(7)
+    claims = {f'C{i}': make_claim(rng, f'C{i}') for i in range(200)}
+    for claim in claims.values():
+        claim['status'] = 'approved'
+    analytics = ClaimAnalytics(claims.values(), track=True)
+    assert analytics.processing_time() == expected_processing_time(claims.values())
+
+    # Stretch the slowest tenth, then drop it again: the quantiles follow both ways
+    slowest = sorted(claims, key=lambda claim_id: claims[claim_id]['last_updated'])[-20:]
+    for claim_id in slowest:
+        claims[claim_id] = dict(claims[claim_id], last_updated='2030-01-01')
+    analytics.update(claims[claim_id] for claim_id in slowest)
+    assert analytics.processing_time() == expected_processing_time(claims.values())
+    assert analytics.processing_time() == ClaimAnalytics(claims.values()).processing_time()
+
+    analytics.remove(slowest)
+    for claim_id in slowest:
+        del claims[claim_id]
+    assert analytics.processing_time() == expected_processing_time(claims.values())
+    assert analytics.result() == ClaimAnalytics(claims.values()).result()
+
+    analytics.remove(list(claims))
+    assert analytics.processing_time() == expected_processing_time([])
+    assert analytics.result() == ClaimAnalytics([]).result()
@@ -0,0 +1,69 @@
+"""Placed parcels against their boundary and each other, checked with shapely."""
+
+import itertools
+
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+
+from parcel_placement import ParcelPlacer
+from scripts.generate_vanachitra_data import VanachitraFRAGenerator
+
+# A concave (C-shaped) boundary, small enough for the parcels to run out of room
+BOUNDARY = [[0, 0], [10, 0], [10, 3], [4, 3], [4, 7], [10, 7], [10, 10], [0, 10], [0, 0]]
+SLACK = 1e-9
+
+
+def assert_placed(boundary, rings, max_overlap):
+    """Every ring inside the boundary and no pair overlapping by more than max_overlap of the smaller one."""
+    boundary = Polygon(boundary)
+    parcels = [Polygon(ring) for ring in rings]
+    for parcel in parcels:
+        assert boundary.buffer(SLACK).contains(parcel)
+    for a, b in itertools.combinations(parcels, 2):
+        if a.intersects(b):
+            assert a.intersection(b).area <= max_overlap * min(a.area, b.area) + SLACK
+
+
+def square(side):
+    return [[-side / 2, -side / 2], [side / 2, -side / 2], [side / 2, side / 2], [-side / 2, side / 2],
+            [-side / 2, -side / 2]]
+
+
+@pytest.mark.parametrize('max_overlap', [0.0, 0.2])
+def test_crowded_boundary_skips_parcels_that_do_not_fit(max_overlap):
+    rng = np.random.RandomState(3)
+    placer = ParcelPlacer(BOUNDARY, max_overlap, attempts=10, max_shrinks=1)
+    placed = []
+    for side in rng.uniform(1.0, 3.0, 200).tolist():
+        # Half of the centres lie outside the boundary, in the notch of the C
+        ring = placer.place(square(side), rng, centre=rng.uniform(0, 10, 2).tolist())
+        if ring is not None:
+            placed.append(ring)
+
+    assert placer.skipped > 0
+    assert len(placed) + placer.skipped == 200
+    assert [parcel.ring for parcel in placer.parcels] == placed
+    assert_placed(BOUNDARY, placed, max_overlap)
+
+
+def test_parcel_larger_than_the_boundary_is_not_placed():
+    placer = ParcelPlacer(BOUNDARY, attempts=5)
+    assert placer.place(square(20), np.random.RandomState(0)) is None
+    assert placer.parcels == [] and placer.skipped == 1
+
+
+@pytest.mark.parametrize('max_overlap', [0.0, 0.1])
+def test_bulk_villages_keep_parcels_apart_and_inside(max_overlap):
+    generator = VanachitraFRAGenerator(max_overlap=max_overlap)
+    rng = np.random.RandomState(0)
+    villages = []
+    for state_name in generator.forest_states:
+        for feature in generator.generate_village_batch((state_name, 0, 100), rng=rng):
+            if feature['properties'].get('claim_type') == 'CFR':
+                villages.append((feature['geometry']['coordinates'][0], []))
+            elif feature['geometry']['type'] == 'Polygon' and not feature['properties'].get('water_type'):
+                villages[-1][1].append(feature['geometry']['coordinates'][0])
+
+    for boundary, rings in villages:
+        assert_placed(boundary, rings, max_overlap)
@@ -0,0 +1,78 @@
+"""Ear-clipping triangulation and point sampling on concave rings, checked with shapely."""
+
+import math
+
+import numpy as np
+import pytest
+from shapely.geometry import Point, Polygon
+
+from polygon_sampling import PolygonSetSampler, _triangle_areas, sample_points, triangulate
+
+SLACK = 1e-9
+
+
+def star(points, inner, outer, clockwise=False):
+    """Closed star ring alternating between two radii: a reflex vertex at every inner point."""
+    ring = []
+    for i in range(2 * points):
+        angle = math.pi * i / points * (-1 if clockwise else 1)
+        r = outer if i % 2 == 0 else inner
+        ring.append([r * math.cos(angle), r * math.sin(angle)])
+    return ring + [ring[0]]
+
+
+def random_ring(rng, points=14):
+    """Closed irregular ring with radii spread wide enough to make it concave."""
+    angles = np.sort(rng.uniform(0, 2 * np.pi, points))
+    radii = rng.uniform(0.2, 1.5, points)
+    ring = np.stack([80 + radii * np.cos(angles), 20 + radii * np.sin(angles)], axis=1).tolist()
+    return ring + [ring[0]]
+
+
+RINGS = {
+    # C shape, open (not closed) ring with a collinear vertex on the bottom edge
+    'c_shape': [[0, 0], [5, 0], [10, 0], [10, 3], [4, 3], [4, 7], [10, 7], [10, 10], [0, 10]],
+    'comb': [[0, 0], [9, 0], [9, 6], [8, 6], [8, 1], [6, 1], [6, 6], [5, 6], [5, 1], [3, 1], [3, 6],
+             [2, 6], [2, 1], [1, 1], [1, 6], [0, 6], [0, 0]],
+    # Clockwise, with a repeated vertex
+    'clockwise_l': [[0, 0], [0, 4], [1, 4], [1, 4], [1, 1], [3, 1], [3, 0], [0, 0]],
+    'star': star(7, 0.3, 1.0),
+    'clockwise_star': star(5, 0.4, 2.0, clockwise=True),
+}
+RINGS.update({f'random_{seed}': random_ring(np.random.RandomState(seed)) for seed in range(5)})
+
+
+def polygon(ring):
+    polygon = Polygon(ring)
+    assert polygon.is_valid and not polygon.convex_hull.equals(polygon)
+    return polygon
+
+
+@pytest.mark.parametrize('name', sorted(RINGS))
+def test_triangles_cover_the_ring(name):
+    ring = RINGS[name]
+    triangles = triangulate(ring)
+    area = polygon(ring).area
+    assert _triangle_areas(triangles).sum() == pytest.approx(area, rel=1e-9)
+    # Each triangle lies inside the ring, so with equal areas they tile it
+    outline = polygon(ring).buffer(SLACK * area)
+    assert all(outline.contains(Polygon(triangle)) for triangle in triangles.tolist())
+
+
+@pytest.mark.parametrize('name', sorted(RINGS))
+def test_sampled_points_lie_inside_the_ring(name):
+    ring = RINGS[name]
+    points = sample_points(ring, 2000, seed=7)
+    assert points.shape == (2000, 2)
+    outline = polygon(ring).buffer(SLACK * polygon(ring).area)
+    assert all(outline.contains(Point(x, y)) for x, y in points.tolist())
+    assert np.array_equal(points, sample_points(ring, 2000, seed=7))
+
+
+def test_set_sampler_keeps_each_point_in_its_ring():
+    names = sorted(RINGS)
+    samplers = PolygonSetSampler(RINGS[name] for name in names)
+    owners = np.random.RandomState(1).randint(len(names), size=3000)
+    points = samplers.sample(owners, np.random.RandomState(2))
+    outlines = [polygon(RINGS[name]).buffer(SLACK * polygon(RINGS[name]).area) for name in names]
+    assert all(outlines[owner].contains(Point(x, y)) for owner, (x, y) in zip(owners.tolist(), points.tolist()))
@@ -0,0 +1,49 @@
+"""Which requests the opt-in profiler profiles, and that bad tokens never break a request."""
+
+import pytest
+from flask import Flask
+
+from request_profiler import PROFILE_HEADER, RequestProfiler
+
+SECRET = 's3cret'
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/')
+    def index():
+        return 'ok'
+
+    RequestProfiler(app, enabled=True, secret=SECRET)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('token', ['é', 'wrong', SECRET + 'x', ''])
+def test_bad_tokens_are_served_unprofiled(client, token):
+    response = client.get('/', headers={PROFILE_HEADER: token.encode('utf-8').decode('latin-1')})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_non_ascii_query_token_is_served_unprofiled(client):
+    response = client.get('/?_profile=%C3%A9')
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_secret_is_only_read_from_the_header(client):
+    assert 'X-Profile-Id' not in client.get(f'/?_profile={SECRET}').headers
+    response = client.get('/', headers={PROFILE_HEADER: SECRET})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' in response.headers
+    assert client.get('/api/profiles', headers={PROFILE_HEADER: SECRET}).status_code == 200
+    assert client.get(f'/api/profiles?_profile={SECRET}').status_code == 404
+
+
+def test_authorized_compares_non_ascii_strings():
+    profiler = RequestProfiler(enabled=True, secret='clé')
+    assert profiler.authorized('clé')
+    assert not profiler.authorized('é')
+    assert not profiler.authorized(None)